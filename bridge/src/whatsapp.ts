@@ -9,6 +9,7 @@ import makeWASocket, {
   useMultiFileAuthState,
   fetchLatestBaileysVersion,
   makeCacheableSignalKeyStore,
+  downloadMediaMessage,
 } from '@whiskeysockets/baileys';
 
 import { Boom } from '@hapi/boom';
@@ -16,6 +17,13 @@ import qrcode from 'qrcode-terminal';
 import pino from 'pino';
 
 const VERSION = '0.1.0';
+const MAX_VOICE_BYTES = 16 * 1024 * 1024;
+
+export interface InboundMedia {
+  kind: 'voice';
+  mimetype: string;
+  data: string; // base64
+}
 
 export interface InboundMessage {
   id: string;
@@ -24,6 +32,7 @@ export interface InboundMessage {
   content: string;
   timestamp: number;
   isGroup: boolean;
+  media?: InboundMedia;
 }
 
 export interface WhatsAppClientOptions {
@@ -120,6 +129,7 @@ export class WhatsAppClient {
         if (!content) continue;
 
         const isGroup = msg.key.remoteJid?.endsWith('@g.us') || false;
+        const media = msg.message?.audioMessage ? await this.downloadVoice(msg, logger) : undefined;
 
         this.options.onMessage({
           id: msg.key.id || '',
@@ -128,6 +138,7 @@ export class WhatsAppClient {
           content,
           timestamp: msg.messageTimestamp as number,
           isGroup,
+          media,
         });
       }
     });
@@ -170,6 +181,25 @@ export class WhatsAppClient {
     return null;
   }
 
+  private async downloadVoice(msg: any, logger: any): Promise<InboundMedia | undefined> {
+    const audio = msg.message.audioMessage;
+    if (Number(audio.fileLength || 0) > MAX_VOICE_BYTES) return undefined;
+    try {
+      const buffer = (await downloadMediaMessage(msg, 'buffer', {}, {
+        logger,
+        reuploadRequest: this.sock.updateMediaMessage,
+      })) as Buffer;
+      return {
+        kind: 'voice',
+        mimetype: audio.mimetype || 'audio/ogg',
+        data: buffer.toString('base64'),
+      };
+    } catch (err) {
+      console.error('Failed to download voice message:', err);
+      return undefined;
+    }
+  }
+
   async sendMessage(to: string, text: string): Promise<void> {
     if (!this.sock) {
       throw new Error('Not connected');
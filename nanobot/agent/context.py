@@ -1,6 +1,5 @@
 """Context builder for assembling agent prompts."""
 
-import base64
 import mimetypes
 import platform
 from pathlib import Path
@@ -8,6 +7,7 @@ from typing import Any
 
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.skills import SkillsLoader
+from nanobot.media import data_url
 
 
 class ContextBuilder:
@@ -172,8 +172,7 @@ To recall past events, grep {workspace_path}/memory/HISTORY.md"""
             mime, _ = mimetypes.guess_type(path)
             if not p.is_file() or not mime or not mime.startswith("image/"):
                 continue
-            b64 = base64.b64encode(p.read_bytes()).decode()
-            images.append({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}})
+            images.append({"type": "image_url", "image_url": {"url": data_url(p, mime)}})
         
         if not images:
             return text
@@ -13,6 +13,7 @@ from nanobot.providers.base import LLMProvider
 from nanobot.agent.context import ContextBuilder
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
+from nanobot.agent.tools.search import SearchTool
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
 from nanobot.agent.tools.message import MessageTool
@@ -20,6 +21,8 @@ from nanobot.agent.tools.spawn import SpawnTool
 from nanobot.agent.tools.cron import CronTool
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.subagent import SubagentManager
+from nanobot.agent.router import ModelRouter
+from nanobot.media import get_image_preprocessor
 from nanobot.session.manager import SessionManager
 from nanobot.agent import tracer
 
@@ -49,13 +52,17 @@ class AgentLoop:
         cron_service: "CronService | None" = None,
         restrict_to_workspace: bool = False,
         session_manager: SessionManager | None = None,
+        subagent_config: "SubagentConfig | None" = None,
+        router: ModelRouter | None = None,
     ):
         from nanobot.config.schema import ExecToolConfig
         from nanobot.cron.service import CronService
         self.bus = bus
         self.provider = provider
         self.workspace = workspace
-        self.model = model or provider.get_default_model()
+        # Per-task-class model routing; without a router everything runs on `model`
+        self.router = router or ModelRouter(provider, model=model)
+        self.model = self.router.model_for("main")
         self.max_iterations = max_iterations
         self.memory_window = memory_window
         self.brave_api_key = brave_api_key
@@ -74,6 +81,9 @@ class AgentLoop:
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
             restrict_to_workspace=restrict_to_workspace,
+            config=subagent_config,
+            state_dir=Path.home() / ".nanobot" / "subagents",
+            router=self.router,
         )
         
         # Initialize XES event tracer
@@ -91,12 +101,21 @@ class AgentLoop:
         self.tools.register(WriteFileTool(allowed_dir=allowed_dir))
         self.tools.register(EditFileTool(allowed_dir=allowed_dir))
         self.tools.register(ListDirTool(allowed_dir=allowed_dir))
+        self.tools.register(SearchTool(workspace=self.workspace, allowed_dir=allowed_dir))
         
         # Shell tool
         self.tools.register(ExecTool(
             working_dir=str(self.workspace),
             timeout=self.exec_config.timeout,
             restrict_to_workspace=self.restrict_to_workspace,
+            cpu_time_limit=self.exec_config.cpu_time_limit,
+            memory_limit_mb=self.exec_config.memory_limit_mb,
+            max_open_files=self.exec_config.max_open_files,
+            max_processes=self.exec_config.max_processes,
+            cgroup_memory_mb=self.exec_config.cgroup_memory_mb,
+            report_usage=self.exec_config.report_usage,
+            persistent_session=self.exec_config.persistent_session,
+            session_idle_timeout=self.exec_config.session_idle_timeout,
         ))
         
         # Web tools
@@ -149,13 +168,24 @@ class AgentLoop:
         self._running = False
         logger.info("Agent loop stopping")
     
-    async def _process_message(self, msg: InboundMessage, session_key: str | None = None) -> OutboundMessage | None:
+    async def close(self) -> None:
+        """Release tool resources (persistent shells, HTTP pools). Call on shutdown."""
+        await self.tools.close()
+        await self.subagents.close()
+    
+    async def _process_message(
+        self,
+        msg: InboundMessage,
+        session_key: str | None = None,
+        task: str = "main",
+    ) -> OutboundMessage | None:
         """
         Process a single inbound message.
         
         Args:
             msg: The inbound message to process.
             session_key: Override session key (used by process_direct).
+            task: Task class used to pick the model (e.g. "heartbeat").
         
         Returns:
             The response message, or None if no response needed.
@@ -187,7 +217,10 @@ class AgentLoop:
                                   content="🐈 New session started. Memory consolidated.")
         if cmd == "/help":
             return OutboundMessage(channel=msg.channel, chat_id=msg.chat_id,
-                                  content="🐈 nanobot commands:\n/new — Start a new conversation\n/help — Show available commands")
+                                  content="🐈 nanobot commands:\n/new — Start a new conversation\n/usage — Show model usage by task\n/help — Show available commands")
+        if cmd == "/usage":
+            return OutboundMessage(channel=msg.channel, chat_id=msg.chat_id,
+                                  content=f"🐈 Model usage since start:\n{self.router.format_report()}")
         
         # Consolidate memory before processing if session is too large
         if len(session.messages) > self.memory_window:
@@ -206,11 +239,20 @@ class AgentLoop:
         if isinstance(cron_tool, CronTool):
             cron_tool.set_context(msg.channel, msg.chat_id)
         
+        exec_tool = self.tools.get("exec")
+        if isinstance(exec_tool, ExecTool):
+            exec_tool.set_context(key)
+        
+        # Downscale/re-encode images for the model before they are inlined
+        media = None
+        if msg.media:
+            media = await get_image_preprocessor().prepare(msg.media, self.router.model_for(task))
+        
         # Build initial messages (use get_history for LLM-formatted messages)
         messages = self.context.build_messages(
             history=session.get_history(),
             current_message=msg.content,
-            media=msg.media if msg.media else None,
+            media=media,
             channel=msg.channel,
             chat_id=msg.chat_id,
         )
@@ -224,11 +266,12 @@ class AgentLoop:
             iteration += 1
             
             # Call LLM
-            response = await self.provider.chat(
+            response = await self.router.chat(
+                task,
                 messages=messages,
                 tools=self.tools.get_definitions(),
-                model=self.model
             )
+            tracer.add_usage(response.usage)
             
             # Handle tool calls
             if response.has_tool_calls:
@@ -324,6 +367,10 @@ class AgentLoop:
         if isinstance(cron_tool, CronTool):
             cron_tool.set_context(origin_channel, origin_chat_id)
         
+        exec_tool = self.tools.get("exec")
+        if isinstance(exec_tool, ExecTool):
+            exec_tool.set_context(session_key)
+        
         # Build messages with the announce content
         messages = self.context.build_messages(
             history=session.get_history(),
@@ -339,11 +386,12 @@ class AgentLoop:
         while iteration < self.max_iterations:
             iteration += 1
             
-            response = await self.provider.chat(
+            response = await self.router.chat(
+                "announce",
                 messages=messages,
                 tools=self.tools.get_definitions(),
-                model=self.model
             )
+            tracer.add_usage(response.usage)
             
             if response.has_tool_calls:
                 tool_call_dicts = [
@@ -429,12 +477,12 @@ class AgentLoop:
 Respond with ONLY valid JSON, no markdown fences."""
 
         try:
-            response = await self.provider.chat(
+            response = await self.router.chat(
+                "consolidation",
                 messages=[
                     {"role": "system", "content": "You are a memory consolidation agent. Respond only with valid JSON."},
                     {"role": "user", "content": prompt},
                 ],
-                model=self.model,
             )
             text = (response.content or "").strip()
             if text.startswith("```"):
@@ -459,6 +507,7 @@ Respond with ONLY valid JSON, no markdown fences."""
         session_key: str = "cli:direct",
         channel: str = "cli",
         chat_id: str = "direct",
+        task: str = "main",
     ) -> str:
         """
         Process a message directly (for CLI or cron usage).
@@ -468,6 +517,7 @@ Respond with ONLY valid JSON, no markdown fences."""
             session_key: Session identifier (overrides channel:chat_id for session lookup).
             channel: Source channel (for tool context routing).
             chat_id: Source chat ID (for tool context routing).
+            task: Task class used to pick the model (e.g. "heartbeat").
         
         Returns:
             The agent's response.
@@ -479,5 +529,5 @@ Respond with ONLY valid JSON, no markdown fences."""
             content=content
         )
         
-        response = await self._process_message(msg, session_key=session_key)
+        response = await self._process_message(msg, session_key=session_key, task=task)
         return response.content if response else ""
@@ -0,0 +1,142 @@
+"""Task-class model routing for LLM calls.
+
+The main conversation runs on the configured flagship model, while auxiliary
+calls (memory consolidation, heartbeat checks, subagent announces, background
+subagents) can be routed to cheaper models with their own sampling settings.
+Every call is timed and costed per task class for the usage report.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+TASK_CLASSES = ("main", "consolidation", "heartbeat", "announce", "subagent")
+
+
+@dataclass
+class TaskRoute:
+    """Model and sampling settings for one task class."""
+    model: str
+    max_tokens: int = 4096
+    temperature: float = 0.7
+    provider: LLMProvider | None = None  # None = the router's default provider
+
+
+@dataclass
+class TaskStats:
+    """Accumulated latency, token and cost figures for one task class."""
+    calls: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    uncosted_calls: int = 0  # Calls whose model is missing from the price map
+    total_latency_s: float = 0.0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=500))
+    models: set[str] = field(default_factory=set)
+
+    def summary(self) -> dict[str, Any]:
+        recent = sorted(self.latencies)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "models": sorted(self.models),
+            "avg_latency_s": self.total_latency_s / self.calls if self.calls else 0.0,
+            "p95_latency_s": p95,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": self.cost if self.calls > self.uncosted_calls else None,
+        }
+
+
+class ModelRouter:
+    """
+    Routes LLM calls to a model by task class and records per-class usage.
+
+    Unknown task classes and classes without a route fall back to the
+    "main" route.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        routes: dict[str, TaskRoute] | None = None,
+        model: str | None = None,
+    ):
+        self.provider = provider
+        self.routes = dict(routes or {})
+        if "main" not in self.routes:
+            self.routes["main"] = TaskRoute(model=model or provider.get_default_model())
+        self._stats: dict[str, TaskStats] = {}
+
+    def route(self, task: str) -> TaskRoute:
+        """Get the route for a task class."""
+        return self.routes.get(task) or self.routes["main"]
+
+    def model_for(self, task: str) -> str:
+        """Get the model a task class runs on."""
+        return self.route(task).model
+
+    async def chat(
+        self,
+        task: str,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+    ) -> LLMResponse:
+        """Send a chat request using the task class's model and settings."""
+        route = self.route(task)
+        provider = route.provider or self.provider
+        start = time.perf_counter()
+        response = await provider.chat(
+            messages=messages,
+            tools=tools,
+            model=route.model,
+            max_tokens=route.max_tokens,
+            temperature=route.temperature,
+        )
+        elapsed = time.perf_counter() - start
+
+        stats = self._stats.setdefault(task, TaskStats())
+        stats.calls += 1
+        stats.total_latency_s += elapsed
+        stats.latencies.append(elapsed)
+        stats.models.add(route.model)
+        if response.finish_reason == "error":
+            stats.errors += 1
+        usage = response.usage or {}
+        stats.prompt_tokens += usage.get("prompt_tokens", 0)
+        stats.completion_tokens += usage.get("completion_tokens", 0)
+        cost = provider.estimate_cost(route.model, usage)
+        if cost is None:
+            stats.uncosted_calls += 1
+        else:
+            stats.cost += cost
+        return response
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        """Per-class latency, token and cost summary, in TASK_CLASSES order."""
+        order = {name: i for i, name in enumerate(TASK_CLASSES)}
+        return {
+            task: self._stats[task].summary()
+            for task in sorted(self._stats, key=lambda t: (order.get(t, len(order)), t))
+        }
+
+    def format_report(self) -> str:
+        """Render the usage report as plain text."""
+        report = self.report()
+        if not report:
+            return "No LLM calls yet."
+        lines = []
+        for task, s in report.items():
+            cost = f"${s['cost_usd']:.4f}" if s["cost_usd"] is not None else "n/a"
+            errors = f", {s['errors']} errors" if s["errors"] else ""
+            lines.append(
+                f"{task} ({', '.join(s['models'])}): {s['calls']} calls{errors}, "
+                f"avg {s['avg_latency_s']:.2f}s, p95 {s['p95_latency_s']:.2f}s, "
+                f"{s['prompt_tokens']}+{s['completion_tokens']} tokens, {cost}"
+            )
+        return "\n".join(lines)
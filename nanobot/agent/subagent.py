@@ -1,8 +1,13 @@
 """Subagent manager for background task execution."""
 
 import asyncio
+import heapq
+import itertools
 import json
+import time
 import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
@@ -11,12 +16,44 @@ from loguru import logger
 from nanobot.bus.events import InboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
+from nanobot.agent.router import ModelRouter
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
+from nanobot.agent.tools.search import SearchTool
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
 
 
+ACTIVE_STATUSES = ("queued", "running")
+
+
+@dataclass
+class SubagentInfo:
+    """Bookkeeping for one spawned subagent."""
+    id: str
+    label: str
+    task: str
+    origin: dict[str, str]
+    priority: int = 0
+    status: str = "queued"  # queued | running | ok | error | timeout | cancelled
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    iterations: int = 0
+    tokens_used: int = 0
+    
+    @property
+    def origin_key(self) -> str:
+        return f"{self.origin['channel']}:{self.origin['chat_id']}"
+    
+    def summary(self) -> str:
+        """One-line human-readable status."""
+        now = self.finished_at or time.time()
+        elapsed = f", {int(now - self.started_at)}s" if self.started_at else ""
+        tokens = f", {self.tokens_used} tokens" if self.tokens_used else ""
+        return f"[{self.id}] {self.label} — {self.status}{elapsed}{tokens}"
+
+
 class SubagentManager:
     """
     Manages background subagent execution.
@@ -24,8 +61,15 @@ class SubagentManager:
     Subagents are lightweight agent instances that run in the background
     to handle specific tasks. They share the same LLM provider but have
     isolated context and a focused system prompt.
+    
+    At most max_concurrent subagents run at once; the rest wait in a
+    priority queue (FIFO within a priority). Each origin session has a
+    quota, and every subagent has a wall-clock and token budget.
     """
     
+    _MAX_FINISHED = 50  # Finished subagents kept for list/status
+    _CANCEL_POLL_S = 1.0  # How often to look for `nanobot subagents cancel` requests
+    
     def __init__(
         self,
         provider: LLMProvider,
@@ -35,16 +79,57 @@ class SubagentManager:
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
+        config: "SubagentConfig | None" = None,
+        state_dir: Path | None = None,
+        router: ModelRouter | None = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ExecToolConfig, SubagentConfig
         self.provider = provider
         self.workspace = workspace
         self.bus = bus
-        self.model = model or provider.get_default_model()
+        # Subagents run on the "subagent" task class (falls back to the main model)
+        self.router = router or ModelRouter(provider, model=model)
+        self.model = self.router.model_for("subagent")
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.restrict_to_workspace = restrict_to_workspace
+        self.config = config or SubagentConfig()
+        # Status snapshot and cancel requests shared with `nanobot subagents`
+        self.state_dir = state_dir
+        self._subagents: dict[str, SubagentInfo] = {}
+        self._queue: list[tuple[int, int, str]] = []
+        self._seq = itertools.count()
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
+        # origin_key -> (label, status_text, task, result) awaiting announcement
+        self._pending_results: dict[str, list[tuple[str, str, str, str]]] = {}
+        self._flush_timers: dict[str, asyncio.Task[None]] = {}
+        self._cancel_watcher: asyncio.Task[None] | None = None
+        self._tools: ToolRegistry | None = None
+        # Everything in the system prompt except the current time
+        self._prompt_body = f"""You are a subagent spawned by the main agent to complete a specific task.
+
+## Rules
+1. Stay focused - complete only the assigned task, nothing else
+2. Your final response will be reported back to the main agent
+3. Do not initiate conversations or take on side tasks
+4. Be concise but informative in your findings
+
+## What You Can Do
+- Read and write files in the workspace
+- Execute shell commands
+- Search the web and fetch web pages
+- Complete the task thoroughly
+
+## What You Cannot Do
+- Send messages directly to users (no message tool available)
+- Spawn other subagents
+- Access the main agent's conversation history
+
+## Workspace
+Your workspace is at: {workspace}
+Skills are available at: {workspace}/skills/ (read SKILL.md files as needed)
+
+When you have completed the task, provide a clear summary of your findings or actions."""
     
     async def spawn(
         self,
@@ -52,6 +137,7 @@ class SubagentManager:
         label: str | None = None,
         origin_channel: str = "cli",
         origin_chat_id: str = "direct",
+        priority: int = 0,
     ) -> str:
         """
         Spawn a subagent to execute a task in the background.
@@ -61,76 +147,133 @@ class SubagentManager:
             label: Optional human-readable label for the task.
             origin_channel: The channel to announce results to.
             origin_chat_id: The chat ID to announce results to.
+            priority: Higher values leave the wait queue first.
         
         Returns:
-            Status message indicating the subagent was started.
+            Status message indicating the subagent was started or queued.
         """
-        task_id = str(uuid.uuid4())[:8]
-        display_label = label or task[:30] + ("..." if len(task) > 30 else "")
-        
         origin = {
             "channel": origin_channel,
             "chat_id": origin_chat_id,
         }
+        origin_key = f"{origin_channel}:{origin_chat_id}"
         
-        # Create background task
-        bg_task = asyncio.create_task(
-            self._run_subagent(task_id, task, display_label, origin)
-        )
-        self._running_tasks[task_id] = bg_task
+        per_session = self.config.max_per_session
+        active = self.list_subagents(origin_key, include_finished=False)
+        if per_session and len(active) >= per_session:
+            return (f"Error: {len(active)} subagents are already queued or running for this "
+                    f"conversation (limit {per_session}). Wait for them to finish or cancel one.")
+        queued = sum(1 for i in self._subagents.values() if i.status == "queued")
+        if self.config.max_queued and queued >= self.config.max_queued:
+            return f"Error: The subagent queue is full ({queued} waiting). Try again later."
         
-        # Cleanup when done
-        bg_task.add_done_callback(lambda _: self._running_tasks.pop(task_id, None))
+        task_id = str(uuid.uuid4())[:8]
+        display_label = label or task[:30] + ("..." if len(task) > 30 else "")
+        info = SubagentInfo(id=task_id, label=display_label, task=task, origin=origin, priority=priority)
+        self._subagents[task_id] = info
+        heapq.heappush(self._queue, (-priority, next(self._seq), task_id))
+        self._dispatch()
+        self._save_state()
+        self._watch_cancel_requests()
         
-        logger.info(f"Spawned subagent [{task_id}]: {display_label}")
-        return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
+        if info.status == "running":
+            logger.info(f"Spawned subagent [{task_id}]: {display_label}")
+            return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
+        position = sum(1 for i in self._subagents.values() if i.status == "queued")
+        logger.info(f"Queued subagent [{task_id}] at position {position}: {display_label}")
+        return (f"Subagent [{display_label}] queued (id: {task_id}, position {position}); "
+                f"it starts when a slot frees up. I'll notify you when it completes.")
     
-    async def _run_subagent(
-        self,
-        task_id: str,
-        task: str,
-        label: str,
-        origin: dict[str, str],
-    ) -> None:
-        """Execute the subagent task and announce the result."""
+    def _dispatch(self) -> None:
+        """Start queued subagents while there are free slots."""
+        while self._queue and len(self._running_tasks) < self.config.max_concurrent:
+            _, _, task_id = heapq.heappop(self._queue)
+            info = self._subagents.get(task_id)
+            if not info or info.status != "queued":
+                continue  # Cancelled while waiting
+            if self._take_cancel_request(task_id):
+                self._finish(info, "cancelled")
+                continue
+            info.status = "running"
+            info.started_at = time.time()
+            bg_task = asyncio.create_task(self._run_with_budget(info))
+            self._running_tasks[task_id] = bg_task
+            bg_task.add_done_callback(lambda _, tid=task_id: self._on_task_done(tid))
+    
+    def _on_task_done(self, task_id: str) -> None:
+        self._running_tasks.pop(task_id, None)
+        info = self._subagents.get(task_id)
+        if info and info.status == "running":
+            self._finish(info, "cancelled")
+        self._dispatch()
+        self._save_state()
+    
+    def _finish(self, info: SubagentInfo, status: str) -> None:
+        info.status = status
+        info.finished_at = time.time()
+        if (
+            status == "cancelled"
+            and info.origin_key in self._pending_results
+            and not self.list_subagents(info.origin_key, include_finished=False)
+        ):
+            # The last sibling was cancelled; don't hold earlier results for the window
+            asyncio.create_task(self._flush_results(info.origin_key))
+        finished = [i for i in self._subagents.values() if i.status not in ACTIVE_STATUSES]
+        for old in sorted(finished, key=lambda i: i.finished_at or 0)[:-self._MAX_FINISHED]:
+            self._subagents.pop(old.id, None)
+    
+    async def _run_with_budget(self, info: SubagentInfo) -> None:
+        """Run a subagent under its wall-clock budget and announce the outcome."""
+        timeout = self.config.timeout or None
+        try:
+            status, result = await asyncio.wait_for(self._run_subagent(info), timeout=timeout)
+        except asyncio.TimeoutError:
+            status, result = "timeout", f"Error: Stopped after the {timeout}s time budget."
+            logger.warning(f"Subagent [{info.id}] timed out after {timeout}s")
+        except asyncio.CancelledError:
+            logger.info(f"Subagent [{info.id}] cancelled")
+            self._finish(info, "cancelled")
+            raise
+        self._finish(info, status)
+        await self._announce_result(info.id, info.label, info.task, result, info.origin, status)
+    
+    async def _run_subagent(self, info: SubagentInfo) -> tuple[str, str]:
+        """Execute the subagent task. Returns (status, result)."""
+        task_id, task, label = info.id, info.task, info.label
         logger.info(f"Subagent [{task_id}] starting task: {label}")
         
         try:
-            # Build subagent tools (no message tool, no spawn tool)
-            tools = ToolRegistry()
-            allowed_dir = self.workspace if self.restrict_to_workspace else None
-            tools.register(ReadFileTool(allowed_dir=allowed_dir))
-            tools.register(WriteFileTool(allowed_dir=allowed_dir))
-            tools.register(EditFileTool(allowed_dir=allowed_dir))
-            tools.register(ListDirTool(allowed_dir=allowed_dir))
-            tools.register(ExecTool(
-                working_dir=str(self.workspace),
-                timeout=self.exec_config.timeout,
-                restrict_to_workspace=self.restrict_to_workspace,
-            ))
-            tools.register(WebSearchTool(api_key=self.brave_api_key))
-            tools.register(WebFetchTool())
-            
-            # Build messages with subagent-specific prompt
-            system_prompt = self._build_subagent_prompt(task)
+            # Shared tools and prompt; only the message list is per-task
+            tools = self._get_tools()
             messages: list[dict[str, Any]] = [
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": self._build_subagent_prompt(task)},
                 {"role": "user", "content": task},
             ]
             
-            # Run agent loop (limited iterations)
-            max_iterations = 15
+            # Run agent loop (limited iterations and tokens)
+            max_iterations = self.config.max_iterations
+            budget = self.config.token_budget
             iteration = 0
             final_result: str | None = None
+            status = "ok"
             
             while iteration < max_iterations:
                 iteration += 1
                 
-                response = await self.provider.chat(
+                response = await self.router.chat(
+                    "subagent",
                     messages=messages,
                     tools=tools.get_definitions(),
-                    model=self.model,
                 )
+                info.iterations = iteration
+                info.tokens_used += response.usage.get("total_tokens", 0)
+                self._save_state()
+                
+                if budget and info.tokens_used >= budget and response.has_tool_calls:
+                    final_result = (f"Stopped after using {info.tokens_used} tokens "
+                                    f"(budget {budget}). Progress so far: {response.content or '(none)'}")
+                    status = "error"
+                    break
                 
                 if response.has_tool_calls:
                     # Add assistant message with tool calls
@@ -169,13 +312,12 @@ class SubagentManager:
             if final_result is None:
                 final_result = "Task completed but no final response was generated."
             
-            logger.info(f"Subagent [{task_id}] completed successfully")
-            await self._announce_result(task_id, label, task, final_result, origin, "ok")
+            logger.info(f"Subagent [{task_id}] finished ({status})")
+            return status, final_result
             
         except Exception as e:
-            error_msg = f"Error: {str(e)}"
             logger.error(f"Subagent [{task_id}] failed: {e}")
-            await self._announce_result(task_id, label, task, error_msg, origin, "error")
+            return "error", f"Error: {str(e)}"
     
     async def _announce_result(
         self,
@@ -186,10 +328,47 @@ class SubagentManager:
         origin: dict[str, str],
         status: str,
     ) -> None:
-        """Announce the subagent result to the main agent via the message bus."""
-        status_text = "completed successfully" if status == "ok" else "failed"
+        """
+        Queue the subagent result for announcement to the main agent.
+        
+        Results of sibling subagents from the same origin are merged into
+        one system turn: the batch is flushed when it reaches
+        announce_batch_size, when no sibling is still queued or running,
+        or announce_window seconds after its first result.
+        """
+        status_text = {"ok": "completed successfully", "timeout": "timed out"}.get(status, "failed")
+        origin_key = f"{origin['channel']}:{origin['chat_id']}"
+        
+        pending = self._pending_results.setdefault(origin_key, [])
+        pending.append((label, status_text, task, result))
+        logger.debug(f"Subagent [{task_id}] result queued for {origin_key} ({len(pending)} pending)")
         
-        announce_content = f"""[Subagent '{label}' {status_text}]
+        window = self.config.announce_window
+        if (
+            window <= 0
+            or len(pending) >= self.config.announce_batch_size
+            or not self.list_subagents(origin_key, include_finished=False)
+        ):
+            await self._flush_results(origin_key)
+        elif origin_key not in self._flush_timers:
+            self._flush_timers[origin_key] = asyncio.create_task(self._flush_after(origin_key, window))
+    
+    async def _flush_after(self, origin_key: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._flush_results(origin_key)
+    
+    async def _flush_results(self, origin_key: str) -> None:
+        """Publish all pending results for an origin as one system message."""
+        timer = self._flush_timers.pop(origin_key, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+        results = self._pending_results.pop(origin_key, [])
+        if not results:
+            return
+        
+        if len(results) == 1:
+            label, status_text, task, result = results[0]
+            announce_content = f"""[Subagent '{label}' {status_text}]
 
 Task: {task}
 
@@ -197,55 +376,153 @@ Result:
 {result}
 
 Summarize this naturally for the user. Keep it brief (1-2 sentences). Do not mention technical details like "subagent" or task IDs."""
+        else:
+            sections = "\n\n".join(
+                f"## '{label}' {status_text}\n\nTask: {task}\n\nResult:\n{result}"
+                for label, status_text, task, result in results
+            )
+            announce_content = f"""[{len(results)} subagents finished]
+
+{sections}
+
+Summarize these results naturally for the user in one brief message (a sentence or two per task). Do not mention technical details like "subagent" or task IDs."""
         
         # Inject as system message to trigger main agent
         msg = InboundMessage(
             channel="system",
             sender_id="subagent",
-            chat_id=f"{origin['channel']}:{origin['chat_id']}",
+            chat_id=origin_key,
             content=announce_content,
         )
         
         await self.bus.publish_inbound(msg)
-        logger.debug(f"Subagent [{task_id}] announced result to {origin['channel']}:{origin['chat_id']}")
+        logger.debug(f"Announced {len(results)} subagent result(s) to {origin_key}")
+    
+    def _get_tools(self) -> ToolRegistry:
+        """
+        Get the tool registry shared by all subagents, building it on first use.
+        
+        None of these tools keep per-call state (exec runs without a persistent
+        session here), so one set of instances and their HTTP connection pools
+        serves every spawn. No message tool and no spawn tool.
+        """
+        if self._tools is None:
+            tools = ToolRegistry()
+            allowed_dir = self.workspace if self.restrict_to_workspace else None
+            tools.register(ReadFileTool(allowed_dir=allowed_dir))
+            tools.register(WriteFileTool(allowed_dir=allowed_dir))
+            tools.register(EditFileTool(allowed_dir=allowed_dir))
+            tools.register(ListDirTool(allowed_dir=allowed_dir))
+            tools.register(SearchTool(workspace=self.workspace, allowed_dir=allowed_dir))
+            tools.register(ExecTool(
+                working_dir=str(self.workspace),
+                timeout=self.exec_config.timeout,
+                restrict_to_workspace=self.restrict_to_workspace,
+                cpu_time_limit=self.exec_config.cpu_time_limit,
+                memory_limit_mb=self.exec_config.memory_limit_mb,
+                max_open_files=self.exec_config.max_open_files,
+                max_processes=self.exec_config.max_processes,
+                cgroup_memory_mb=self.exec_config.cgroup_memory_mb,
+                report_usage=self.exec_config.report_usage,
+            ))
+            tools.register(WebSearchTool(api_key=self.brave_api_key))
+            tools.register(WebFetchTool())
+            self._tools = tools
+        return self._tools
     
     def _build_subagent_prompt(self, task: str) -> str:
         """Build a focused system prompt for the subagent."""
-        from datetime import datetime
-        import time as _time
         now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
-        tz = _time.strftime("%Z") or "UTC"
-
+        tz = time.strftime("%Z") or "UTC"
         return f"""# Subagent
 
 ## Current Time
 {now} ({tz})
 
-You are a subagent spawned by the main agent to complete a specific task.
-
-## Rules
-1. Stay focused - complete only the assigned task, nothing else
-2. Your final response will be reported back to the main agent
-3. Do not initiate conversations or take on side tasks
-4. Be concise but informative in your findings
-
-## What You Can Do
-- Read and write files in the workspace
-- Execute shell commands
-- Search the web and fetch web pages
-- Complete the task thoroughly
-
-## What You Cannot Do
-- Send messages directly to users (no message tool available)
-- Spawn other subagents
-- Access the main agent's conversation history
-
-## Workspace
-Your workspace is at: {self.workspace}
-Skills are available at: {self.workspace}/skills/ (read SKILL.md files as needed)
-
-When you have completed the task, provide a clear summary of your findings or actions."""
+{self._prompt_body}"""
     
     def get_running_count(self) -> int:
         """Return the number of currently running subagents."""
         return len(self._running_tasks)
+    
+    def list_subagents(self, origin_key: str | None = None, include_finished: bool = True) -> list[SubagentInfo]:
+        """List tracked subagents, optionally only those of one origin session."""
+        return [
+            i for i in sorted(self._subagents.values(), key=lambda i: i.created_at)
+            if (origin_key is None or i.origin_key == origin_key)
+            and (include_finished or i.status in ACTIVE_STATUSES)
+        ]
+    
+    def get_status(self, task_id: str) -> SubagentInfo | None:
+        """Get a tracked subagent by ID."""
+        return self._subagents.get(task_id)
+    
+    def cancel(self, task_id: str) -> bool:
+        """Cancel a queued or running subagent. Returns False if it is not active."""
+        info = self._subagents.get(task_id)
+        if not info or info.status not in ACTIVE_STATUSES:
+            return False
+        if info.status == "queued":
+            self._finish(info, "cancelled")
+            self._save_state()
+        else:
+            self._running_tasks[task_id].cancel()
+        logger.info(f"Subagent [{task_id}] cancel requested")
+        return True
+    
+    async def close(self) -> None:
+        """Stop watching for cancel requests and close the shared subagent tools (HTTP connection pools)."""
+        if self._cancel_watcher is not None:
+            self._cancel_watcher.cancel()
+            self._cancel_watcher = None
+        if self._tools is not None:
+            await self._tools.close()
+            self._tools = None
+    
+    def _watch_cancel_requests(self) -> None:
+        """Start polling for CLI cancel requests while any subagent is queued or running."""
+        if self.state_dir and (self._cancel_watcher is None or self._cancel_watcher.done()):
+            self._cancel_watcher = asyncio.create_task(self._poll_cancel_requests())
+    
+    async def _poll_cancel_requests(self) -> None:
+        cancel_dir = self.state_dir / "cancel"
+        while self.list_subagents(include_finished=False):
+            await asyncio.sleep(self._CANCEL_POLL_S)
+            try:
+                requested = [p.name for p in cancel_dir.iterdir()] if cancel_dir.is_dir() else []
+            except OSError as e:
+                logger.debug(f"Failed to read subagent cancel requests: {e}")
+                continue
+            for task_id in requested:
+                if self._take_cancel_request(task_id):
+                    # Running ones are cancelled mid-call, like an in-process cancel
+                    self.cancel(task_id)
+        self._cancel_watcher = None
+    
+    def _take_cancel_request(self, task_id: str) -> bool:
+        """Consume a cancel request left by the CLI, if any."""
+        if not self.state_dir:
+            return False
+        request = self.state_dir / "cancel" / task_id
+        if not request.exists():
+            return False
+        request.unlink(missing_ok=True)
+        return True
+    
+    def _save_state(self) -> None:
+        """Write a status snapshot for `nanobot subagents list`."""
+        if not self.state_dir:
+            return
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            data = {
+                "updatedAt": time.time(),
+                "subagents": [
+                    {**asdict(i), "task": i.task[:200]} for i in self.list_subagents()
+                ],
+            }
+            tmp = self.state_dir / "status.json.tmp"
+            tmp.write_text(json.dumps(data, ensure_ascii=False))
+            tmp.replace(self.state_dir / "status.json")
+        except OSError as e:
+            logger.debug(f"Failed to write subagent status: {e}")
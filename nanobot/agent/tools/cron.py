@@ -1,10 +1,11 @@
 """Cron tool for scheduling reminders and tasks."""
 
+from contextvars import ContextVar
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
 from nanobot.cron.service import CronService
-from nanobot.cron.types import CronSchedule
+from nanobot.cron.types import OVERLAP_POLICIES, CronSchedule
 
 
 class CronTool(Tool):
@@ -12,13 +13,12 @@ class CronTool(Tool):
     
     def __init__(self, cron_service: CronService):
         self._cron = cron_service
-        self._channel = ""
-        self._chat_id = ""
+        # Per-task, so concurrent turns (e.g. cron jobs) don't see each other's session
+        self._context: ContextVar[tuple[str, str]] = ContextVar("cron_context", default=("", ""))
     
     def set_context(self, channel: str, chat_id: str) -> None:
-        """Set the current session context for delivery."""
-        self._channel = channel
-        self._chat_id = chat_id
+        """Set the current session context for delivery (for the running task)."""
+        self._context.set((channel, chat_id))
     
     @property
     def name(self) -> str:
@@ -50,10 +50,24 @@ class CronTool(Tool):
                     "type": "string",
                     "description": "Cron expression like '0 9 * * *' (for scheduled tasks)"
                 },
+                "tz": {
+                    "type": "string",
+                    "description": "IANA timezone for cron_expr, e.g. 'Asia/Shanghai' (default: host timezone)"
+                },
                 "at": {
                     "type": "string",
                     "description": "ISO datetime for one-time execution (e.g. '2026-02-12T10:30:00')"
                 },
+                "overlap_policy": {
+                    "type": "string",
+                    "enum": list(OVERLAP_POLICIES),
+                    "description": "If the task is still running when due again (for add, default skip)"
+                },
+                "timeout_seconds": {
+                    "type": "integer",
+                    "description": "Cancel a run after this many seconds (for add)",
+                    "minimum": 1
+                },
                 "job_id": {
                     "type": "string",
                     "description": "Job ID (for remove)"
@@ -70,28 +84,43 @@ class CronTool(Tool):
         cron_expr: str | None = None,
         at: str | None = None,
         job_id: str | None = None,
+        overlap_policy: str = "skip",
+        timeout_seconds: int | None = None,
+        tz: str | None = None,
         **kwargs: Any
     ) -> str:
         if action == "add":
-            return self._add_job(message, every_seconds, cron_expr, at)
+            return self._add_job(message, every_seconds, cron_expr, at, overlap_policy, timeout_seconds, tz)
         elif action == "list":
             return self._list_jobs()
         elif action == "remove":
             return self._remove_job(job_id)
         return f"Unknown action: {action}"
     
-    def _add_job(self, message: str, every_seconds: int | None, cron_expr: str | None, at: str | None) -> str:
+    def _add_job(
+        self,
+        message: str,
+        every_seconds: int | None,
+        cron_expr: str | None,
+        at: str | None,
+        overlap_policy: str = "skip",
+        timeout_seconds: int | None = None,
+        tz: str | None = None,
+    ) -> str:
         if not message:
             return "Error: message is required for add"
-        if not self._channel or not self._chat_id:
+        channel, chat_id = self._context.get()
+        if not channel or not chat_id:
             return "Error: no session context (channel/chat_id)"
+        if overlap_policy not in OVERLAP_POLICIES:
+            return f"Error: overlap_policy must be one of {list(OVERLAP_POLICIES)}"
         
         # Build schedule
         delete_after = False
         if every_seconds:
             schedule = CronSchedule(kind="every", every_ms=every_seconds * 1000)
         elif cron_expr:
-            schedule = CronSchedule(kind="cron", expr=cron_expr)
+            schedule = CronSchedule(kind="cron", expr=cron_expr, tz=tz)
         elif at:
             from datetime import datetime
             dt = datetime.fromisoformat(at)
@@ -101,15 +130,20 @@ class CronTool(Tool):
         else:
             return "Error: either every_seconds, cron_expr, or at is required"
         
-        job = self._cron.add_job(
-            name=message[:30],
-            schedule=schedule,
-            message=message,
-            deliver=True,
-            channel=self._channel,
-            to=self._chat_id,
-            delete_after_run=delete_after,
-        )
+        try:
+            job = self._cron.add_job(
+                name=message[:30],
+                schedule=schedule,
+                message=message,
+                deliver=True,
+                channel=channel,
+                to=chat_id,
+                delete_after_run=delete_after,
+                overlap_policy=overlap_policy,
+                timeout_ms=(timeout_seconds or 0) * 1000,
+            )
+        except ValueError as e:
+            return f"Error: {e}"
         return f"Created job '{job.name}' (id: {job.id})"
     
     def _list_jobs(self) -> str:
@@ -1,5 +1,10 @@
 """File system tools: read, write, edit."""
 
+import asyncio
+import mmap
+import os
+import re
+import tempfile
 from pathlib import Path
 from typing import Any
 
@@ -14,11 +19,39 @@ def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
     return resolved
 
 
+def _looks_binary(sample: bytes) -> bool:
+    """Heuristic binary check: text files don't contain NUL bytes."""
+    return b"\x00" in sample
+
+
+def _skip_lines(mm: mmap.mmap | bytes, count: int, chunk_size: int = 1 << 20) -> int:
+    """Return the byte offset just after the count-th newline, or -1 if the file is shorter."""
+    pos = 0
+    while count > 0:
+        chunk = mm[pos:pos + chunk_size]
+        if not chunk:
+            return -1
+        n = chunk.count(b"\n")
+        if n < count:
+            count -= n
+            pos += len(chunk)
+            continue
+        idx = -1
+        for _ in range(count):
+            idx = chunk.index(b"\n", idx + 1)
+        return pos + idx + 1
+    return pos
+
+
 class ReadFileTool(Tool):
     """Tool to read file contents."""
     
-    def __init__(self, allowed_dir: Path | None = None):
+    _BINARY_SNIFF_BYTES = 8192
+    _STREAM_MAX_BYTES = 16 * 1024 * 1024  # Cap for files that report size 0 (/proc, /sys)
+    
+    def __init__(self, allowed_dir: Path | None = None, max_bytes: int = 100_000):
         self._allowed_dir = allowed_dir
+        self.max_bytes = max_bytes
 
     @property
     def name(self) -> str:
@@ -26,7 +59,10 @@ class ReadFileTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Read the contents of a file at the given path."
+        return (
+            "Read the contents of a file at the given path. Output is capped in size; "
+            "use offset/limit to page through lines, or tail to read the end of a log."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -36,12 +72,34 @@ class ReadFileTool(Tool):
                 "path": {
                     "type": "string",
                     "description": "The file path to read"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Line number to start reading from (1-based)",
+                    "minimum": 1
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of lines to read",
+                    "minimum": 1
+                },
+                "tail": {
+                    "type": "integer",
+                    "description": "Read only the last N lines (ignores offset/limit)",
+                    "minimum": 1
                 }
             },
             "required": ["path"]
         }
     
-    async def execute(self, path: str, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        path: str,
+        offset: int | None = None,
+        limit: int | None = None,
+        tail: int | None = None,
+        **kwargs: Any,
+    ) -> str:
         try:
             file_path = _resolve_path(path, self._allowed_dir)
             if not file_path.exists():
@@ -49,12 +107,82 @@ class ReadFileTool(Tool):
             if not file_path.is_file():
                 return f"Error: Not a file: {path}"
             
-            content = file_path.read_text(encoding="utf-8")
-            return content
+            return await asyncio.to_thread(self._read, file_path, offset or 1, limit, tail)
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error reading file: {str(e)}"
+    
+    def _read(self, file_path: Path, offset: int, limit: int | None, tail: int | None) -> str:
+        """Read the requested region via mmap so only those pages are touched."""
+        with open(file_path, "rb") as f:
+            if _looks_binary(f.read(self._BINARY_SNIFF_BYTES)):
+                size = file_path.stat().st_size
+                return f"Error: Binary file ({size} bytes), not shown: {file_path}"
+            if file_path.stat().st_size == 0:
+                # Empty, or a pseudo-file whose size is unknown until read: can't mmap, so stream it
+                f.seek(0)
+                data = f.read(self._STREAM_MAX_BYTES)
+                if not data:
+                    return ""
+                return self._read_tail(data, tail) if tail else self._read_range(data, offset, limit)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if tail:
+                    return self._read_tail(mm, tail)
+                return self._read_range(mm, offset, limit)
+    
+    @staticmethod
+    def _decode(data: bytes) -> str:
+        return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+    
+    def _read_range(self, mm: mmap.mmap | bytes, offset: int, limit: int | None) -> str:
+        size = len(mm)
+        start = _skip_lines(mm, offset - 1)
+        if start < 0 or (start >= size and offset > 1):
+            return f"Error: offset {offset} is past the end of the file"
+        
+        end, lines, truncated = start, 0, False
+        ceiling = start + self.max_bytes
+        while end < size and (limit is None or lines < limit):
+            nl = mm.find(b"\n", end)
+            line_end = size if nl < 0 else nl + 1
+            if line_end > ceiling:
+                truncated = True
+                if lines == 0:
+                    end = ceiling  # A single line longer than the ceiling
+                break
+            end, lines = line_end, lines + 1
+        
+        text = self._decode(mm[start:end])
+        if end >= size:
+            return text
+        
+        next_line = offset + lines
+        if truncated and lines == 0:
+            note = f"line {offset} is longer than {self.max_bytes} bytes and was cut"
+        elif truncated:
+            note = (f"truncated at {self.max_bytes} bytes, file is {size} bytes; "
+                    f"continue with offset={next_line}")
+        else:
+            note = f"more lines follow; continue with offset={next_line}"
+        return text.rstrip("\n") + f"\n... ({note})"
+    
+    def _read_tail(self, mm: mmap.mmap | bytes, count: int) -> str:
+        size = len(mm)
+        pos = size - 1 if mm[size - 1:size] == b"\n" else size
+        for _ in range(count):
+            pos = mm.rfind(b"\n", 0, pos)
+            if pos < 0:
+                break
+        start = pos + 1
+        
+        if size - start <= self.max_bytes:
+            return self._decode(mm[start:])
+        # Too large: keep the last max_bytes, starting at a line boundary if possible
+        cut = size - self.max_bytes
+        nl = mm.find(b"\n", cut)
+        cut = nl + 1 if 0 <= nl < size - 1 else cut
+        return f"... (truncated to the last {size - cut} bytes)\n" + self._decode(mm[cut:])
 
 
 class WriteFileTool(Tool):
@@ -100,6 +228,83 @@ class WriteFileTool(Tool):
             return f"Error writing file: {str(e)}"
 
 
+class _EditError(Exception):
+    """An edit that cannot be applied; the message is returned to the agent."""
+
+
+def _atomic_write(file_path: Path, content: str) -> None:
+    """Write via a temp file in the same directory and rename it over the target."""
+    fd, tmp = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if file_path.exists():
+            os.chmod(tmp, file_path.stat().st_mode & 0o7777)
+        os.replace(tmp, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+_HUNK_START = re.compile(r"^@@\s*-(\d+)")
+
+
+def _parse_unified_diff(patch: str) -> list[tuple[int, list[str], list[str]]]:
+    """
+    Parse a single-file unified diff into (old_start, old_lines, new_lines) hunks.
+
+    Hunk line counts are not trusted (hand-written diffs often get them
+    wrong); a hunk runs until the next hunk or file header.
+    """
+    lines = patch.splitlines(keepends=True)
+    hunks: list[tuple[int, list[str], list[str]]] = []
+    files = 0
+    current: tuple[int, list[str], list[str]] | None = None
+    last_tag = " "
+    for i, line in enumerate(lines):
+        next_line = lines[i + 1] if i + 1 < len(lines) else ""
+        if line.startswith("diff ") or (line.startswith("--- ") and next_line.startswith("+++ ")):
+            current = None
+            continue
+        if current is None and line.startswith("+++ "):
+            files += 1
+            continue
+        if line.startswith("@@"):
+            m = _HUNK_START.match(line)
+            current = (int(m.group(1)) if m else 0, [], [])
+            hunks.append(current)
+            continue
+        if current is None:
+            continue  # Preamble such as "index ..." lines
+        if line.startswith("\\"):
+            # "\ No newline at end of file" refers to the previous line
+            targets = {" ": (current[1], current[2]), "-": (current[1],), "+": (current[2],)}[last_tag]
+            for target in targets:
+                if target and target[-1].endswith("\n"):
+                    target[-1] = target[-1][:-1]
+            continue
+        tag, body = line[:1], line[1:]
+        if tag not in (" ", "-", "+"):
+            if line.strip():
+                raise _EditError(f"Error: Malformed patch line {i + 1}: {line.rstrip()!r}")
+            tag, body = " ", line  # Blank context line that lost its leading space
+        if tag in (" ", "-"):
+            current[1].append(body)
+        if tag in (" ", "+"):
+            current[2].append(body)
+        last_tag = tag
+    if files > 1:
+        raise _EditError("Error: Patch touches more than one file; send one patch per file")
+    if not hunks:
+        raise _EditError("Error: No hunks found in patch")
+    return hunks
+
+
 class EditFileTool(Tool):
     """Tool to edit a file by replacing text."""
     
@@ -112,7 +317,11 @@ class EditFileTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Edit a file by replacing old_text with new_text. The old_text must exist exactly in the file."
+        return (
+            "Edit a file by replacing old_text with new_text. The old_text must exist exactly in the file. "
+            "To change several places in one call, pass 'edits' (a list of old_text/new_text pairs) "
+            "or 'patch' (a unified diff). All changes are validated first and applied together, or not at all."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -130,40 +339,136 @@ class EditFileTool(Tool):
                 "new_text": {
                     "type": "string",
                     "description": "The text to replace with"
+                },
+                "edits": {
+                    "type": "array",
+                    "minItems": 1,
+                    "description": "Several replacements; each old_text must occur exactly once in the original file and not overlap",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "old_text": {"type": "string"},
+                            "new_text": {"type": "string"}
+                        },
+                        "required": ["old_text", "new_text"]
+                    }
+                },
+                "patch": {
+                    "type": "string",
+                    "description": "A unified diff for this file (as produced by diff -u or git diff)"
                 }
             },
-            "required": ["path", "old_text", "new_text"]
+            "required": ["path"]
         }
     
-    async def execute(self, path: str, old_text: str, new_text: str, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        path: str,
+        old_text: str | None = None,
+        new_text: str | None = None,
+        edits: list[dict[str, str]] | None = None,
+        patch: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        modes = sum(x is not None for x in (old_text, edits, patch))
+        if modes != 1:
+            return "Error: Provide exactly one of old_text/new_text, edits, or patch"
+        if edits is not None and not edits:
+            return "Error: edits is empty; nothing to change"
+        if old_text is not None:
+            if new_text is None:
+                return "Error: new_text is required with old_text"
+            edits = [{"old_text": old_text, "new_text": new_text}]
         try:
             file_path = _resolve_path(path, self._allowed_dir)
             if not file_path.exists():
                 return f"Error: File not found: {path}"
             
-            content = file_path.read_text(encoding="utf-8")
-            
-            if old_text not in content:
-                return f"Error: old_text not found in file. Make sure it matches exactly."
-            
-            # Count occurrences
-            count = content.count(old_text)
-            if count > 1:
-                return f"Warning: old_text appears {count} times. Please provide more context to make it unique."
-            
-            new_content = content.replace(old_text, new_text, 1)
-            file_path.write_text(new_content, encoding="utf-8")
-            
-            return f"Successfully edited {path}"
+            return await asyncio.to_thread(self._edit, file_path, path, edits, patch)
+        except _EditError as e:
+            return str(e)
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error editing file: {str(e)}"
+    
+    def _edit(self, file_path: Path, path: str, edits: list[dict[str, str]] | None, patch: str | None) -> str:
+        content = file_path.read_text(encoding="utf-8")
+        if patch is not None:
+            new_content, count, unit = *self._apply_patch(content, patch), "hunks"
+        elif edits:
+            new_content, count, unit = self._apply_edits(content, edits), len(edits), "edits"
+        else:
+            raise _EditError("Error: No edits given; nothing to change")
+        _atomic_write(file_path, new_content)
+        
+        if count > 1:
+            return f"Successfully applied {count} {unit} to {path}"
+        return f"Successfully edited {path}"
+    
+    @staticmethod
+    def _apply_edits(content: str, edits: list[dict[str, str]]) -> str:
+        """Locate every old_text in the original content, then splice all replacements in one pass."""
+        single = len(edits) == 1
+        spans: list[tuple[int, int, str]] = []
+        for i, edit in enumerate(edits):
+            old, new = edit["old_text"], edit["new_text"]
+            label = "old_text" if single else f"edits[{i}].old_text"
+            if not old:
+                raise _EditError(f"Error: {label} is empty")
+            start = content.find(old)
+            if start < 0:
+                raise _EditError(f"Error: {label} not found in file. Make sure it matches exactly.")
+            if content.find(old, start + 1) >= 0:
+                count = content.count(old)
+                raise _EditError(
+                    f"Warning: {label} appears {count} times. Please provide more context to make it unique."
+                )
+            spans.append((start, start + len(old), new))
+        
+        spans.sort()
+        for (_, prev_end, _), (start, _, _) in zip(spans, spans[1:]):
+            if start < prev_end:
+                raise _EditError("Error: edits overlap; merge them into a single edit")
+        
+        parts, pos = [], 0
+        for start, end, new in spans:
+            parts.append(content[pos:start])
+            parts.append(new)
+            pos = end
+        parts.append(content[pos:])
+        return "".join(parts)
+    
+    @staticmethod
+    def _apply_patch(content: str, patch: str) -> tuple[str, int]:
+        """Apply unified diff hunks, tolerating line offsets but not context mismatches."""
+        lines = content.splitlines(keepends=True)
+        hunks = _parse_unified_diff(patch)
+        offset = 0
+        for n, (old_start, old_lines, new_lines) in enumerate(hunks, 1):
+            size = len(old_lines)
+            expected = max(0, old_start - 1 + offset) if size else min(old_start + offset, len(lines))
+            # Search outward from the expected position for the hunk's old lines
+            found = None
+            for delta in range(len(lines) + 1):
+                for at in (expected - delta, expected + delta) if delta else (expected,):
+                    if 0 <= at <= len(lines) - size and lines[at:at + size] == old_lines:
+                        found = at
+                        break
+                if found is not None:
+                    break
+            if found is None:
+                raise _EditError(f"Error: Hunk {n} does not match the file (context or removed lines differ)")
+            lines[found:found + size] = new_lines
+            offset += (found - expected) + len(new_lines) - size
+        return "".join(lines), len(hunks)
 
 
 class ListDirTool(Tool):
     """Tool to list directory contents."""
     
+    _MAX_ENTRIES = 500
+    
     def __init__(self, allowed_dir: Path | None = None):
         self._allowed_dir = allowed_dir
 
@@ -173,7 +478,10 @@ class ListDirTool(Tool):
     
     @property
     def description(self) -> str:
-        return "List the contents of a directory."
+        return (
+            "List the contents of a directory. Set depth > 1 to list subdirectories "
+            "recursively as a tree (skips .git and .gitignored entries)."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -183,12 +491,18 @@ class ListDirTool(Tool):
                 "path": {
                     "type": "string",
                     "description": "The directory path to list"
+                },
+                "depth": {
+                    "type": "integer",
+                    "description": "How many levels to list (default 1)",
+                    "minimum": 1,
+                    "maximum": 10
                 }
             },
             "required": ["path"]
         }
     
-    async def execute(self, path: str, **kwargs: Any) -> str:
+    async def execute(self, path: str, depth: int = 1, **kwargs: Any) -> str:
         try:
             dir_path = _resolve_path(path, self._allowed_dir)
             if not dir_path.exists():
@@ -196,10 +510,13 @@ class ListDirTool(Tool):
             if not dir_path.is_dir():
                 return f"Error: Not a directory: {path}"
             
-            items = []
-            for item in sorted(dir_path.iterdir()):
-                prefix = "📁 " if item.is_dir() else "📄 "
-                items.append(f"{prefix}{item.name}")
+            if depth > 1:
+                items = await asyncio.to_thread(self._list_tree, dir_path, depth)
+            else:
+                items = []
+                for item in sorted(dir_path.iterdir()):
+                    prefix = "📁 " if item.is_dir() else "📄 "
+                    items.append(f"{prefix}{item.name}")
             
             if not items:
                 return f"Directory {path} is empty"
@@ -209,3 +526,16 @@ class ListDirTool(Tool):
             return f"Error: {e}"
         except Exception as e:
             return f"Error listing directory: {str(e)}"
+    
+    def _list_tree(self, dir_path: Path, depth: int) -> list[str]:
+        """List entries up to depth levels as an indented tree."""
+        from nanobot.agent.tools.gitignore import walk_tree
+        
+        items = []
+        for _, item, is_dir, level in walk_tree(dir_path, max_depth=depth):
+            if len(items) >= self._MAX_ENTRIES:
+                items.append(f"... (truncated at {self._MAX_ENTRIES} entries; list a subdirectory or lower depth)")
+                break
+            prefix = "📁 " if is_dir else "📄 "
+            items.append(f"{'  ' * (level - 1)}{prefix}{item.name}{'/' if is_dir else ''}")
+        return items
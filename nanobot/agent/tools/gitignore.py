@@ -0,0 +1,163 @@
+"""Minimal .gitignore matching and an ignore-aware directory walk."""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterator
+
+# Never descend into these, regardless of .gitignore
+ALWAYS_SKIP = {".git", ".hg", ".svn"}
+
+
+def translate_glob(pattern: str) -> str:
+    """Translate a gitignore-style glob ('*', '?', '[...]', '**') to a regex body."""
+    out: list[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[" and (j := pattern.find("]", i + 1)) > i + 1:
+            cls = pattern[i + 1:j]
+            if cls.startswith("!"):
+                cls = "^" + cls[1:]
+            out.append(f"[{cls}]")
+            i = j + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """
+    The .gitignore rules in effect for one directory of a walk.
+
+    Rules are matched against paths relative to the walk root; the last
+    matching rule wins, so '!' negations work as in git.
+    """
+
+    def __init__(self, rules: tuple[tuple[re.Pattern[str], bool, bool], ...] = ()):
+        self._rules = rules  # (regex, negated, dir_only)
+
+    def child(self, directory: Path, rel_dir: str) -> "IgnoreRules":
+        """Rules for a subdirectory, adding its own .gitignore if present."""
+        gitignore = directory / ".gitignore"
+        if not gitignore.is_file():
+            return self
+        try:
+            lines = gitignore.read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError:
+            return self
+
+        prefix = re.escape(rel_dir + "/") if rel_dir else ""
+        rules = list(self._rules)
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            if "/" in line:
+                # Anchored to the directory containing the .gitignore
+                body = translate_glob(line.lstrip("/"))
+            else:
+                body = "(?:.*/)?" + translate_glob(line)
+            rules.append((re.compile(f"^{prefix}{body}$"), negated, dir_only))
+        return IgnoreRules(tuple(rules))
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Check whether a root-relative posix path is ignored."""
+        result = False
+        for regex, negated, dir_only in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negated
+        return result
+
+
+def _enclosing_rules(root: Path) -> tuple[IgnoreRules, str]:
+    """
+    Collect .gitignore rules from the enclosing repository down to root's parent.
+
+    Returns the rules and root's path relative to the repository root, which
+    is the frame those rules match in. Outside a repository, root is the frame.
+    """
+    root = root.resolve()
+    chain = []
+    for parent in root.parents:
+        chain.append(parent)
+        if (parent / ".git").exists():
+            break
+    else:
+        return IgnoreRules(), ""
+    if (root / ".git").exists():
+        return IgnoreRules(), ""
+
+    repo = chain[-1]
+    rules = IgnoreRules()
+    for directory in reversed(chain):
+        rel = directory.relative_to(repo).as_posix()
+        rules = rules.child(directory, "" if rel == "." else rel)
+    return rules, root.relative_to(repo).as_posix()
+
+
+def walk_tree(
+    root: Path,
+    max_depth: int | None = None,
+    respect_gitignore: bool = True,
+) -> Iterator[tuple[str, Path, bool, int]]:
+    """
+    Walk a directory tree in sorted order, pruning ignored directories.
+
+    .gitignore files of an enclosing repository above root are honoured too.
+    Directory symlinks are not followed.
+
+    Yields:
+        (rel_path, path, is_dir, depth), rel_path relative to root and
+        depth 1 for direct children.
+    """
+    rules, base = _enclosing_rules(root) if respect_gitignore else (IgnoreRules(), "")
+
+    def _walk(directory: Path, rel_dir: str, rules: IgnoreRules, depth: int):
+        match_dir = f"{base}/{rel_dir}".strip("/")
+        if respect_gitignore:
+            rules = rules.child(directory, match_dir)
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name in ALWAYS_SKIP:
+                continue
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if respect_gitignore and rules.ignored(f"{match_dir}/{entry.name}".lstrip("/"), is_dir):
+                continue
+            yield rel, Path(entry.path), is_dir, depth
+            if is_dir and (max_depth is None or depth < max_depth):
+                yield from _walk(Path(entry.path), rel, rules, depth + 1)
+
+    yield from _walk(root, "", rules, 1)
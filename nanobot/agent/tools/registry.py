@@ -3,6 +3,8 @@
 import json
 from typing import Any
 
+from loguru import logger
+
 from nanobot.agent.tools.base import Tool
 from nanobot.agent.tracer import ToolTracer
 
@@ -16,14 +18,17 @@ class ToolRegistry:
     
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self._definitions: list[dict[str, Any]] | None = None
     
     def register(self, tool: Tool) -> None:
         """Register a tool."""
         self._tools[tool.name] = tool
+        self._definitions = None
     
     def unregister(self, name: str) -> None:
         """Unregister a tool by name."""
         self._tools.pop(name, None)
+        self._definitions = None
     
     def get(self, name: str) -> Tool | None:
         """Get a tool by name."""
@@ -34,8 +39,10 @@ class ToolRegistry:
         return name in self._tools
     
     def get_definitions(self) -> list[dict[str, Any]]:
-        """Get all tool definitions in OpenAI format."""
-        return [tool.to_schema() for tool in self._tools.values()]
+        """Get all tool definitions in OpenAI format (built once per set of tools)."""
+        if self._definitions is None:
+            self._definitions = [tool.to_schema() for tool in self._tools.values()]
+        return self._definitions
     
     async def execute(self, name: str, params: dict[str, Any]) -> str:
         """
@@ -64,6 +71,14 @@ class ToolRegistry:
                 tracer.set_result(result)
                 return result
     
+    async def close(self) -> None:
+        """Close all registered tools."""
+        for tool in self._tools.values():
+            try:
+                await tool.close()
+            except Exception as e:
+                logger.warning(f"Error closing tool {tool.name}: {e}")
+    
     @property
     def tool_names(self) -> list[str]:
         """Get list of registered tool names."""
@@ -0,0 +1,147 @@
+"""Search tool: in-process regex content search and glob file matching."""
+
+import asyncio
+import re
+from pathlib import Path
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.filesystem import _looks_binary, _resolve_path
+from nanobot.agent.tools.gitignore import translate_glob, walk_tree
+
+
+class SearchTool(Tool):
+    """Tool to find files by glob and lines by regex without spawning a shell."""
+
+    _MAX_FILE_BYTES = 5 * 1024 * 1024  # Skip content search in larger files
+    _MAX_LINE_CHARS = 300
+
+    def __init__(self, workspace: Path, allowed_dir: Path | None = None, max_results: int = 100):
+        self._workspace = workspace
+        self._allowed_dir = allowed_dir
+        self.max_results = max_results
+
+    @property
+    def name(self) -> str:
+        return "search"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Search files under a directory. Give 'pattern' (regex) to find matching lines, "
+            "'glob' (e.g. '*.py', 'src/**/*.ts') to find or filter files, or both. "
+            "Skips .git and .gitignored paths. Prefer this over grep/find via exec."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "pattern": {
+                    "type": "string",
+                    "description": "Regular expression to search for in file contents"
+                },
+                "glob": {
+                    "type": "string",
+                    "description": "Glob for file paths; without '/' it matches file names at any depth"
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Directory to search (defaults to the workspace)"
+                },
+                "case_insensitive": {
+                    "type": "boolean",
+                    "description": "Case-insensitive regex matching"
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum matches to return",
+                    "minimum": 1,
+                    "maximum": 1000
+                }
+            }
+        }
+
+    async def execute(
+        self,
+        pattern: str | None = None,
+        glob: str | None = None,
+        path: str | None = None,
+        case_insensitive: bool = False,
+        max_results: int | None = None,
+        **kwargs: Any,
+    ) -> str:
+        if not pattern and not glob:
+            return "Error: provide a regex pattern, a glob, or both"
+        try:
+            root = _resolve_path(path or str(self._workspace), self._allowed_dir)
+            if not root.is_dir():
+                return f"Error: Not a directory: {path}"
+            regex = re.compile(pattern, re.IGNORECASE if case_insensitive else 0) if pattern else None
+        except PermissionError as e:
+            return f"Error: {e}"
+        except re.error as e:
+            return f"Error: Invalid regex: {e}"
+
+        limit = max_results or self.max_results
+        try:
+            results, more = await asyncio.to_thread(self._search, root, regex, glob, limit)
+        except Exception as e:
+            return f"Error searching: {str(e)}"
+
+        if not results:
+            return "No matches found."
+        if more:
+            results.append(f"... (more than {limit} matches; narrow the search)")
+        return "\n".join(results)
+
+    def _search(
+        self,
+        root: Path,
+        regex: re.Pattern[str] | None,
+        glob: str | None,
+        limit: int,
+    ) -> tuple[list[str], bool]:
+        """Walk the tree and collect up to limit results. Runs in a worker thread."""
+        glob_rx = re.compile(translate_glob(glob.lstrip("/")) + "$") if glob else None
+        match_full_path = bool(glob and "/" in glob)
+        allowed = self._allowed_dir.resolve() if self._allowed_dir else None
+        results: list[str] = []
+
+        for rel, file_path, is_dir, _ in walk_tree(root):
+            if is_dir:
+                continue
+            if glob_rx and not glob_rx.match(rel if match_full_path else file_path.name):
+                continue
+            if allowed and file_path.is_symlink():
+                target = file_path.resolve()
+                if target != allowed and allowed not in target.parents:
+                    continue
+            if regex is None:
+                results.append(rel)
+                if len(results) > limit:
+                    return results[:limit], True
+                continue
+            for line_no, line in self._grep(file_path, regex):
+                if len(line) > self._MAX_LINE_CHARS:
+                    line = line[:self._MAX_LINE_CHARS] + "..."
+                results.append(f"{rel}:{line_no}: {line}")
+                if len(results) > limit:
+                    return results[:limit], True
+        return results, False
+
+    def _grep(self, file_path: Path, regex: re.Pattern[str]):
+        """Yield (line_no, line) for matching lines of a text file."""
+        try:
+            if file_path.stat().st_size > self._MAX_FILE_BYTES:
+                return
+            with open(file_path, "rb") as f:
+                if _looks_binary(f.read(8192)):
+                    return
+            with open(file_path, encoding="utf-8", errors="replace") as f:
+                for line_no, line in enumerate(f, 1):
+                    if regex.search(line):
+                        yield line_no, line.rstrip("\r\n").strip()
+        except OSError:
+            return
@@ -3,10 +3,109 @@
 import asyncio
 import os
 import re
+import shlex
+import signal
+import uuid
+from contextvars import ContextVar
 from pathlib import Path
 from typing import Any
 
+from loguru import logger
+
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.shell_session import ShellSessionManager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_CGROUP_FS = Path("/sys/fs/cgroup")
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _create_cgroup(memory_max_mb: int) -> Path | None:
+    """
+    Create a cgroup v2 child of our own cgroup with memory.max set.
+
+    Returns None when cgroup v2 is unavailable, not delegated to us, or the
+    memory controller is not enabled for our subtree.
+    """
+    try:
+        lines = Path("/proc/self/cgroup").read_text().splitlines()
+        rel = next(line[3:] for line in lines if line.startswith("0::"))
+        parent = _CGROUP_FS / rel.lstrip("/")
+        if not (parent / "cgroup.controllers").exists():
+            return None  # Not a cgroup v2 hierarchy
+        cg = parent / f"nanobot-exec-{uuid.uuid4().hex[:8]}"
+        cg.mkdir()
+    except Exception:
+        return None
+    try:
+        if not (cg / "memory.max").exists():
+            raise OSError("memory controller not enabled")
+        (cg / "memory.max").write_text(str(memory_max_mb * 1024 * 1024))
+        if (cg / "memory.swap.max").exists():
+            (cg / "memory.swap.max").write_text("0")
+        return cg
+    except Exception:
+        try:
+            cg.rmdir()
+        except OSError:
+            pass
+        return None
+
+
+async def _remove_cgroup(cg: Path) -> None:
+    """Kill anything left in the cgroup and remove it once it is empty."""
+    try:
+        if (cg / "cgroup.kill").exists():
+            (cg / "cgroup.kill").write_text("1")
+        for _ in range(50):
+            if "populated 0" in (cg / "cgroup.events").read_text():
+                break
+            await asyncio.sleep(0.02)
+        cg.rmdir()
+    except Exception as e:
+        logger.debug(f"Failed to remove cgroup {cg}: {e}")
+
+
+def _read_cgroup_usage(cg: Path) -> tuple[float | None, int | None]:
+    """Return (cpu_seconds, peak_rss_bytes) accounted to the cgroup."""
+    cpu_s = peak = None
+    try:
+        for line in (cg / "cpu.stat").read_text().splitlines():
+            if line.startswith("usage_usec "):
+                cpu_s = int(line.split()[1]) / 1e6
+    except Exception:
+        pass
+    try:
+        peak = int((cg / "memory.peak").read_text().strip())
+    except Exception:
+        pass
+    return cpu_s, peak
+
+
+def _group_rss(pgid: int) -> int:
+    """Sum the resident set size (bytes) of every process in a process group."""
+    total = 0
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # Fields after "(comm)": state ppid pgrp ... rss is the 22nd
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+            if int(fields[2]) == pgid:
+                total += int(fields[21]) * _PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+async def _watch_rss(pgid: int, peak: list[int], interval: float = 0.25) -> None:
+    """Sample the process group's RSS until cancelled, keeping the maximum in peak[0]."""
+    while True:
+        # The /proc scan is blocking file I/O over every process: keep it off the event loop
+        peak[0] = max(peak[0], await asyncio.to_thread(_group_rss, pgid))
+        await asyncio.sleep(interval)
 
 
 class ExecTool(Tool):
@@ -19,6 +118,14 @@ class ExecTool(Tool):
         deny_patterns: list[str] | None = None,
         allow_patterns: list[str] | None = None,
         restrict_to_workspace: bool = False,
+        cpu_time_limit: int = 0,
+        memory_limit_mb: int = 0,
+        max_open_files: int = 0,
+        max_processes: int = 0,
+        cgroup_memory_mb: int = 0,
+        report_usage: bool = True,
+        persistent_session: bool = False,
+        session_idle_timeout: int = 600,
     ):
         self.timeout = timeout
         self.working_dir = working_dir
@@ -34,6 +141,29 @@ class ExecTool(Tool):
         ]
         self.allow_patterns = allow_patterns or []
         self.restrict_to_workspace = restrict_to_workspace
+        # Resource limits (0 = unlimited), applied to the shell and inherited by its children
+        self.cpu_time_limit = cpu_time_limit
+        self.memory_limit_mb = memory_limit_mb
+        self.max_open_files = max_open_files
+        self.max_processes = max_processes
+        self.cgroup_memory_mb = cgroup_memory_mb
+        self.report_usage = report_usage
+        # Optional long-lived bash per agent session (POSIX only)
+        self.persistent_session = persistent_session and os.name == "posix"
+        # Per-task, so concurrent turns (e.g. cron jobs) don't share a shell by accident
+        self._session_key: ContextVar[str] = ContextVar("exec_session_key", default="default")
+        self._sessions = ShellSessionManager(
+            idle_timeout=session_idle_timeout,
+            preexec_fn=self._make_preexec(None) if self.persistent_session else None,
+        )
+    
+    async def close(self) -> None:
+        """Kill all persistent shell sessions."""
+        self._sessions.close_all()
+    
+    def set_context(self, session_key: str) -> None:
+        """Set the agent session whose persistent shell should be used (for the running task)."""
+        self._session_key.set(session_key)
     
     @property
     def name(self) -> str:
@@ -41,11 +171,17 @@ class ExecTool(Tool):
     
     @property
     def description(self) -> str:
+        if self.persistent_session:
+            return (
+                "Execute a shell command in a persistent bash session and return its output. "
+                "The working directory, environment variables and activated virtualenvs carry "
+                "over between calls. Use with caution."
+            )
         return "Execute a shell command and return its output. Use with caution."
     
     @property
     def parameters(self) -> dict[str, Any]:
-        return {
+        params: dict[str, Any] = {
             "type": "object",
             "properties": {
                 "command": {
@@ -59,54 +195,210 @@ class ExecTool(Tool):
             },
             "required": ["command"]
         }
+        if self.persistent_session:
+            params["properties"]["reset"] = {
+                "type": "boolean",
+                "description": "Restart the shell session (fresh cwd and environment) before running the command"
+            }
+        return params
     
-    async def execute(self, command: str, working_dir: str | None = None, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        command: str,
+        working_dir: str | None = None,
+        reset: bool = False,
+        **kwargs: Any,
+    ) -> str:
         cwd = working_dir or self.working_dir or os.getcwd()
         guard_error = self._guard_command(command, cwd)
         if guard_error:
             return guard_error
         
+        if self.persistent_session:
+            return await self._execute_in_session(command, working_dir, reset)
+        
+        cgroup = _create_cgroup(self.cgroup_memory_mb) if self.cgroup_memory_mb and os.name == "posix" else None
+        usage_before = resource.getrusage(resource.RUSAGE_CHILDREN) if resource else None
+        
         try:
+            # Own session/process group so the whole tree can be killed on timeout
             process = await asyncio.create_subprocess_shell(
                 command,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=cwd,
+                start_new_session=os.name == "posix",
+                preexec_fn=self._make_preexec(cgroup) if os.name == "posix" else None,
             )
             
+            # Without a cgroup, sample the group's RSS from /proc for the peak figure
+            peak_rss = [0]
+            watcher = None
+            if self.report_usage and not cgroup and Path("/proc/self/stat").exists():
+                watcher = asyncio.create_task(_watch_rss(process.pid, peak_rss))
+            
             try:
                 stdout, stderr = await asyncio.wait_for(
                     process.communicate(),
                     timeout=self.timeout
                 )
             except asyncio.TimeoutError:
-                process.kill()
+                await self._kill_tree(process, cgroup)
                 return f"Error: Command timed out after {self.timeout} seconds"
+            except asyncio.CancelledError:
+                await self._kill_tree(process, cgroup)
+                raise
+            finally:
+                if watcher:
+                    watcher.cancel()
             
-            output_parts = []
-            
-            if stdout:
-                output_parts.append(stdout.decode("utf-8", errors="replace"))
-            
-            if stderr:
-                stderr_text = stderr.decode("utf-8", errors="replace")
-                if stderr_text.strip():
-                    output_parts.append(f"STDERR:\n{stderr_text}")
-            
-            if process.returncode != 0:
-                output_parts.append(f"\nExit code: {process.returncode}")
-            
-            result = "\n".join(output_parts) if output_parts else "(no output)"
+            result = self._format_output(
+                stdout.decode("utf-8", errors="replace"),
+                stderr.decode("utf-8", errors="replace"),
+                process.returncode,
+            )
             
-            # Truncate very long output
-            max_len = 10000
-            if len(result) > max_len:
-                result = result[:max_len] + f"\n... (truncated, {len(result) - max_len} more chars)"
+            usage = self._format_usage(usage_before, cgroup, peak_rss[0])
+            if usage:
+                logger.debug(f"exec [{command[:80]}]: {usage}")
+                if self.report_usage:
+                    result += f"\n[{usage}]"
             
             return result
             
         except Exception as e:
             return f"Error executing command: {str(e)}"
+        finally:
+            if cgroup:
+                await _remove_cgroup(cgroup)
+
+    async def _execute_in_session(self, command: str, working_dir: str | None, reset: bool) -> str:
+        """Run a command in the persistent shell of the current agent session."""
+        key = self._session_key.get()
+        if reset:
+            self._sessions.reset(key)
+            if not command.strip():
+                return "Shell session reset."
+        
+        session = self._sessions.get(key, self.working_dir or os.getcwd())
+        if working_dir:
+            command = f"cd {shlex.quote(working_dir)} && {command}"
+        
+        async with session.lock:
+            try:
+                stdout, stderr, code = await session.run(command, self.timeout)
+            except asyncio.TimeoutError:
+                self._sessions.reset(key)
+                return f"Error: Command timed out after {self.timeout} seconds (shell session was reset)"
+            except Exception as e:
+                self._sessions.reset(key)
+                return f"Error executing command: {str(e)}"
+        
+        result = self._format_output(stdout, stderr, code)
+        if code is None:
+            result += "\n(shell exited; a new session will start on the next command)"
+        elif self.restrict_to_workspace and not self._in_workspace(session.cwd):
+            # A `cd` out of the workspace would otherwise persist into later commands
+            self._sessions.reset(key)
+            result += "\n(working directory left the workspace; shell session was reset)"
+        return result
+
+    def _in_workspace(self, path: str) -> bool:
+        workspace = Path(self.working_dir or os.getcwd()).resolve()
+        try:
+            p = Path(path).resolve()
+        except (OSError, ValueError):
+            return False
+        return p == workspace or workspace in p.parents
+
+    @staticmethod
+    def _format_output(stdout: str, stderr: str, returncode: int | None) -> str:
+        """Combine stdout, stderr and exit code into the tool result."""
+        output_parts = []
+        
+        if stdout:
+            output_parts.append(stdout)
+        
+        if stderr.strip():
+            output_parts.append(f"STDERR:\n{stderr}")
+        
+        if returncode:
+            output_parts.append(f"\nExit code: {returncode}")
+        
+        result = "\n".join(output_parts) if output_parts else "(no output)"
+        
+        # Truncate very long output
+        max_len = 10000
+        if len(result) > max_len:
+            result = result[:max_len] + f"\n... (truncated, {len(result) - max_len} more chars)"
+        
+        return result
+
+    def _make_preexec(self, cgroup: Path | None):
+        """Build the pre-exec hook that applies rlimits and joins the cgroup in the child."""
+        limits = []
+        if resource:
+            if self.cpu_time_limit:
+                limits.append((resource.RLIMIT_CPU, self.cpu_time_limit))
+            if self.memory_limit_mb:
+                limits.append((resource.RLIMIT_AS, self.memory_limit_mb * 1024 * 1024))
+            if self.max_open_files:
+                limits.append((resource.RLIMIT_NOFILE, self.max_open_files))
+            if self.max_processes and hasattr(resource, "RLIMIT_NPROC"):
+                limits.append((resource.RLIMIT_NPROC, self.max_processes))
+        if not limits and not cgroup:
+            return None
+
+        def preexec() -> None:
+            if cgroup:
+                try:
+                    (cgroup / "cgroup.procs").write_text(str(os.getpid()))
+                except OSError:
+                    pass
+            for res, value in limits:
+                _, hard = resource.getrlimit(res)
+                if hard != resource.RLIM_INFINITY:
+                    value = min(value, hard)
+                resource.setrlimit(res, (value, hard))
+
+        return preexec
+
+    @staticmethod
+    async def _kill_tree(process: asyncio.subprocess.Process, cgroup: Path | None) -> None:
+        """Kill the command's whole process group (and cgroup) and reap the shell."""
+        if cgroup and (cgroup / "cgroup.kill").exists():
+            try:
+                (cgroup / "cgroup.kill").write_text("1")
+            except OSError:
+                pass
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except (asyncio.TimeoutError, ProcessLookupError):
+            pass
+
+    @staticmethod
+    def _format_usage(before: Any, cgroup: Path | None, sampled_peak: int) -> str:
+        """Summarize CPU seconds and peak RSS used by the command."""
+        cpu_s, peak = _read_cgroup_usage(cgroup) if cgroup else (None, None)
+        if cpu_s is None and resource and before is not None:
+            # RUSAGE_CHILDREN covers every reaped child of this process, so
+            # concurrent commands can blur the figure; the cgroup path is exact.
+            after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            cpu_s = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+        peak = peak or sampled_peak
+        parts = []
+        if cpu_s is not None:
+            parts.append(f"cpu {cpu_s:.2f}s")
+        if peak:
+            parts.append(f"peak rss {peak / (1024 * 1024):.1f} MB")
+        return ", ".join(parts)
 
     def _guard_command(self, command: str, cwd: str) -> str | None:
         """Best-effort safety guard for potentially destructive commands."""
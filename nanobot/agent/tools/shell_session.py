@@ -0,0 +1,250 @@
+"""Persistent shell sessions for the exec tool."""
+
+import asyncio
+import os
+import re
+import signal
+import time
+import uuid
+from typing import Callable
+
+from loguru import logger
+
+# Per-stream output kept while waiting for a command to finish
+_MAX_BUFFER = 1024 * 1024
+
+
+class _Stream:
+    """Output collected from one file descriptor of the shell."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.dropped = 0
+        self.closed = False
+
+    def feed(self, chunk: bytes) -> None:
+        self.data += chunk
+        if len(self.data) > _MAX_BUFFER:
+            # Keep the head and the tail (where the sentinel will appear)
+            half = _MAX_BUFFER // 2
+            cut = len(self.data) - _MAX_BUFFER
+            del self.data[half:half + cut]
+            self.dropped += cut
+
+    def reset(self) -> None:
+        self.data.clear()
+        self.dropped = 0
+
+
+class ShellSession:
+    """
+    A long-lived bash process attached to a pty.
+
+    Each command is followed by a printf of a unique sentinel carrying $?
+    and the shell's working directory, on both stdout and stderr, so the
+    end of the command's output can be found without restarting the shell.
+    Commands read stdin from /dev/null, since the pty's input carries the
+    sentinels. Working directory, exported variables and activated
+    virtualenvs persist between commands.
+    """
+
+    def __init__(self, cwd: str, preexec_fn: Callable[[], None] | None = None):
+        self.cwd = cwd  # Updated to the shell's $PWD after each command
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self._preexec_fn = preexec_fn
+        self._process: asyncio.subprocess.Process | None = None
+        self._master: int | None = None
+        self._err: int | None = None
+        self._out_stream = _Stream()
+        self._err_stream = _Stream()
+        self._changed = asyncio.Event()
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self) -> None:
+        """Spawn bash with stdin/stdout on a raw pty and stderr on a pipe."""
+        import pty
+        import tty
+
+        master, slave = pty.openpty()
+        # Raw mode: no echo of our input, no line-length limit, no CRLF translation
+        tty.setraw(slave)
+        err_r, err_w = os.pipe()
+        env = {**os.environ, "TERM": "dumb", "PS1": "", "PS2": "", "HISTFILE": "/dev/null"}
+        try:
+            # stderr is not a tty, so bash runs non-interactively (no prompts, no job control)
+            self._process = await asyncio.create_subprocess_exec(
+                "bash", "--noprofile", "--norc",
+                stdin=slave,
+                stdout=slave,
+                stderr=err_w,
+                cwd=self.cwd,
+                env=env,
+                start_new_session=True,
+                preexec_fn=self._preexec_fn,
+            )
+        except Exception:
+            os.close(master)
+            os.close(err_r)
+            raise
+        finally:
+            os.close(slave)
+            os.close(err_w)
+
+        self._master, self._err = master, err_r
+        self._out_stream, self._err_stream = _Stream(), _Stream()
+        loop = asyncio.get_running_loop()
+        for fd, stream in ((master, self._out_stream), (err_r, self._err_stream)):
+            os.set_blocking(fd, False)
+            loop.add_reader(fd, self._on_readable, fd, stream)
+        logger.debug(f"Shell session started (pid {self._process.pid}, cwd {self.cwd})")
+
+    def _on_readable(self, fd: int, stream: _Stream) -> None:
+        try:
+            chunk = os.read(fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b""  # EIO once the pty slave side is closed
+        if chunk:
+            stream.feed(chunk)
+        else:
+            stream.closed = True
+            asyncio.get_running_loop().remove_reader(fd)
+        self._changed.set()
+
+    async def _write(self, data: bytes) -> None:
+        while data:
+            try:
+                n = os.write(self._master, data)
+                data = data[n:]
+            except BlockingIOError:
+                await asyncio.sleep(0.01)
+
+    async def run(self, command: str, timeout: float) -> tuple[str, str, int | None]:
+        """
+        Run a command in the session.
+
+        Returns:
+            (stdout, stderr, exit_code); exit_code is None if the shell exited.
+
+        Raises:
+            asyncio.TimeoutError: If the sentinel does not appear in time.
+        """
+        if not self.alive:
+            await self.start()
+        self.last_used = time.monotonic()
+
+        marker = f"__NANOBOT_EXIT_{uuid.uuid4().hex}_".encode()
+        out_end = re.compile(rb"\n" + re.escape(marker) + rb"(\d+) ([^\n]*)\n")
+        err_end = b"\n" + marker + b"\n"
+        self._out_stream.reset()
+        self._err_stream.reset()
+
+        m = marker.decode()
+        # A brace group runs in this shell (so `cd` persists) with stdin off the pty
+        await self._write(
+            f"{{ {command}\n}} < /dev/null\n"
+            f"printf '\\n{m}%s %s\\n' \"$?\" \"$PWD\"\nprintf '\\n{m}\\n' >&2\n".encode()
+        )
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            self._changed.clear()
+            out_match = out_end.search(self._out_stream.data)
+            err_pos = self._err_stream.data.find(err_end)
+            if out_match and err_pos >= 0:
+                stdout = self._out_stream.data[:out_match.start()]
+                stderr = self._err_stream.data[:err_pos]
+                code: int | None = int(out_match.group(1))
+                self.cwd = out_match.group(2).decode("utf-8", errors="replace")
+                break
+            if self._out_stream.closed:
+                # The command ended the shell (e.g. `exit`)
+                await self._process.wait()
+                stdout, stderr, code = self._out_stream.data, self._err_stream.data, None
+                self.close()
+                break
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            await asyncio.wait_for(self._changed.wait(), timeout=remaining)
+
+        self.last_used = time.monotonic()
+        if self._out_stream.dropped:
+            stdout = bytes(stdout) + f"\n... ({self._out_stream.dropped} bytes dropped)".encode()
+        return (
+            bytes(stdout).decode("utf-8", errors="replace"),
+            bytes(stderr).decode("utf-8", errors="replace"),
+            code,
+        )
+
+    def close(self) -> None:
+        """Kill the shell and everything it started."""
+        loop = asyncio.get_running_loop()
+        for fd in (self._master, self._err):
+            if fd is not None:
+                loop.remove_reader(fd)
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._master = self._err = None
+        if self.alive:
+            try:
+                os.killpg(self._process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self._process = None
+
+
+class ShellSessionManager:
+    """
+    Keeps one ShellSession per agent session key.
+
+    Sessions idle for longer than idle_timeout seconds are closed by a
+    background reaper, which runs only while sessions exist.
+    """
+
+    def __init__(self, idle_timeout: int = 600, preexec_fn: Callable[[], None] | None = None):
+        self.idle_timeout = idle_timeout
+        self._preexec_fn = preexec_fn
+        self._sessions: dict[str, ShellSession] = {}
+        self._reaper: asyncio.Task | None = None
+
+    def get(self, key: str, cwd: str) -> ShellSession:
+        """Get the session for a key, creating it (lazily started) if needed."""
+        session = self._sessions.get(key)
+        if session is None:
+            session = ShellSession(cwd, preexec_fn=self._preexec_fn)
+            self._sessions[key] = session
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_loop())
+        return session
+
+    def reset(self, key: str) -> bool:
+        """Close the session for a key. Returns True if one existed."""
+        session = self._sessions.pop(key, None)
+        if session:
+            session.close()
+            logger.debug(f"Shell session reset: {key}")
+        return session is not None
+
+    def close_all(self) -> None:
+        """Close all sessions."""
+        for key in list(self._sessions):
+            self.reset(key)
+
+    async def _reap_loop(self) -> None:
+        interval = max(1, min(60, self.idle_timeout // 2))
+        while self._sessions:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for key, session in list(self._sessions.items()):
+                if not session.lock.locked() and now - session.last_used > self.idle_timeout:
+                    logger.info(f"Reaping idle shell session: {key}")
+                    self.reset(key)
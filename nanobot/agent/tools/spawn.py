@@ -1,5 +1,6 @@
 """Spawn tool for creating background subagents."""
 
+from contextvars import ContextVar
 from typing import Any, TYPE_CHECKING
 
 from nanobot.agent.tools.base import Tool
@@ -18,13 +19,12 @@ class SpawnTool(Tool):
     
     def __init__(self, manager: "SubagentManager"):
         self._manager = manager
-        self._origin_channel = "cli"
-        self._origin_chat_id = "direct"
+        # Per-task, so concurrent turns (e.g. cron jobs) don't see each other's origin
+        self._origin: ContextVar[tuple[str, str]] = ContextVar("spawn_origin", default=("cli", "direct"))
     
     def set_context(self, channel: str, chat_id: str) -> None:
-        """Set the origin context for subagent announcements."""
-        self._origin_channel = channel
-        self._origin_chat_id = chat_id
+        """Set the origin context for subagent announcements (for the running task)."""
+        self._origin.set((channel, chat_id))
     
     @property
     def name(self) -> str:
@@ -35,7 +35,9 @@ class SpawnTool(Tool):
         return (
             "Spawn a subagent to handle a task in the background. "
             "Use this for complex or time-consuming tasks that can run independently. "
-            "The subagent will complete the task and report back when done."
+            "The subagent will complete the task and report back when done. "
+            "Subagents beyond the concurrency limit wait in a queue (higher priority first). "
+            "Use action 'list', 'status' or 'cancel' to manage this conversation's subagents."
         )
     
     @property
@@ -43,23 +45,72 @@ class SpawnTool(Tool):
         return {
             "type": "object",
             "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["spawn", "list", "status", "cancel"],
+                    "description": "What to do (default: spawn)",
+                },
                 "task": {
                     "type": "string",
-                    "description": "The task for the subagent to complete",
+                    "description": "The task for the subagent to complete (for spawn)",
                 },
                 "label": {
                     "type": "string",
                     "description": "Optional short label for the task (for display)",
                 },
+                "priority": {
+                    "type": "integer",
+                    "description": "Queue priority for spawn; higher starts first (default 0)",
+                    "minimum": -10,
+                    "maximum": 10,
+                },
+                "task_id": {
+                    "type": "string",
+                    "description": "Subagent ID (for status and cancel)",
+                },
             },
-            "required": ["task"],
         }
     
-    async def execute(self, task: str, label: str | None = None, **kwargs: Any) -> str:
-        """Spawn a subagent to execute the given task."""
-        return await self._manager.spawn(
-            task=task,
-            label=label,
-            origin_channel=self._origin_channel,
-            origin_chat_id=self._origin_chat_id,
-        )
+    async def execute(
+        self,
+        action: str = "spawn",
+        task: str | None = None,
+        label: str | None = None,
+        priority: int = 0,
+        task_id: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        """Spawn a subagent, or inspect or cancel this conversation's subagents."""
+        origin_channel, origin_chat_id = self._origin.get()
+        origin_key = f"{origin_channel}:{origin_chat_id}"
+        
+        if action == "spawn":
+            if not task:
+                return "Error: task is required for spawn"
+            return await self._manager.spawn(
+                task=task,
+                label=label,
+                origin_channel=origin_channel,
+                origin_chat_id=origin_chat_id,
+                priority=priority,
+            )
+        
+        if action == "list":
+            subagents = self._manager.list_subagents(origin_key)
+            if not subagents:
+                return "No subagents in this conversation."
+            return "Subagents:\n" + "\n".join(f"- {s.summary()}" for s in subagents)
+        
+        if not task_id:
+            return f"Error: task_id is required for {action}"
+        info = self._manager.get_status(task_id)
+        if not info or info.origin_key != origin_key:
+            return f"Error: Subagent {task_id} not found in this conversation"
+        
+        if action == "status":
+            return info.summary()
+        if action == "cancel":
+            if self._manager.cancel(task_id):
+                return f"Cancelled subagent {task_id}"
+            return f"Subagent {task_id} is already {info.status}"
+        return f"Error: Unknown action {action}"
@@ -60,6 +60,18 @@ class WebSearchTool(Tool):
     def __init__(self, api_key: str | None = None, max_results: int = 5):
         self.api_key = api_key or os.environ.get("BRAVE_API_KEY", "")
         self.max_results = max_results
+        self._client: httpx.AsyncClient | None = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled client, reusing connections (and TLS sessions) across calls."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=10.0)
+        return self._client
+    
+    async def close(self) -> None:
+        if self._client:
+            await self._client.aclose()
+            self._client = None
     
     async def execute(self, query: str, count: int | None = None, **kwargs: Any) -> str:
         if not self.api_key:
@@ -67,14 +79,12 @@ class WebSearchTool(Tool):
         
         try:
             n = min(max(count or self.max_results, 1), 10)
-            async with httpx.AsyncClient() as client:
-                r = await client.get(
-                    "https://api.search.brave.com/res/v1/web/search",
-                    params={"q": query, "count": n},
-                    headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
-                    timeout=10.0
-                )
-                r.raise_for_status()
+            r = await self._get_client().get(
+                "https://api.search.brave.com/res/v1/web/search",
+                params={"q": query, "count": n},
+                headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
+            )
+            r.raise_for_status()
             
             results = r.json().get("web", {}).get("results", [])
             if not results:
@@ -107,6 +117,22 @@ class WebFetchTool(Tool):
     
     def __init__(self, max_chars: int = 50000):
         self.max_chars = max_chars
+        self._client: httpx.AsyncClient | None = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled client, reusing connections across fetches."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                max_redirects=MAX_REDIRECTS,
+                timeout=30.0,
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        if self._client:
+            await self._client.aclose()
+            self._client = None
     
     async def execute(self, url: str, extractMode: str = "markdown", maxChars: int | None = None, **kwargs: Any) -> str:
         from readability import Document
@@ -119,13 +145,8 @@ class WebFetchTool(Tool):
             return json.dumps({"error": f"URL validation failed: {error_msg}", "url": url})
 
         try:
-            async with httpx.AsyncClient(
-                follow_redirects=True,
-                max_redirects=MAX_REDIRECTS,
-                timeout=30.0
-            ) as client:
-                r = await client.get(url, headers={"User-Agent": USER_AGENT})
-                r.raise_for_status()
+            r = await self._get_client().get(url, headers={"User-Agent": USER_AGENT})
+            r.raise_for_status()
             
             ctype = r.headers.get("content-type", "")
             
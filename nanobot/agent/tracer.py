@@ -16,13 +16,17 @@ XES standard fields used:
 import json
 import os
 import time
+from contextvars import ContextVar
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any
 
 # Default log directory
 _LOG_DIR: Path | None = None
 _CURRENT_CASE_ID: str | None = None
 _CURRENT_SKILL: str = "agent"
+# Per-task accumulator of case IDs and token usage (see start_run)
+_RUN_STATS: ContextVar[dict[str, Any] | None] = ContextVar("nanobot_run_stats", default=None)
 
 
 def configure(log_dir: str | Path, case_id: str | None = None, skill: str = "agent"):
@@ -44,6 +48,30 @@ def set_case_id(case_id: str):
     """Update the current case ID (e.g., for a new cycle)."""
     global _CURRENT_CASE_ID
     _CURRENT_CASE_ID = case_id
+    stats = _RUN_STATS.get()
+    if stats is not None:
+        stats["case_id"] = case_id
+
+
+def start_run() -> dict[str, Any]:
+    """
+    Start collecting the case ID and LLM token usage of the current task.
+    
+    Returns the live stats dict ({"case_id", "prompt_tokens",
+    "completion_tokens", "total_tokens"}); work awaited later in the same
+    task (or in tasks it creates) updates it.
+    """
+    stats: dict[str, Any] = {"case_id": None, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    _RUN_STATS.set(stats)
+    return stats
+
+
+def add_usage(usage: dict[str, int]):
+    """Add one LLM response's token usage to the current run, if one is being collected."""
+    stats = _RUN_STATS.get()
+    if stats is not None and usage:
+        for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            stats[key] += usage.get(key) or 0
 
 
 def _log_file() -> Path | None:
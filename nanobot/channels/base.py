@@ -1,12 +1,16 @@
 """Base channel interface for chat platforms."""
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Awaitable, Callable
 
+import httpx
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
+from nanobot.channels.coalesce import InboundCoalescer
+from nanobot.channels.ratelimit import RateLimitedError, RateLimiter
 
 
 class BaseChannel(ABC):
@@ -30,6 +34,10 @@ class BaseChannel(ABC):
         self.config = config
         self.bus = bus
         self._running = False
+        # Outbound throttling; ChannelManager replaces this with the configured limiter
+        self.rate_limiter = RateLimiter(self.name)
+        # Inbound burst merging; set by ChannelManager when enabled for this channel
+        self.coalescer: InboundCoalescer | None = None
     
     @abstractmethod
     async def start(self) -> None:
@@ -58,6 +66,67 @@ class BaseChannel(ABC):
         """
         pass
     
+    async def _send_chunks(
+        self,
+        chat_id: str,
+        chunks: list[str],
+        send: Callable[[int, str], Awaitable[None]],
+        route: str | None = None,
+        retries: int = 2,
+    ) -> int:
+        """
+        Send the chunks of a long message in order through the rate limiter.
+
+        send(index, chunk) performs one API call and raises RateLimitedError
+        when the platform throttles it. The rate-limit wait for the next
+        chunk overlaps the current chunk's request, but a chunk is only sent
+        once the previous one is accepted, so order is kept. Each chunk is
+        retried on its own, but only for throttling and transient errors
+        (see _is_retryable); a chunk that still fails is logged and skipped.
+
+        Returns the number of chunks that could not be sent.
+        """
+        limiter = self.rate_limiter
+        failed = 0
+        slot = asyncio.create_task(limiter.acquire(chat_id, route))
+        try:
+            for i, chunk in enumerate(chunks):
+                await slot
+                slot = None
+                if i + 1 < len(chunks):
+                    slot = asyncio.create_task(limiter.acquire(chat_id, route))
+                attempt = limited = 0
+                while True:
+                    try:
+                        await send(i, chunk)
+                        break
+                    except RateLimitedError as e:
+                        if limited >= limiter.max_retries:
+                            logger.error(f"{self.name}: chunk {i + 1}/{len(chunks)} to {chat_id} dropped: {e}")
+                            failed += 1
+                            break
+                        limited += 1
+                        limiter.on_rate_limited(e, chat_id, route)
+                    except Exception as e:
+                        if attempt >= retries or not self._is_retryable(e):
+                            logger.error(f"{self.name}: chunk {i + 1}/{len(chunks)} to {chat_id} failed: {e}")
+                            failed += 1
+                            break
+                        attempt += 1
+                        logger.warning(f"{self.name}: chunk {i + 1}/{len(chunks)} failed ({e}), retrying")
+                        await asyncio.sleep(attempt)
+                    await limiter.acquire(chat_id, route)
+        finally:
+            if slot:
+                slot.cancel()
+        return failed
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """Whether a failed send may succeed if repeated (network errors, 5xx)."""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        return isinstance(error, (OSError, asyncio.TimeoutError, httpx.TransportError))
+    
     def is_allowed(self, sender_id: str) -> bool:
         """
         Check if a sender is allowed to use this bot.
@@ -119,7 +188,10 @@ class BaseChannel(ABC):
             metadata=metadata or {}
         )
         
-        await self.bus.publish_inbound(msg)
+        if self.coalescer:
+            await self.coalescer.add(msg)
+        else:
+            await self.bus.publish_inbound(msg)
     
     @property
     def is_running(self) -> bool:
@@ -0,0 +1,154 @@
+"""Inbound message coalescing for rapid-fire bursts.
+
+Users often send several short messages in a row ("hey" / "quick question" /
+"what's the weather in Paris?"). Without coalescing each one becomes its own
+agent turn with the full history. The coalescer holds a sender's messages
+until the chat has been quiet for a short window (or a maximum wait has
+passed) and publishes them as one InboundMessage.
+
+This generalizes Mochat's reply_delay_mode buffering to every channel.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.bus.events import InboundMessage
+
+# Channels that batch inbound messages themselves, or where messages are not chatty
+DEFAULT_DISABLED = {"mochat", "email"}
+
+
+@dataclass
+class _Burst:
+    """Messages buffered for one sender in one chat."""
+    messages: list[InboundMessage] = field(default_factory=list)
+    first_at: float = 0.0
+    timer: asyncio.Task | None = None
+
+
+def thread_id(msg: InboundMessage) -> str:
+    """
+    The thread a message belongs to, if replies are routed by thread.
+
+    Channels set metadata["thread_id"]; Slack keeps its thread_ts in its
+    own metadata (DMs reply outside threads, so they count as one thread).
+    """
+    if tid := msg.metadata.get("thread_id"):
+        return str(tid)
+    slack = msg.metadata.get("slack") or {}
+    if slack.get("channel_type") != "im":
+        return slack.get("thread_ts") or ""
+    return ""
+
+
+def merge_messages(messages: list[InboundMessage]) -> InboundMessage:
+    """Merge a burst into one message: texts joined by newlines, media concatenated."""
+    if len(messages) == 1:
+        return messages[0]
+    last = messages[-1]
+    metadata = dict(last.metadata)
+    metadata["coalesced_count"] = len(messages)
+    metadata["coalesced_message_ids"] = [m.metadata.get("message_id") for m in messages]
+    return InboundMessage(
+        channel=last.channel,
+        sender_id=last.sender_id,
+        chat_id=last.chat_id,
+        content="\n".join(m.content for m in messages if m.content),
+        timestamp=messages[0].timestamp,
+        media=[p for m in messages for p in m.media],
+        metadata=metadata,
+    )
+
+
+class InboundCoalescer:
+    """
+    Debounces inbound messages per (chat, sender, thread).
+
+    A burst is published quiet_ms after its latest message, but never later
+    than max_wait_ms after its first one, or as soon as it holds
+    max_messages. Slash commands flush the pending burst and are published
+    on their own, so "/new" is never merged into chat text.
+
+    The cost is latency: every turn, even a single message, waits quiet_ms
+    before it reaches the agent.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[InboundMessage], Awaitable[None]],
+        quiet_ms: int = 1500,
+        max_wait_ms: int = 5000,
+        max_messages: int = 10,
+    ):
+        self.publish = publish
+        self.quiet_s = quiet_ms / 1000
+        self.max_wait_s = max(quiet_ms, max_wait_ms) / 1000
+        self.max_messages = max(1, max_messages)
+        self._bursts: dict[tuple[str, str, str], _Burst] = {}
+        self._stats = {"received": 0, "published": 0}
+
+    async def add(self, msg: InboundMessage) -> None:
+        """Buffer a message, publishing the burst when it is complete."""
+        self._stats["received"] += 1
+        key = (msg.chat_id, msg.sender_id, thread_id(msg))
+        if msg.content.startswith("/"):
+            await self.flush(key)
+            await self._publish([msg])
+            return
+
+        burst = self._bursts.get(key)
+        if burst is None:
+            burst = self._bursts[key] = _Burst(first_at=time.monotonic())
+        burst.messages.append(msg)
+        if burst.timer:
+            burst.timer.cancel()
+            burst.timer = None
+        if len(burst.messages) >= self.max_messages:
+            await self.flush(key)
+            return
+        delay = min(self.quiet_s, burst.first_at + self.max_wait_s - time.monotonic())
+        burst.timer = asyncio.create_task(self._flush_after(key, max(0.0, delay)))
+
+    async def _flush_after(self, key: tuple[str, str, str], delay: float) -> None:
+        await asyncio.sleep(delay)
+        burst = self._bursts.get(key)
+        if burst and burst.timer is asyncio.current_task():
+            burst.timer = None  # Don't let flush() cancel the task it runs in
+        await self.flush(key)
+
+    async def flush(self, key: tuple[str, str, str]) -> None:
+        """Publish the pending burst for a (chat_id, sender_id, thread) key, if any."""
+        burst = self._bursts.pop(key, None)
+        if burst is None:
+            return
+        if burst.timer:
+            burst.timer.cancel()
+        if burst.messages:
+            await self._publish(burst.messages)
+
+    def discard_all(self) -> int:
+        """Drop every pending burst (on shutdown, when nothing consumes the bus). Returns messages dropped."""
+        dropped = 0
+        for burst in self._bursts.values():
+            if burst.timer:
+                burst.timer.cancel()
+            dropped += len(burst.messages)
+        self._bursts.clear()
+        return dropped
+
+    async def _publish(self, messages: list[InboundMessage]) -> None:
+        self._stats["published"] += 1
+        if len(messages) > 1:
+            logger.debug(f"Coalesced {len(messages)} messages from {messages[-1].sender_id} in {messages[-1].chat_id}")
+        try:
+            await self.publish(merge_messages(messages))
+        except Exception as e:
+            logger.error(f"Failed to publish coalesced message: {e}")
+
+    def stats(self) -> dict[str, int]:
+        """Messages received vs. agent turns published."""
+        return {**self._stats, "pending": sum(len(b.messages) for b in self._bursts.values())}
@@ -11,6 +11,7 @@ import httpx
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.ratelimit import RateLimitedError, parse_retry_after
 from nanobot.config.schema import DingTalkConfig
 
 try:
@@ -215,8 +216,14 @@ class DingTalkChannel(BaseChannel):
             logger.warning("DingTalk HTTP client not initialized, cannot send")
             return
 
-        try:
+        async def post() -> httpx.Response:
             resp = await self._http.post(url, json=data, headers=headers)
+            if resp.status_code == 429 or "QpsLimit" in resp.text:
+                raise RateLimitedError(parse_retry_after(resp.headers) or 1.0, scope="platform")
+            return resp
+
+        try:
+            resp = await self.rate_limiter.call(msg.chat_id, post)
             if resp.status_code != 200:
                 logger.error(f"DingTalk send failed: {resp.text}")
             else:
@@ -12,7 +12,10 @@ from loguru import logger
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.markdown import DISCORD, render_chunks
+from nanobot.channels.ratelimit import RateLimitedError, parse_retry_after
 from nanobot.config.schema import DiscordConfig
+from nanobot.media import MediaTooLargeError, get_media_store
 
 
 DISCORD_API_BASE = "https://discord.com/api/v10"
@@ -73,37 +76,38 @@ class DiscordChannel(BaseChannel):
             self._http = None
 
     async def send(self, msg: OutboundMessage) -> None:
-        """Send a message through Discord REST API."""
+        """Send a message through Discord REST API, split into chunks of at most 2000 characters."""
         if not self._http:
             logger.warning("Discord HTTP client not initialized")
             return
 
         url = f"{DISCORD_API_BASE}/channels/{msg.chat_id}/messages"
-        payload: dict[str, Any] = {"content": msg.content}
-
-        if msg.reply_to:
-            payload["message_reference"] = {"message_id": msg.reply_to}
-            payload["allowed_mentions"] = {"replied_user": False}
-
         headers = {"Authorization": f"Bot {self.config.token}"}
+        # Discord rate limits per route; the channel ID is the route's major parameter
+        route = f"POST /channels/{msg.chat_id}/messages"
+        chunks = render_chunks(msg.content, DISCORD) or [msg.content]
+
+        async def post(index: int, chunk: str) -> None:
+            payload: dict[str, Any] = {"content": chunk}
+            if msg.reply_to and index == 0:
+                payload["message_reference"] = {"message_id": msg.reply_to}
+                payload["allowed_mentions"] = {"replied_user": False}
+            response = await self._http.post(url, headers=headers, json=payload)
+            self.rate_limiter.update_from_headers(response.headers, route)
+            if response.status_code == 429:
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = {}
+                raise RateLimitedError(
+                    parse_retry_after(None, data) or parse_retry_after(response.headers) or 1.0,
+                    scope="global" if data.get("global") else "route",
+                    bucket=response.headers.get("X-RateLimit-Bucket"),
+                )
+            response.raise_for_status()
 
         try:
-            for attempt in range(3):
-                try:
-                    response = await self._http.post(url, headers=headers, json=payload)
-                    if response.status_code == 429:
-                        data = response.json()
-                        retry_after = float(data.get("retry_after", 1.0))
-                        logger.warning(f"Discord rate limited, retrying in {retry_after}s")
-                        await asyncio.sleep(retry_after)
-                        continue
-                    response.raise_for_status()
-                    return
-                except Exception as e:
-                    if attempt == 2:
-                        logger.error(f"Error sending Discord message: {e}")
-                    else:
-                        await asyncio.sleep(1)
+            await self._send_chunks(msg.chat_id, chunks, post, route=route)
         finally:
             await self._stop_typing(msg.chat_id)
 
@@ -199,7 +203,7 @@ class DiscordChannel(BaseChannel):
 
         content_parts = [content] if content else []
         media_paths: list[str] = []
-        media_dir = Path.home() / ".nanobot" / "media"
+        store = get_media_store()
 
         for attachment in payload.get("attachments") or []:
             url = attachment.get("url")
@@ -211,13 +215,16 @@ class DiscordChannel(BaseChannel):
                 content_parts.append(f"[attachment: {filename} - too large]")
                 continue
             try:
-                media_dir.mkdir(parents=True, exist_ok=True)
-                file_path = media_dir / f"{attachment.get('id', 'file')}_{filename.replace('/', '_')}"
-                resp = await self._http.get(url)
-                resp.raise_for_status()
-                file_path.write_bytes(resp.content)
+                file_path = await store.download(
+                    url,
+                    suffix=Path(filename).suffix.lower(),
+                    max_bytes=MAX_ATTACHMENT_BYTES,
+                    client=self._http,
+                )
                 media_paths.append(str(file_path))
-                content_parts.append(f"[attachment: {file_path}]")
+                content_parts.append(f"[attachment: {filename} -> {file_path}]")
+            except MediaTooLargeError:
+                content_parts.append(f"[attachment: {filename} - too large]")
             except Exception as e:
                 logger.warning(f"Failed to download Discord attachment: {e}")
                 content_parts.append(f"[attachment: {filename} - download failed]")
@@ -1,18 +1,24 @@
-"""Email channel implementation using IMAP polling + SMTP replies."""
+"""Email channel implementation using IMAP IDLE/polling + SMTP replies."""
 
 import asyncio
 import html
 import imaplib
+import json
 import re
+import select
 import smtplib
 import ssl
+import threading
+import time
 from datetime import date
 from email import policy
 from email.header import decode_header, make_header
 from email.message import EmailMessage
 from email.parser import BytesParser
+from concurrent.futures import ThreadPoolExecutor
 from email.utils import parseaddr
-from typing import Any
+from pathlib import Path
+from typing import Any, Callable
 
 from loguru import logger
 
@@ -22,13 +28,130 @@ from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import EmailConfig
 
 
+class SMTPPool:
+    """
+    Small pool of logged-in SMTP connections reused across replies.
+
+    A connection idle for more than keepalive_s is probed with NOOP before
+    reuse, and one idle for more than idle_timeout_s is closed. A send that
+    fails because a reused connection went stale is retried once on a fresh
+    connection. All methods block, so call them from worker threads.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], smtplib.SMTP],
+        size: int = 2,
+        idle_timeout_s: float = 60.0,
+        keepalive_s: float = 10.0,
+    ):
+        self._connect = connect
+        self.size = max(1, size)
+        self.idle_timeout_s = idle_timeout_s
+        self.keepalive_s = keepalive_s
+        self._idle: list[tuple[smtplib.SMTP, float]] = []  # (connection, last used)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self.stats = {"connects": 0, "reused": 0, "reconnects": 0}
+
+    @staticmethod
+    def _quit(conn: smtplib.SMTP) -> None:
+        try:
+            conn.quit()
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_stale_error(e: Exception) -> bool:
+        if isinstance(e, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)):
+            return True
+        # 421: service not available, closing transmission channel
+        return isinstance(e, smtplib.SMTPResponseException) and e.smtp_code == 421
+
+    def _new(self) -> smtplib.SMTP:
+        conn = self._connect()
+        self._count("connects")
+        return conn
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _checkout(self) -> tuple[smtplib.SMTP, bool]:
+        """Take an idle connection (probing it if needed) or open a new one."""
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                self._reap_locked(now)
+                if not self._idle:
+                    break
+                conn, last_used = self._idle.pop()
+            if now - last_used < self.keepalive_s:
+                return conn, True
+            try:
+                if conn.noop()[0] == 250:
+                    return conn, True
+            except Exception:
+                pass
+            self._quit(conn)
+        return self._new(), False
+
+    def _reap_locked(self, now: float) -> None:
+        keep = []
+        for conn, last_used in self._idle:
+            if now - last_used > self.idle_timeout_s:
+                self._quit(conn)
+            else:
+                keep.append((conn, last_used))
+        self._idle = keep
+
+    def send(self, msg: EmailMessage) -> None:
+        """Send one message on a pooled connection."""
+        with self._slots:
+            conn, reused = self._checkout()
+            try:
+                conn.send_message(msg)
+                if reused:
+                    self._count("reused")
+            except Exception as e:
+                self._quit(conn)
+                if not (reused and self._is_stale_error(e)):
+                    raise
+                self._count("reconnects")
+                conn = self._new()
+                try:
+                    conn.send_message(msg)
+                except Exception:
+                    self._quit(conn)
+                    raise
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+
+    def reap(self) -> None:
+        """Close connections that exceeded the idle timeout."""
+        with self._lock:
+            self._reap_locked(time.monotonic())
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._quit(conn)
+
+
 class EmailChannel(BaseChannel):
     """
     Email channel.
 
     Inbound:
-    - Poll IMAP mailbox for unread messages.
-    - Convert each message into an inbound event.
+    - Keep one IMAP connection open and wait for new mail with IDLE
+      (or poll with a fixed interval when IDLE is unavailable).
+    - Fetch unread messages above the last processed UID in batches and
+      convert each into an inbound event.
 
     Outbound:
     - Send responses via SMTP back to the sender address.
@@ -50,16 +173,33 @@ class EmailChannel(BaseChannel):
         "Dec",
     )
 
-    def __init__(self, config: EmailConfig, bus: MessageBus):
+    def __init__(self, config: EmailConfig, bus: MessageBus, state_path: Path | None = None):
         super().__init__(config, bus)
         self.config: EmailConfig = config
         self._last_subject_by_chat: dict[str, str] = {}
         self._last_message_id_by_chat: dict[str, str] = {}
-        self._processed_uids: set[str] = set()  # Capped to prevent unbounded growth
-        self._MAX_PROCESSED_UIDS = 100000
+        # Persistent IMAP connection, used from worker threads under _imap_lock
+        self._imap: imaplib.IMAP4 | None = None
+        self._imap_lock = threading.Lock()
+        self._idle_supported = False
+        # Last processed UID per mailbox, valid while the mailbox UIDVALIDITY is unchanged
+        self._state_path = state_path or Path.home() / ".nanobot" / "email" / "state.json"
+        self._uidvalidity = 0
+        self._last_uid = 0
+        self._load_state()
+        # Outbound: pooled SMTP connections on a bounded set of sender threads
+        self._smtp_pool = SMTPPool(
+            self._smtp_connect,
+            size=config.smtp_pool_size,
+            idle_timeout_s=config.smtp_idle_timeout,
+        )
+        self._smtp_executor = ThreadPoolExecutor(
+            max_workers=self._smtp_pool.size, thread_name_prefix="email-smtp"
+        )
+        self._smtp_stopped = False
 
     async def start(self) -> None:
-        """Start polling IMAP for inbound emails."""
+        """Start receiving inbound emails (IMAP IDLE push, falling back to polling)."""
         if not self.config.consent_granted:
             logger.warning(
                 "Email channel disabled: consent_granted is false. "
@@ -71,36 +211,52 @@ class EmailChannel(BaseChannel):
             return
 
         self._running = True
-        logger.info("Starting Email channel (IMAP polling mode)...")
+        logger.info("Starting Email channel (IMAP)...")
 
         poll_seconds = max(5, int(self.config.poll_interval_seconds))
-        while self._running:
-            try:
-                inbound_items = await asyncio.to_thread(self._fetch_new_messages)
-                for item in inbound_items:
-                    sender = item["sender"]
-                    subject = item.get("subject", "")
-                    message_id = item.get("message_id", "")
-
-                    if subject:
-                        self._last_subject_by_chat[sender] = subject
-                    if message_id:
-                        self._last_message_id_by_chat[sender] = message_id
-
-                    await self._handle_message(
-                        sender_id=sender,
-                        chat_id=sender,
-                        content=item["content"],
-                        metadata=item.get("metadata", {}),
-                    )
-            except Exception as e:
-                logger.error(f"Email polling error: {e}")
-
-            await asyncio.sleep(poll_seconds)
+        backoff = 5
+        try:
+            while self._running:
+                try:
+                    inbound_items = await asyncio.to_thread(self._fetch_new_messages)
+                    for item in inbound_items:
+                        sender = item["sender"]
+                        subject = item.get("subject", "")
+                        message_id = item.get("message_id", "")
+
+                        if subject:
+                            self._last_subject_by_chat[sender] = subject
+                        if message_id:
+                            self._last_message_id_by_chat[sender] = message_id
+
+                        await self._handle_message(
+                            sender_id=sender,
+                            chat_id=sender,
+                            content=item["content"],
+                            metadata=item.get("metadata", {}),
+                        )
+                    backoff = 5
+                    await asyncio.get_running_loop().run_in_executor(self._smtp_executor, self._smtp_pool.reap)
+
+                    if self.config.imap_idle and self._idle_supported:
+                        await asyncio.to_thread(self._idle, max(30, int(self.config.imap_idle_timeout)))
+                    else:
+                        await asyncio.sleep(poll_seconds)
+                except Exception as e:
+                    logger.error(f"Email IMAP error: {e}; reconnecting in {backoff}s")
+                    await asyncio.to_thread(self._disconnect)
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 300)
+        finally:
+            self._running = False  # Also ends an IDLE still running in its worker thread
+            await asyncio.to_thread(self._disconnect)
 
     async def stop(self) -> None:
-        """Stop polling loop."""
+        """Stop the receive loop (an active IDLE returns within a second) and close SMTP connections."""
         self._running = False
+        self._smtp_stopped = True
+        await asyncio.get_running_loop().run_in_executor(self._smtp_executor, self._smtp_pool.close)
+        self._smtp_executor.shutdown(wait=False)
 
     async def send(self, msg: OutboundMessage) -> None:
         """Send email via SMTP."""
@@ -141,7 +297,12 @@ class EmailChannel(BaseChannel):
             email_msg["References"] = in_reply_to
 
         try:
-            await asyncio.to_thread(self._smtp_send, email_msg)
+            await self.rate_limiter.acquire(to_addr)
+            if self._smtp_stopped:
+                # A send still draining from the outbound lanes after stop()
+                logger.warning(f"Email channel stopped, dropping reply to {to_addr}")
+                return
+            await asyncio.get_running_loop().run_in_executor(self._smtp_executor, self._smtp_send, email_msg)
         except Exception as e:
             logger.error(f"Error sending email to {to_addr}: {e}")
             raise
@@ -167,31 +328,248 @@ class EmailChannel(BaseChannel):
         return True
 
     def _smtp_send(self, msg: EmailMessage) -> None:
+        self._smtp_pool.send(msg)
+
+    def _smtp_connect(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP connection."""
         timeout = 30
         if self.config.smtp_use_ssl:
-            with smtplib.SMTP_SSL(
-                self.config.smtp_host,
-                self.config.smtp_port,
-                timeout=timeout,
-            ) as smtp:
-                smtp.login(self.config.smtp_username, self.config.smtp_password)
-                smtp.send_message(msg)
-            return
-
-        with smtplib.SMTP(self.config.smtp_host, self.config.smtp_port, timeout=timeout) as smtp:
-            if self.config.smtp_use_tls:
+            smtp = smtplib.SMTP_SSL(self.config.smtp_host, self.config.smtp_port, timeout=timeout)
+        else:
+            smtp = smtplib.SMTP(self.config.smtp_host, self.config.smtp_port, timeout=timeout)
+        try:
+            if self.config.smtp_use_tls and not self.config.smtp_use_ssl:
                 smtp.starttls(context=ssl.create_default_context())
             smtp.login(self.config.smtp_username, self.config.smtp_password)
-            smtp.send_message(msg)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    # ---- IMAP connection ------------------------------------------------------
+
+    def _open_imap(self) -> imaplib.IMAP4:
+        """Open, log in and select the configured mailbox."""
+        if self.config.imap_use_ssl:
+            client = imaplib.IMAP4_SSL(self.config.imap_host, self.config.imap_port, timeout=60)
+        else:
+            client = imaplib.IMAP4(self.config.imap_host, self.config.imap_port, timeout=60)
+        try:
+            client.login(self.config.imap_username, self.config.imap_password)
+            status, _ = client.select(self.config.imap_mailbox or "INBOX")
+            if status != "OK":
+                raise imaplib.IMAP4.error(f"cannot select mailbox {self.config.imap_mailbox}")
+        except Exception:
+            try:
+                client.logout()
+            except Exception:
+                pass
+            raise
+        return client
+
+    def _connect(self) -> imaplib.IMAP4:
+        """Return the persistent connection, opening it if needed."""
+        if self._imap is not None:
+            return self._imap
+        client = self._open_imap()
+        self._idle_supported = "IDLE" in client.capabilities
+        _, data = client.response("UIDVALIDITY")
+        uidvalidity = int(data[-1]) if data and data[-1] else 0
+        if uidvalidity != self._uidvalidity:
+            if self._uidvalidity:
+                logger.warning("Email mailbox UIDVALIDITY changed, resetting processed UID watermark")
+            self._uidvalidity = uidvalidity
+            self._last_uid = 0
+            self._save_state()
+        # SELECT's EXISTS/RECENT are counts, not new mail; we fetch right after connecting anyway
+        client.untagged_responses.pop("EXISTS", None)
+        client.untagged_responses.pop("RECENT", None)
+        self._imap = client
+        logger.info(f"Email IMAP connected ({'IDLE' if self._idle_supported else 'polling'} mode)")
+        return client
+
+    def _disconnect(self) -> None:
+        with self._imap_lock:
+            client, self._imap = self._imap, None
+        if client is None:
+            return
+        try:
+            client.logout()
+        except Exception:
+            pass
+
+    def _idle(self, timeout: float) -> bool:
+        """
+        Block in IMAP IDLE until the mailbox changes, timeout passes or the channel stops.
+
+        Returns True if the server reported new messages.
+        """
+        with self._imap_lock:
+            return self._idle_locked(self._connect(), timeout)
+
+    @staticmethod
+    def _is_new_mail(line: bytes) -> bool:
+        return line.rstrip().upper().endswith((b"EXISTS", b"RECENT"))
+
+    @staticmethod
+    def _has_input(client: imaplib.IMAP4) -> bool:
+        """
+        Whether a line can be read without waiting.
+
+        imaplib reads through a buffered file, so data may already sit in its
+        buffer (e.g. an EXISTS that arrived with the IDLE continuation) while
+        the socket itself is not readable. Peek at the buffer with the socket
+        briefly non-blocking, which also pulls in anything the socket has.
+        """
+        sock = client.sock
+        timeout = sock.gettimeout()
+        sock.settimeout(0)
+        try:
+            return bool(client.file.peek(1))
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return False
+        finally:
+            sock.settimeout(timeout)
+
+    def _idle_locked(self, client: imaplib.IMAP4, timeout: float) -> bool:
+        # New mail reported while we ran SEARCH/FETCH/STORE: no need to wait for it
+        pending = [client.untagged_responses.pop(k, None) for k in ("EXISTS", "RECENT")]
+        if any(pending):
+            return True
+
+        tag = client._new_tag()
+        client.send(tag + b" IDLE\r\n")
+        line = client.readline()
+        if not line.startswith(b"+"):
+            raise imaplib.IMAP4.error(f"IDLE rejected: {line!r}")
+
+        changed = False
+        deadline = time.monotonic() + timeout
+        while self._running and not changed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if not self._has_input(client):
+                readable, _, _ = select.select([client.sock], [], [], min(remaining, 1.0))
+                if not readable:
+                    continue
+            line = client.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("connection closed during IDLE")
+            changed = self._is_new_mail(line)
+
+        client.send(b"DONE\r\n")
+        while True:
+            line = client.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("connection closed during IDLE")
+            if line.startswith(tag):
+                if not line[len(tag):].strip().upper().startswith(b"OK"):
+                    raise imaplib.IMAP4.error(f"IDLE failed: {line!r}")
+                return changed
+            changed = changed or self._is_new_mail(line)
+
+    # ---- UID watermark ----------------------------------------------------------
+
+    def _state_key(self) -> str:
+        return f"{self.config.imap_username}@{self.config.imap_host}/{self.config.imap_mailbox or 'INBOX'}"
+
+    def _load_state(self) -> None:
+        try:
+            data = json.loads(self._state_path.read_text(encoding="utf-8"))
+            entry = data.get(self._state_key()) or {}
+            self._uidvalidity = int(entry.get("uidvalidity", 0))
+            self._last_uid = int(entry.get("last_uid", 0))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable email state {self._state_path}: {e}")
+
+    def _save_state(self) -> None:
+        try:
+            data = json.loads(self._state_path.read_text(encoding="utf-8"))
+        except Exception:
+            data = {}
+        data[self._state_key()] = {"uidvalidity": self._uidvalidity, "last_uid": self._last_uid}
+        self._state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp.replace(self._state_path)
+
+    # ---- Fetching ---------------------------------------------------------------
+
+    _FETCH_BATCH = 50  # UIDs per FETCH command
+
+    @staticmethod
+    def _uid_set(uids: list[int]) -> str:
+        """Compress sorted UIDs into an IMAP sequence set, e.g. "3:5,9"."""
+        ranges: list[str] = []
+        start = prev = uids[0]
+        for uid in uids[1:]:
+            if uid == prev + 1:
+                prev = uid
+                continue
+            ranges.append(f"{start}:{prev}" if start != prev else str(start))
+            start = prev = uid
+        ranges.append(f"{start}:{prev}" if start != prev else str(start))
+        return ",".join(ranges)
+
+    def _uid_fetch(self, client: imaplib.IMAP4, uids: list[int]) -> list[tuple[int, bytes]]:
+        """Fetch full messages for UIDs in batches. Returns (uid, raw bytes) in UID order."""
+        results: list[tuple[int, bytes]] = []
+        for i in range(0, len(uids), self._FETCH_BATCH):
+            batch = uids[i:i + self._FETCH_BATCH]
+            status, fetched = client.uid("FETCH", self._uid_set(batch), "(UID BODY.PEEK[])")
+            if status != "OK":
+                # Raise rather than skip, so the batch is retried instead of passed by the watermark
+                raise imaplib.IMAP4.error(f"UID FETCH failed: {status} {fetched!r}")
+            for item in fetched:
+                if not (isinstance(item, tuple) and len(item) >= 2):
+                    continue
+                uid = self._extract_uid([item])
+                if uid and isinstance(item[1], (bytes, bytearray)):
+                    results.append((int(uid), bytes(item[1])))
+        results.sort(key=lambda r: r[0])
+        return results
 
     def _fetch_new_messages(self) -> list[dict[str, Any]]:
-        """Poll IMAP and return parsed unread messages."""
-        return self._fetch_messages(
-            search_criteria=("UNSEEN",),
-            mark_seen=self.config.mark_seen,
-            dedupe=True,
-            limit=0,
-        )
+        """Return parsed unread messages above the processed-UID watermark."""
+        with self._imap_lock:
+            return self._fetch_new_locked(self._connect())
+
+    def _fetch_new_locked(self, client: imaplib.IMAP4) -> list[dict[str, Any]]:
+        criteria = ["UNSEEN"]
+        if self._last_uid:
+            criteria = [f"UID {self._last_uid + 1}:*", "UNSEEN"]
+        status, data = client.uid("SEARCH", None, *criteria)
+        if status != "OK" or not data or not data[0]:
+            return []
+        # "n:*" always matches the highest UID, even when it is below n
+        uids = sorted(u for u in (int(x) for x in data[0].split()) if u > self._last_uid)
+        if not uids:
+            return []
+
+        messages: list[dict[str, Any]] = []
+        fetched = self._uid_fetch(client, uids)
+        for uid, raw_bytes in fetched:
+            item = self._parse_message(raw_bytes, str(uid))
+            if item:
+                messages.append(item)
+
+        # Only advance over UIDs that were actually fetched, so none is skipped
+        done = {uid for uid, _ in fetched}
+        processed = []
+        for uid in uids:
+            if uid not in done:
+                break
+            processed.append(uid)
+        if not processed:
+            return messages
+        if self.config.mark_seen:
+            client.uid("STORE", self._uid_set(processed), "+FLAGS", "(\\Seen)")
+        self._last_uid = processed[-1]
+        self._save_state()
+        return messages
 
     def fetch_messages_between_dates(
         self,
@@ -214,107 +592,69 @@ class EmailChannel(BaseChannel):
                 "BEFORE",
                 self._format_imap_date(end_date),
             ),
-            mark_seen=False,
-            dedupe=False,
             limit=max(1, int(limit)),
         )
 
-    def _fetch_messages(
-        self,
-        search_criteria: tuple[str, ...],
-        mark_seen: bool,
-        dedupe: bool,
-        limit: int,
-    ) -> list[dict[str, Any]]:
-        """Fetch messages by arbitrary IMAP search criteria."""
-        messages: list[dict[str, Any]] = []
-        mailbox = self.config.imap_mailbox or "INBOX"
-
-        if self.config.imap_use_ssl:
-            client = imaplib.IMAP4_SSL(self.config.imap_host, self.config.imap_port)
-        else:
-            client = imaplib.IMAP4(self.config.imap_host, self.config.imap_port)
-
+    def _fetch_messages(self, search_criteria: tuple[str, ...], limit: int) -> list[dict[str, Any]]:
+        """Fetch messages by arbitrary IMAP search criteria on a one-off connection."""
+        client = self._open_imap()
         try:
-            client.login(self.config.imap_username, self.config.imap_password)
-            status, _ = client.select(mailbox)
-            if status != "OK":
-                return messages
-
-            status, data = client.search(None, *search_criteria)
-            if status != "OK" or not data:
-                return messages
-
-            ids = data[0].split()
-            if limit > 0 and len(ids) > limit:
-                ids = ids[-limit:]
-            for imap_id in ids:
-                status, fetched = client.fetch(imap_id, "(BODY.PEEK[] UID)")
-                if status != "OK" or not fetched:
-                    continue
-
-                raw_bytes = self._extract_message_bytes(fetched)
-                if raw_bytes is None:
-                    continue
-
-                uid = self._extract_uid(fetched)
-                if dedupe and uid and uid in self._processed_uids:
-                    continue
-
-                parsed = BytesParser(policy=policy.default).parsebytes(raw_bytes)
-                sender = parseaddr(parsed.get("From", ""))[1].strip().lower()
-                if not sender:
-                    continue
-
-                subject = self._decode_header_value(parsed.get("Subject", ""))
-                date_value = parsed.get("Date", "")
-                message_id = parsed.get("Message-ID", "").strip()
-                body = self._extract_text_body(parsed)
-
-                if not body:
-                    body = "(empty email body)"
-
-                body = body[: self.config.max_body_chars]
-                content = (
-                    f"Email received.\n"
-                    f"From: {sender}\n"
-                    f"Subject: {subject}\n"
-                    f"Date: {date_value}\n\n"
-                    f"{body}"
-                )
-
-                metadata = {
-                    "message_id": message_id,
-                    "subject": subject,
-                    "date": date_value,
-                    "sender_email": sender,
-                    "uid": uid,
-                }
-                messages.append(
-                    {
-                        "sender": sender,
-                        "subject": subject,
-                        "message_id": message_id,
-                        "content": content,
-                        "metadata": metadata,
-                    }
-                )
-
-                if dedupe and uid:
-                    self._processed_uids.add(uid)
-                    # mark_seen is the primary dedup; this set is a safety net
-                    if len(self._processed_uids) > self._MAX_PROCESSED_UIDS:
-                        self._processed_uids.clear()
-
-                if mark_seen:
-                    client.store(imap_id, "+FLAGS", "\\Seen")
+            status, data = client.uid("SEARCH", None, *search_criteria)
+            if status != "OK" or not data or not data[0]:
+                return []
+            uids = sorted(int(x) for x in data[0].split())
+            if limit > 0 and len(uids) > limit:
+                uids = uids[-limit:]
+            messages = []
+            for uid, raw_bytes in self._uid_fetch(client, uids):
+                item = self._parse_message(raw_bytes, str(uid))
+                if item:
+                    messages.append(item)
+            return messages
         finally:
             try:
                 client.logout()
             except Exception:
                 pass
 
-        return messages
+    def _parse_message(self, raw_bytes: bytes, uid: str) -> dict[str, Any] | None:
+        """Turn a raw RFC 822 message into an inbound item (None if it has no sender)."""
+        parsed = BytesParser(policy=policy.default).parsebytes(raw_bytes)
+        sender = parseaddr(parsed.get("From", ""))[1].strip().lower()
+        if not sender:
+            return None
+
+        subject = self._decode_header_value(parsed.get("Subject", ""))
+        date_value = parsed.get("Date", "")
+        message_id = parsed.get("Message-ID", "").strip()
+        body = self._extract_text_body(parsed)
+
+        if not body:
+            body = "(empty email body)"
+
+        body = body[: self.config.max_body_chars]
+        content = (
+            f"Email received.\n"
+            f"From: {sender}\n"
+            f"Subject: {subject}\n"
+            f"Date: {date_value}\n\n"
+            f"{body}"
+        )
+
+        metadata = {
+            "message_id": message_id,
+            "subject": subject,
+            "date": date_value,
+            "sender_email": sender,
+            "uid": uid,
+        }
+        return {
+            "sender": sender,
+            "subject": subject,
+            "message_id": message_id,
+            "content": content,
+            "metadata": metadata,
+        }
 
     @classmethod
     def _format_imap_date(cls, value: date) -> str:
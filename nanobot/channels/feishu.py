@@ -2,9 +2,9 @@
 
 import asyncio
 import json
-import re
 import threading
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from loguru import logger
@@ -12,6 +12,8 @@ from loguru import logger
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.markdown import FEISHU, render_chunks, to_feishu_elements
+from nanobot.channels.ratelimit import RateLimitedError, parse_retry_after
 from nanobot.config.schema import FeishuConfig
 
 try:
@@ -30,6 +32,11 @@ except ImportError:
     lark = None
     Emoji = None
 
+# Open API error code for "request trigger frequency limit"
+FEISHU_RATE_LIMIT_CODE = 99991400
+# Threads for blocking Open API calls (sends, reactions); bounds concurrent HTTPS requests
+FEISHU_API_WORKERS = 4
+
 # Message type display mapping
 MSG_TYPE_MAP = {
     "image": "[image]",
@@ -61,6 +68,7 @@ class FeishuChannel(BaseChannel):
         self._ws_thread: threading.Thread | None = None
         self._processed_message_ids: OrderedDict[str, None] = OrderedDict()  # Ordered dedup cache
         self._loop: asyncio.AbstractEventLoop | None = None
+        self._executor: ThreadPoolExecutor | None = None
     
     async def start(self) -> None:
         """Start the Feishu bot with WebSocket long connection."""
@@ -74,6 +82,9 @@ class FeishuChannel(BaseChannel):
         
         self._running = True
         self._loop = asyncio.get_running_loop()
+        # The Lark SDK is synchronous (including tenant token refresh), so API
+        # calls run on a small dedicated pool instead of the event loop
+        self._executor = ThreadPoolExecutor(max_workers=FEISHU_API_WORKERS, thread_name_prefix="feishu-api")
         
         # Create Lark client for sending messages
         self._client = lark.Client.builder() \
@@ -126,6 +137,9 @@ class FeishuChannel(BaseChannel):
                 self._ws_client.stop()
             except Exception as e:
                 logger.warning(f"Error stopping WebSocket client: {e}")
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
         logger.info("Feishu bot stopped")
     
     def _add_reaction_sync(self, message_id: str, emoji_type: str) -> None:
@@ -157,86 +171,13 @@ class FeishuChannel(BaseChannel):
         if not self._client or not Emoji:
             return
         
+        await self._run_api(self._add_reaction_sync, message_id, emoji_type)
+    
+    async def _run_api(self, fn, *args):
+        """Run a blocking Open API call on the Feishu worker pool."""
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self._add_reaction_sync, message_id, emoji_type)
+        return await loop.run_in_executor(self._executor, fn, *args)
     
-    # Regex to match markdown tables (header + separator + data rows)
-    _TABLE_RE = re.compile(
-        r"((?:^[ \t]*\|.+\|[ \t]*\n)(?:^[ \t]*\|[-:\s|]+\|[ \t]*\n)(?:^[ \t]*\|.+\|[ \t]*\n?)+)",
-        re.MULTILINE,
-    )
-
-    _HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$", re.MULTILINE)
-
-    _CODE_BLOCK_RE = re.compile(r"(```[\s\S]*?```)", re.MULTILINE)
-
-    @staticmethod
-    def _parse_md_table(table_text: str) -> dict | None:
-        """Parse a markdown table into a Feishu table element."""
-        lines = [l.strip() for l in table_text.strip().split("\n") if l.strip()]
-        if len(lines) < 3:
-            return None
-        split = lambda l: [c.strip() for c in l.strip("|").split("|")]
-        headers = split(lines[0])
-        rows = [split(l) for l in lines[2:]]
-        columns = [{"tag": "column", "name": f"c{i}", "display_name": h, "width": "auto"}
-                   for i, h in enumerate(headers)]
-        return {
-            "tag": "table",
-            "page_size": len(rows) + 1,
-            "columns": columns,
-            "rows": [{f"c{i}": r[i] if i < len(r) else "" for i in range(len(headers))} for r in rows],
-        }
-
-    def _build_card_elements(self, content: str) -> list[dict]:
-        """Split content into div/markdown + table elements for Feishu card."""
-        elements, last_end = [], 0
-        for m in self._TABLE_RE.finditer(content):
-            before = content[last_end:m.start()]
-            if before.strip():
-                elements.extend(self._split_headings(before))
-            elements.append(self._parse_md_table(m.group(1)) or {"tag": "markdown", "content": m.group(1)})
-            last_end = m.end()
-        remaining = content[last_end:]
-        if remaining.strip():
-            elements.extend(self._split_headings(remaining))
-        return elements or [{"tag": "markdown", "content": content}]
-
-    def _split_headings(self, content: str) -> list[dict]:
-        """Split content by headings, converting headings to div elements."""
-        protected = content
-        code_blocks = []
-        for m in self._CODE_BLOCK_RE.finditer(content):
-            code_blocks.append(m.group(1))
-            protected = protected.replace(m.group(1), f"\x00CODE{len(code_blocks)-1}\x00", 1)
-
-        elements = []
-        last_end = 0
-        for m in self._HEADING_RE.finditer(protected):
-            before = protected[last_end:m.start()].strip()
-            if before:
-                elements.append({"tag": "markdown", "content": before})
-            level = len(m.group(1))
-            text = m.group(2).strip()
-            elements.append({
-                "tag": "div",
-                "text": {
-                    "tag": "lark_md",
-                    "content": f"**{text}**",
-                },
-            })
-            last_end = m.end()
-        remaining = protected[last_end:].strip()
-        if remaining:
-            elements.append({"tag": "markdown", "content": remaining})
-
-        for i, cb in enumerate(code_blocks):
-            for el in elements:
-                if el.get("tag") == "markdown":
-                    el["content"] = el["content"].replace(f"\x00CODE{i}\x00", cb)
-
-        return elements or [{"tag": "markdown", "content": content}]
-
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through Feishu."""
         if not self._client:
@@ -251,33 +192,35 @@ class FeishuChannel(BaseChannel):
             else:
                 receive_id_type = "open_id"
             
-            # Build card with markdown + table support
-            elements = self._build_card_elements(msg.content)
-            card = {
-                "config": {"wide_screen_mode": True},
-                "elements": elements,
-            }
-            content = json.dumps(card, ensure_ascii=False)
+            # Split at block boundaries (card JSON is capped at 30 KB), one card per chunk
+            chunks = render_chunks(msg.content, FEISHU) or [msg.content]
             
-            request = CreateMessageRequest.builder() \
-                .receive_id_type(receive_id_type) \
-                .request_body(
-                    CreateMessageRequestBody.builder()
-                    .receive_id(msg.chat_id)
-                    .msg_type("interactive")
-                    .content(content)
-                    .build()
-                ).build()
-            
-            response = self._client.im.v1.message.create(request)
+            async def create(index: int, chunk: str) -> None:
+                card = {
+                    "config": {"wide_screen_mode": True},
+                    "elements": to_feishu_elements(chunk),
+                }
+                request = CreateMessageRequest.builder() \
+                    .receive_id_type(receive_id_type) \
+                    .request_body(
+                        CreateMessageRequestBody.builder()
+                        .receive_id(msg.chat_id)
+                        .msg_type("interactive")
+                        .content(json.dumps(card, ensure_ascii=False))
+                        .build()
+                    ).build()
+                response = await self._run_api(self._client.im.v1.message.create, request)
+                if response.code == FEISHU_RATE_LIMIT_CODE or (response.raw and response.raw.status_code == 429):
+                    headers = response.raw.headers if response.raw else None
+                    raise RateLimitedError(parse_retry_after(headers) or 1.0)
+                if not response.success():
+                    raise RuntimeError(
+                        f"code={response.code}, msg={response.msg}, log_id={response.get_log_id()}"
+                    )
             
-            if not response.success():
-                logger.error(
-                    f"Failed to send Feishu message: code={response.code}, "
-                    f"msg={response.msg}, log_id={response.get_log_id()}"
-                )
-            else:
-                logger.debug(f"Feishu message sent to {msg.chat_id}")
+            failed = await self._send_chunks(msg.chat_id, chunks, create)
+            if not failed:
+                logger.debug(f"Feishu message sent to {msg.chat_id} in {len(chunks)} part(s)")
                 
         except Exception as e:
             logger.error(f"Error sending Feishu message: {e}")
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+from collections import deque
 from typing import Any
 
 from loguru import logger
@@ -10,6 +11,10 @@ from loguru import logger
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.coalesce import DEFAULT_DISABLED, InboundCoalescer
+from nanobot.channels.ratelimit import (
+    DEFAULT_LIMITS, PLATFORM_LIMITS, RateLimit, RateLimiter, TokenBucket,
+)
 from nanobot.config.schema import Config
 
 
@@ -28,8 +33,13 @@ class ChannelManager:
         self.bus = bus
         self.channels: dict[str, BaseChannel] = {}
         self._dispatch_task: asyncio.Task | None = None
+        # Per-chat send lanes: a throttled chat must not hold up the others
+        self._lanes: dict[tuple[str, str], deque[OutboundMessage]] = {}
+        self._lane_tasks: set[asyncio.Task] = set()
         
         self._init_channels()
+        self._init_rate_limits()
+        self._init_coalescing()
     
     def _init_channels(self) -> None:
         """Initialize channels based on config."""
@@ -39,9 +49,7 @@ class ChannelManager:
             try:
                 from nanobot.channels.telegram import TelegramChannel
                 self.channels["telegram"] = TelegramChannel(
-                    self.config.channels.telegram,
-                    self.bus,
-                    groq_api_key=self.config.providers.groq.api_key,
+                    self.config.channels.telegram, self.bus
                 )
                 logger.info("Telegram channel enabled")
             except ImportError as e:
@@ -137,6 +145,51 @@ class ChannelManager:
             except ImportError as e:
                 logger.warning(f"QQ channel not available: {e}")
     
+    def _init_rate_limits(self) -> None:
+        """Give every channel a rate limiter sharing one global bucket."""
+        cfg = self.config.channels.rate_limit
+        global_bucket = TokenBucket(cfg.global_rate, cfg.global_rate)
+        for name, channel in self.channels.items():
+            default_platform, default_chat = PLATFORM_LIMITS.get(name, DEFAULT_LIMITS)
+            override = cfg.channels.get(name)
+            platform_limit, chat_limit = default_platform, default_chat
+            if override:
+                platform_limit = RateLimit(
+                    override.rate or default_platform.rate,
+                    override.burst or override.rate or default_platform.burst,
+                )
+                chat_limit = RateLimit(
+                    override.chat_rate or default_chat.rate,
+                    override.chat_burst or default_chat.burst,
+                )
+            channel.rate_limiter = RateLimiter(
+                name,
+                platform_limit=platform_limit,
+                chat_limit=chat_limit,
+                global_bucket=global_bucket,
+                max_retries=cfg.max_retries,
+                enabled=cfg.enabled,
+            )
+    
+    def _init_coalescing(self) -> None:
+        """Give channels an inbound coalescer so message bursts become one agent turn."""
+        cfg = self.config.channels.coalesce
+        for name, channel in self.channels.items():
+            enabled = cfg.enabled and name not in DEFAULT_DISABLED
+            quiet_ms, max_wait_ms = cfg.quiet_ms, cfg.max_wait_ms
+            if override := cfg.channels.get(name):
+                if override.enabled is not None:
+                    enabled = override.enabled
+                quiet_ms = override.quiet_ms if override.quiet_ms is not None else quiet_ms
+                max_wait_ms = override.max_wait_ms if override.max_wait_ms is not None else max_wait_ms
+            if enabled:
+                channel.coalescer = InboundCoalescer(
+                    self.bus.publish_inbound,
+                    quiet_ms=quiet_ms,
+                    max_wait_ms=max_wait_ms,
+                    max_messages=cfg.max_messages,
+                )
+    
     async def _start_channel(self, name: str, channel: BaseChannel) -> None:
         """Start a channel and log any exceptions."""
         try:
@@ -173,6 +226,24 @@ class ChannelManager:
                 await self._dispatch_task
             except asyncio.CancelledError:
                 pass
+        for task in list(self._lane_tasks):
+            task.cancel()
+        for name, channel in self.channels.items():
+            if channel.coalescer:
+                # The agent loop has stopped by now, so publishing would lose them silently
+                if dropped := channel.coalescer.discard_all():
+                    logger.warning(f"{name}: dropped {dropped} buffered inbound messages on shutdown")
+                stats = channel.coalescer.stats()
+                if stats["received"] > stats["published"]:
+                    logger.info(f"{name} coalescing: {stats['received']} messages -> {stats['published']} agent turns")
+        for name, channel in self.channels.items():
+            stats = channel.rate_limiter.stats()
+            if stats["throttled"] or stats["rate_limited"]:
+                logger.info(
+                    f"{name} rate limiting: {stats['throttled']}/{stats['sends']} sends throttled "
+                    f"(avg {stats['delay_avg_s']:.2f}s, max {stats['delay_max_s']:.2f}s), "
+                    f"{stats['rate_limited']} server rate limits, {stats['failed']} dropped"
+                )
         
         # Stop all channels
         for name, channel in self.channels.items():
@@ -195,10 +266,7 @@ class ChannelManager:
                 
                 channel = self.channels.get(msg.channel)
                 if channel:
-                    try:
-                        await channel.send(msg)
-                    except Exception as e:
-                        logger.error(f"Error sending to {msg.channel}: {e}")
+                    self._enqueue(channel, msg)
                 else:
                     logger.warning(f"Unknown channel: {msg.channel}")
                     
@@ -207,6 +275,32 @@ class ChannelManager:
             except asyncio.CancelledError:
                 break
     
+    def _enqueue(self, channel: BaseChannel, msg: OutboundMessage) -> None:
+        """Queue a message on its chat's lane, starting a sender if the lane is idle."""
+        key = (msg.channel, msg.chat_id)
+        lane = self._lanes.get(key)
+        if lane is not None:
+            lane.append(msg)
+            return
+        self._lanes[key] = deque([msg])
+        task = asyncio.create_task(self._drain_lane(key, channel))
+        self._lane_tasks.add(task)
+        task.add_done_callback(self._lane_tasks.discard)
+    
+    async def _drain_lane(self, key: tuple[str, str], channel: BaseChannel) -> None:
+        """Send a chat's queued messages in order, then retire the lane."""
+        lane = self._lanes[key]
+        try:
+            while lane:
+                msg = lane[0]
+                try:
+                    await channel.send(msg)
+                except Exception as e:
+                    logger.error(f"Error sending to {msg.channel}: {e}")
+                lane.popleft()
+        finally:
+            self._lanes.pop(key, None)
+    
     def get_channel(self, name: str) -> BaseChannel | None:
         """Get a channel by name."""
         return self.channels.get(name)
@@ -216,7 +310,9 @@ class ChannelManager:
         return {
             name: {
                 "enabled": True,
-                "running": channel.is_running
+                "running": channel.is_running,
+                "rate_limit": channel.rate_limiter.stats(),
+                "coalesce": channel.coalescer.stats() if channel.coalescer else None,
             }
             for name, channel in self.channels.items()
         }
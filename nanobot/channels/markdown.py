@@ -0,0 +1,540 @@
+"""Tokenize-once Markdown rendering for chat platforms.
+
+Agent replies are Markdown. Each platform wants something different:
+Telegram takes a small HTML subset, Slack its own mrkdwn, Discord most of
+Markdown except tables, and Feishu interactive-card elements. This module
+parses a reply once into blocks (one pass over the lines) and inline spans
+(one compiled alternation per line), then renders the tree for a platform.
+Rendering works block by block, so long replies can be split at block
+boundaries into chunks that each stay valid for the platform.
+"""
+
+import html
+import json
+import re
+from dataclasses import dataclass, field
+
+_FENCE_RE = re.compile(r"^\s*(```+|~~~+)\s*([\w+#.-]*)")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_QUOTE_RE = re.compile(r"^\s*>\s?(.*)$")
+_LIST_RE = re.compile(r"^(\s*)([-*+]|\d{1,9}[.)])\s+(.*)$")
+_HR_RE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_BOLD_RE = re.compile(r"\*\*([^\n]+?)\*\*|__([^\n]+?)__")
+_TABLE_SEP_RE = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+
+# One alternation for all inline spans; the first match at each position wins
+_INLINE_RE = re.compile(
+    r"`(?P<code>[^`\n]+)`"
+    r"|\[(?P<link_text>[^\]\n]+)\]\((?P<link_url>[^)\s]+)\)"
+    r"|\*\*(?P<bold>[^\n]+?)\*\*"
+    r"|__(?P<bold_u>[^\n]+?)__"
+    r"|~~(?P<strike>[^\n]+?)~~"
+    r"|(?<![\w*])\*(?P<italic>[^*\s](?:[^*\n]*[^*\s])?)\*(?![\w*])"
+    r"|(?<![\w])_(?P<italic_u>[^_\s](?:[^_\n]*[^_\s])?)_(?![\w])"
+)
+
+
+@dataclass
+class Block:
+    """A block-level Markdown element."""
+    kind: str  # paragraph, heading, code, quote, list, table, hr, blank
+    lines: list[str] = field(default_factory=list)  # Content lines (markers stripped)
+    raw: str = ""  # Original source text of the block
+    level: int = 0  # Heading level
+    lang: str = ""  # Code block language
+    markers: list[tuple[str, str]] = field(default_factory=list)  # List items: (indent, marker)
+    rows: list[list[str]] = field(default_factory=list)  # Table: header row, then body rows
+
+
+def parse(text: str) -> list[Block]:
+    """Parse Markdown into blocks in a single pass over its lines."""
+    blocks: list[Block] = []
+    lines = text.split("\n")
+    i, n = 0, len(lines)
+    para: list[str] = []
+
+    def end_paragraph() -> None:
+        if para:
+            blocks.append(Block("paragraph", list(para), "\n".join(para)))
+            para.clear()
+
+    while i < n:
+        line = lines[i]
+        if m := _FENCE_RE.match(line):
+            end_paragraph()
+            fence = m.group(1)
+            start = i
+            body = []
+            i += 1
+            while i < n and not lines[i].strip().startswith(fence):
+                body.append(lines[i])
+                i += 1
+            end = min(i, n - 1)
+            blocks.append(Block("code", body, "\n".join(lines[start:end + 1]), lang=m.group(2)))
+            i += 1
+            continue
+        if not line.strip():
+            end_paragraph()
+            blocks.append(Block("blank", raw=line))
+            i += 1
+            continue
+        if m := _HEADING_RE.match(line):
+            end_paragraph()
+            blocks.append(Block("heading", [m.group(2)], line, level=len(m.group(1))))
+            i += 1
+            continue
+        if _HR_RE.match(line):
+            end_paragraph()
+            blocks.append(Block("hr", raw=line))
+            i += 1
+            continue
+        if "|" in line and i + 1 < n and "|" in lines[i + 1] and _TABLE_SEP_RE.match(lines[i + 1]):
+            end_paragraph()
+            start = i
+            rows = [_split_row(line)]
+            i += 2
+            while i < n and "|" in lines[i] and lines[i].strip():
+                rows.append(_split_row(lines[i]))
+                i += 1
+            blocks.append(Block("table", raw="\n".join(lines[start:i]), rows=rows))
+            continue
+        if _QUOTE_RE.match(line):
+            end_paragraph()
+            start = i
+            body = []
+            while i < n and (m := _QUOTE_RE.match(lines[i])):
+                body.append(m.group(1))
+                i += 1
+            blocks.append(Block("quote", body, "\n".join(lines[start:i])))
+            continue
+        if _LIST_RE.match(line):
+            end_paragraph()
+            start = i
+            body, markers = [], []
+            while i < n and (m := _LIST_RE.match(lines[i])):
+                markers.append((m.group(1), m.group(2)))
+                body.append(m.group(3))
+                i += 1
+            blocks.append(Block("list", body, "\n".join(lines[start:i]), markers=markers))
+            continue
+        para.append(line)
+        i += 1
+    end_paragraph()
+    return blocks
+
+
+_SLACK_ENTITY_RE = re.compile(r"(<(?:[@#!][^<>\s]+|(?:https?|mailto):[^<>\s|]+(?:\|[^<>]*)?)>)")
+
+
+def _strip_bold(text: str) -> str:
+    """Drop bold markers from a heading, which is rendered bold as a whole."""
+    return _BOLD_RE.sub(r"\1\2", text)
+
+
+def _split_row(line: str) -> list[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [c.strip() for c in line.split("|")]
+
+
+def table_to_text(rows: list[list[str]]) -> str:
+    """Lay out a table as aligned monospace text."""
+    width = max(len(r) for r in rows)
+    rows = [r + [""] * (width - len(r)) for r in rows]
+    widths = [max(len(r[c]) for r in rows) for c in range(width)]
+    lines = [" | ".join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip() for row in rows]
+    lines.insert(1, "-+-".join("-" * w for w in widths))
+    return "\n".join(lines)
+
+
+class Renderer:
+    """
+    Renders parsed blocks for one platform.
+
+    Subclasses override the span and block hooks. limit is the platform's
+    message length limit, in the units of measure(), used when splitting
+    long replies.
+    """
+
+    limit = 4096
+
+    def measure(self, rendered: str) -> int:
+        """Size of rendered output as the platform counts it against limit."""
+        return len(rendered)
+
+    # ---- inline --------------------------------------------------------------
+
+    def escape(self, text: str) -> str:
+        return text
+
+    def inline(self, text: str) -> str:
+        """Render the inline spans of one line."""
+        out = []
+        pos = 0
+        for m in _INLINE_RE.finditer(text):
+            if m.start() > pos:
+                out.append(self.escape(text[pos:m.start()]))
+            kind = m.lastgroup
+            if kind == "code":
+                out.append(self.code_span(m.group("code")))
+            elif kind == "link_url":
+                out.append(self.link(self.inline(m.group("link_text")), m.group("link_url")))
+            elif kind in ("bold", "bold_u"):
+                out.append(self.bold(self.inline(m.group(kind))))
+            elif kind == "strike":
+                out.append(self.strike(self.inline(m.group("strike"))))
+            else:
+                out.append(self.italic(self.inline(m.group(kind))))
+            pos = m.end()
+        if pos < len(text):
+            out.append(self.escape(text[pos:]))
+        return "".join(out)
+
+    def code_span(self, text: str) -> str:
+        return f"`{text}`"
+
+    def link(self, text: str, url: str) -> str:
+        return f"[{text}]({url})"
+
+    def bold(self, text: str) -> str:
+        return f"**{text}**"
+
+    def italic(self, text: str) -> str:
+        return f"_{text}_"
+
+    def strike(self, text: str) -> str:
+        return f"~~{text}~~"
+
+    # ---- blocks ----------------------------------------------------------------
+
+    def block(self, b: Block) -> str:
+        """Render one block."""
+        if b.kind == "paragraph":
+            return "\n".join(self.inline(line) for line in b.lines)
+        if b.kind == "heading":
+            return self.heading(self.inline(_strip_bold(b.lines[0])), b.level)
+        if b.kind == "code":
+            return self.code_block("\n".join(b.lines), b.lang)
+        if b.kind == "quote":
+            return self.quote([self.inline(line) for line in b.lines])
+        if b.kind == "list":
+            return "\n".join(
+                f"{indent}{self.bullet(marker)}{self.inline(line)}"
+                for (indent, marker), line in zip(b.markers, b.lines)
+            )
+        if b.kind == "table":
+            return self.table(b.rows)
+        if b.kind == "hr":
+            return "──────────"
+        return ""
+
+    def heading(self, text: str, level: int) -> str:
+        return self.bold(text)
+
+    def code_block(self, code: str, lang: str) -> str:
+        return f"```{lang}\n{code}\n```"
+
+    def quote(self, lines: list[str]) -> str:
+        return "\n".join(f"> {line}" for line in lines)
+
+    def bullet(self, marker: str) -> str:
+        return "• " if marker in ("-", "*", "+") else f"{marker} "
+
+    def table(self, rows: list[list[str]]) -> str:
+        return self.code_block(table_to_text(rows), "")
+
+    def render(self, text: str) -> str:
+        """Render a whole Markdown document."""
+        return "\n".join(self.block(b) for b in parse(text))
+
+
+class TelegramHTMLRenderer(Renderer):
+    """Telegram Bot API HTML (parse_mode="HTML")."""
+
+    limit = 4096
+
+    def escape(self, text: str) -> str:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+    def code_span(self, text: str) -> str:
+        return f"<code>{self.escape(text)}</code>"
+
+    def link(self, text: str, url: str) -> str:
+        return f'<a href="{html.escape(url, quote=True)}">{text}</a>'
+
+    def bold(self, text: str) -> str:
+        return f"<b>{text}</b>"
+
+    def italic(self, text: str) -> str:
+        return f"<i>{text}</i>"
+
+    def strike(self, text: str) -> str:
+        return f"<s>{text}</s>"
+
+    def code_block(self, code: str, lang: str) -> str:
+        attr = f' class="language-{html.escape(lang, quote=True)}"' if lang else ""
+        return f"<pre><code{attr}>{self.escape(code)}</code></pre>"
+
+    def quote(self, lines: list[str]) -> str:
+        return f"<blockquote>{chr(10).join(lines)}</blockquote>"
+
+
+class SlackRenderer(Renderer):
+    """Slack mrkdwn."""
+
+    limit = 39_000  # chat.postMessage truncates text past 40,000 characters
+
+    def inline(self, text: str) -> str:
+        # Slack's own <@U123>, <#C123>, <!here> and <url|label> entities pass through untouched
+        render = super().inline
+        parts = _SLACK_ENTITY_RE.split(text)
+        return "".join(part if i % 2 else render(part) for i, part in enumerate(parts) if part)
+
+    def escape(self, text: str) -> str:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+    def code_span(self, text: str) -> str:
+        return f"`{self.escape(text)}`"
+
+    def link(self, text: str, url: str) -> str:
+        return f"<{self.escape(url)}|{text}>"
+
+    def bold(self, text: str) -> str:
+        return f"*{text}*"
+
+    def italic(self, text: str) -> str:
+        return f"_{text}_"
+
+    def strike(self, text: str) -> str:
+        return f"~{text}~"
+
+    def code_block(self, code: str, lang: str) -> str:
+        return f"```\n{self.escape(code)}\n```"
+
+
+class DiscordRenderer(Renderer):
+    """Discord Markdown: the source is kept as-is except for tables, which Discord cannot show."""
+
+    limit = 2000
+
+    def block(self, b: Block) -> str:
+        if b.kind == "table":
+            return self.table(b.rows)
+        return b.raw
+
+
+class FeishuCardRenderer(Renderer):
+    """
+    Feishu interactive-card elements.
+
+    Card markdown supports most inline Markdown, so text blocks keep their
+    source; headings become bold div elements and tables become native
+    table elements.
+    """
+
+    limit = 28_000  # Bytes: card JSON is capped at 30 KB
+
+    def measure(self, rendered: str) -> int:
+        # UTF-8 bytes as serialized into the card JSON (CJK text is ~3 bytes per character).
+        # Text blocks merge into one markdown element; headings and tables each add one.
+        blocks = parse(rendered)
+        if any(b.kind in ("heading", "table") for b in blocks):
+            return len(json.dumps(self.elements(blocks), ensure_ascii=False).encode())
+        return len(json.dumps(rendered, ensure_ascii=False).encode())
+
+    def elements(self, blocks: list[Block]) -> list[dict]:
+        """Build card elements, merging consecutive text blocks into one markdown element."""
+        elements: list[dict] = []
+        text: list[str] = []
+
+        def end_text() -> None:
+            content = "\n".join(text).strip("\n")
+            if content.strip():
+                elements.append({"tag": "markdown", "content": content})
+            text.clear()
+
+        for b in blocks:
+            if b.kind == "heading":
+                end_text()
+                heading = f"**{_strip_bold(b.lines[0])}**"
+                elements.append({"tag": "div", "text": {"tag": "lark_md", "content": heading}})
+            elif b.kind == "table" and len(b.rows) >= 2:
+                end_text()
+                elements.append(self.table_element(b.rows))
+            else:
+                text.append(b.raw)
+        end_text()
+        return elements
+
+    @staticmethod
+    def table_element(rows: list[list[str]]) -> dict:
+        headers, body = rows[0], rows[1:]
+        columns = [
+            {"tag": "column", "name": f"c{i}", "display_name": h, "width": "auto"}
+            for i, h in enumerate(headers)
+        ]
+        return {
+            "tag": "table",
+            "page_size": len(body) + 1,
+            "columns": columns,
+            "rows": [{f"c{i}": r[i] if i < len(r) else "" for i in range(len(headers))} for r in body],
+        }
+
+    def block(self, b: Block) -> str:
+        return b.raw
+
+
+def _split_block(b: Block, renderer: Renderer, limit: int) -> list[Block]:
+    """Split a block whose rendering exceeds limit into smaller blocks of the same kind."""
+    if b.kind in ("paragraph", "code", "quote", "list") and len(b.lines) > 1:
+        pieces: list[Block] = []
+        start = 0
+        overhead = renderer.measure(renderer.block(_sub_block(b, 0, 0)))
+        size = overhead
+        for idx, line in enumerate(b.lines):
+            line_len = renderer.measure(renderer.block(_sub_block(b, idx, idx + 1))) - overhead + 1
+            if idx > start and size + line_len > limit:
+                pieces.append(_sub_block(b, start, idx))
+                start, size = idx, overhead
+            size += line_len
+        pieces.append(_sub_block(b, start, len(b.lines)))
+        result = []
+        for piece in pieces:
+            if len(piece.lines) == 1 and renderer.measure(renderer.block(piece)) > limit:
+                result.extend(_split_line(piece, renderer, limit))
+            else:
+                result.append(piece)
+        return result
+    if b.kind == "table" and len(b.rows) > 2:
+        # Repeat the header row in every piece
+        header, body = b.rows[0], b.rows[1:]
+        mid = len(body) // 2
+        halves = [Block("table", rows=[header, *body[:mid]]), Block("table", rows=[header, *body[mid:]])]
+        result = []
+        for half in halves:
+            half.raw = "\n".join(
+                ["| " + " | ".join(r) + " |" for r in half.rows[:1]]
+                + ["|" + "---|" * len(header)]
+                + ["| " + " | ".join(r) + " |" for r in half.rows[1:]]
+            )
+            fits = renderer.measure(renderer.block(half)) <= limit
+            result.extend([half] if fits else _split_block(half, renderer, limit))
+        return result
+    if b.lines:
+        return _split_line(b, renderer, limit)
+    return [b]
+
+
+def _sub_block(b: Block, start: int, end: int) -> Block:
+    lines = b.lines[start:end]
+    if b.kind == "code":
+        raw = "\n".join([f"```{b.lang}", *lines, "```"])
+    elif b.kind == "quote":
+        raw = "\n".join(f"> {line}" for line in lines)
+    elif b.kind == "list":
+        raw = "\n".join(f"{i}{m} {line}" for (i, m), line in zip(b.markers[start:end], lines))
+    else:
+        raw = "\n".join(lines)
+    return Block(b.kind, lines, raw, b.level, b.lang, b.markers[start:end], b.rows)
+
+
+def _split_line(b: Block, renderer: Renderer, limit: int) -> list[Block]:
+    """Hard-split a single oversized line at spaces (or anywhere, as a last resort)."""
+    line = b.lines[0]
+    overhead = renderer.measure(renderer.block(_sub_block(b, 0, 0))) + 16
+    budget = max(1, limit - overhead)
+    pieces = []
+    while line:
+        # Escaping can grow text, so shrink the slice until its rendering fits
+        cut = min(len(line), budget)
+        while True:
+            if cut < len(line):
+                space = line.rfind(" ", 0, cut)
+                end = space if space > cut // 2 else cut
+            else:
+                end = cut
+            piece = _sub_block(Block(b.kind, [line[:end]], lang=b.lang, markers=b.markers[:1]), 0, 1)
+            if renderer.measure(renderer.block(piece)) <= limit or end <= 1:
+                break
+            cut = max(1, end * 3 // 4)
+        pieces.append(piece)
+        line = line[end:].lstrip(" ")
+    return pieces
+
+
+def render_chunks(text: str, renderer: Renderer, limit: int | None = None) -> list[str]:
+    """
+    Render Markdown and split it into messages of at most limit (as
+    measured by renderer.measure).
+
+    Splits fall between blocks, preferably at blank lines (paragraph
+    breaks). Blocks too long for one message are split by line, code blocks
+    into several complete code blocks, so every chunk is well-formed.
+    """
+    limit = limit or renderer.limit
+    units: list[tuple[str, bool, int]] = []  # (rendered, is_paragraph_break, size)
+    for b in parse(text):
+        rendered = renderer.block(b)
+        size = renderer.measure(rendered)
+        if size > limit:
+            for p in _split_block(b, renderer, limit):
+                piece = renderer.block(p)
+                units.append((piece, False, renderer.measure(piece)))
+        else:
+            units.append((rendered, b.kind == "blank", size))
+
+    chunks: list[str] = []
+    current: list[tuple[str, bool, int]] = []
+    size = 0
+    for unit in units:
+        added = unit[2] + (1 if current else 0)
+        if current and size + added > limit:
+            # Prefer breaking at the last paragraph break in the back half of the chunk
+            cut = len(current)
+            for idx in range(len(current) - 1, len(current) // 2, -1):
+                if current[idx][1]:
+                    cut = idx
+                    break
+            chunks.append("\n".join(u[0] for u in current[:cut]))
+            current = current[cut:]
+            if current and current[0][1]:
+                current = current[1:]  # Drop the blank line at the break
+            size = sum(u[2] for u in current) + max(0, len(current) - 1)
+            added = unit[2] + (1 if current else 0)
+            if current and size + added > limit:
+                chunks.append("\n".join(u[0] for u in current))
+                current, size, added = [], 0, unit[2]
+        current.append(unit)
+        size += added
+    if current:
+        chunks.append("\n".join(u[0] for u in current))
+    return [c.strip("\n") for c in chunks if c.strip()]
+
+
+TELEGRAM = TelegramHTMLRenderer()
+SLACK = SlackRenderer()
+DISCORD = DiscordRenderer()
+FEISHU = FeishuCardRenderer()
+
+
+def to_telegram_html(text: str) -> str:
+    """Convert Markdown to Telegram-safe HTML."""
+    return TELEGRAM.render(text) if text else ""
+
+
+def to_slack_mrkdwn(text: str) -> str:
+    """Convert Markdown to Slack mrkdwn."""
+    return SLACK.render(text) if text else ""
+
+
+def to_discord(text: str) -> str:
+    """Convert Markdown to Discord Markdown (tables become code blocks)."""
+    return DISCORD.render(text) if text else ""
+
+
+def to_feishu_elements(text: str) -> list[dict]:
+    """Convert Markdown to Feishu card elements."""
+    return FEISHU.elements(parse(text)) or [{"tag": "markdown", "content": text}]
@@ -315,6 +315,7 @@ class MochatChannel(BaseChannel):
 
         is_panel = (target.is_panel or target.id in self._panel_set) and not target.id.startswith("session_")
         try:
+            await self.rate_limiter.acquire(target.id)
             if is_panel:
                 await self._api_send("/api/claw/groups/panels/send", "panelId", target.id,
                                      content, msg.reply_to, self._read_group_id(msg.metadata))
@@ -102,6 +102,7 @@ class QQChannel(BaseChannel):
             logger.warning("QQ client not initialized")
             return
         try:
+            await self.rate_limiter.acquire(msg.chat_id)
             await self._client.api.post_c2c_message(
                 openid=msg.chat_id,
                 msg_type=0,
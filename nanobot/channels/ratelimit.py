@@ -0,0 +1,283 @@
+"""Token-bucket rate limiting for outbound channel sends.
+
+Every send passes through three kinds of bucket: one global bucket shared by
+all channels, one per platform, and one per chat. Discord additionally keys
+buckets by API route, following the X-RateLimit-Bucket header. Sends wait for
+capacity instead of failing, and a 429 pauses the affected bucket and retries.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Mapping, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Sustained rate (requests per second) and burst size of a bucket."""
+    rate: float
+    burst: float = 1.0
+
+
+# Documented (or observed) send limits per platform: (platform-wide, per chat)
+PLATFORM_LIMITS: dict[str, tuple[RateLimit, RateLimit]] = {
+    "telegram": (RateLimit(30, 30), RateLimit(1, 3)),  # 30 msg/s per bot, ~1 msg/s per chat
+    "discord": (RateLimit(50, 50), RateLimit(1, 5)),  # 50 req/s global, 5 msg / 5s per channel
+    "slack": (RateLimit(20, 20), RateLimit(1, 3)),  # chat.postMessage: ~1 msg/s per channel
+    "feishu": (RateLimit(50, 50), RateLimit(5, 5)),  # 50 req/s per app, 5 msg/s per chat
+    "dingtalk": (RateLimit(20, 20), RateLimit(1, 3)),  # 20 QPS per app
+    "qq": (RateLimit(5, 5), RateLimit(1, 2)),
+    "whatsapp": (RateLimit(10, 10), RateLimit(1, 3)),
+    "email": (RateLimit(2, 5), RateLimit(0.2, 2)),
+    "mochat": (RateLimit(10, 10), RateLimit(1, 3)),
+}
+DEFAULT_LIMITS = (RateLimit(10, 10), RateLimit(1, 3))
+
+
+class RateLimitedError(Exception):
+    """Raised by a send function when the platform rejected it with a rate limit."""
+
+    def __init__(self, retry_after: float, scope: str = "chat", bucket: str | None = None):
+        super().__init__(f"rate limited for {retry_after:.2f}s ({scope})")
+        self.retry_after = max(0.0, retry_after)
+        self.scope = scope  # "global", "platform", "chat" or "route"
+        self.bucket = bucket  # Platform bucket id (Discord X-RateLimit-Bucket)
+
+
+class TokenBucket:
+    """
+    Token bucket with reservation semantics.
+
+    reserve() always takes a token and returns how long the caller must wait
+    for it, so concurrent callers are served in order instead of racing.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self, now: float | None = None) -> float:
+        """Take one token; return the seconds to wait before using it."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self._tokens -= 1
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float, now: float | None = None) -> None:
+        """Block the bucket for a server-imposed cool-down."""
+        now = time.monotonic() if now is None else now
+        self._paused_until = max(self._paused_until, now + seconds)
+
+    def set_remaining(self, remaining: float, reset_after: float, now: float | None = None) -> None:
+        """Sync with server-reported quota: `remaining` calls until reset in `reset_after` seconds."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self._tokens = min(self._tokens, remaining)
+        if remaining <= 0:
+            self.pause(reset_after, now)
+
+    def idle(self, now: float) -> bool:
+        """True if the bucket is full and unpaused, i.e. safe to drop."""
+        self._refill(now)
+        return self._tokens >= self.burst and now >= self._paused_until
+
+
+def parse_retry_after(headers: Mapping[str, str] | None, body: Any = None) -> float | None:
+    """Extract a retry delay in seconds from common rate-limit headers or a JSON body."""
+    if headers:
+        lower = {k.lower(): v for k, v in headers.items()}
+        for key in ("retry-after", "x-ratelimit-reset-after", "x-ogw-ratelimit-reset"):
+            value = lower.get(key)
+            if value is None:
+                continue
+            try:
+                return float(value)
+            except ValueError:
+                continue
+    if isinstance(body, dict):
+        value = body.get("retry_after") or (body.get("parameters") or {}).get("retry_after")
+        if value is not None:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+# Shared by every channel in the process
+_GLOBAL_BUCKET = TokenBucket(rate=50, burst=50)
+
+
+class RateLimiter:
+    """
+    Outbound rate limiter for one channel.
+
+    Use call() to run a send coroutine: it waits for capacity in the global,
+    platform, per-chat (and optional per-route) buckets, and retries when
+    the send raises RateLimitedError.
+    """
+
+    _MAX_IDLE_BUCKETS = 1000  # Prune full, idle per-chat/route buckets past this size
+
+    def __init__(
+        self,
+        platform: str,
+        platform_limit: RateLimit | None = None,
+        chat_limit: RateLimit | None = None,
+        global_bucket: TokenBucket | None = None,
+        max_retries: int = 5,
+        enabled: bool = True,
+    ):
+        default_platform, default_chat = PLATFORM_LIMITS.get(platform, DEFAULT_LIMITS)
+        self.platform = platform
+        self.enabled = enabled  # When False, only server-side 429s are honoured
+        self.chat_limit = chat_limit or default_chat
+        self.max_retries = max_retries
+        self.global_bucket = global_bucket or _GLOBAL_BUCKET
+        limit = platform_limit or default_platform
+        self.platform_bucket = TokenBucket(limit.rate, limit.burst)
+        self._chat_buckets: dict[str, TokenBucket] = {}
+        # Discord-style route buckets: route -> server bucket id -> bucket
+        self._route_ids: dict[str, str] = {}
+        self._route_buckets: dict[str, TokenBucket] = {}
+        self._metrics = {
+            "sends": 0,
+            "throttled": 0,
+            "rate_limited": 0,
+            "failed": 0,
+            "delay_total_s": 0.0,
+            "delay_max_s": 0.0,
+        }
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            self._prune(self._chat_buckets)
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_limit.rate, self.chat_limit.burst)
+        return bucket
+
+    def _route_bucket(self, route: str) -> TokenBucket:
+        key = self._route_ids.get(route, route)
+        bucket = self._route_buckets.get(key)
+        if bucket is None:
+            self._prune(self._route_buckets)
+            # Unknown until the first response tells us; start permissive
+            bucket = self._route_buckets[key] = TokenBucket(rate=5, burst=5)
+        return bucket
+
+    def _prune(self, buckets: dict[str, TokenBucket]) -> None:
+        if len(buckets) < self._MAX_IDLE_BUCKETS:
+            return
+        now = time.monotonic()
+        for key in [k for k, b in buckets.items() if b.idle(now)]:
+            del buckets[key]
+
+    def _buckets(self, chat_id: str | None, route: str | None) -> list[TokenBucket]:
+        buckets = [self.global_bucket, self.platform_bucket]
+        if chat_id is not None:
+            buckets.append(self._chat_bucket(str(chat_id)))
+        if route is not None:
+            buckets.append(self._route_bucket(route))
+        return buckets
+
+    async def acquire(self, chat_id: str | None = None, route: str | None = None) -> float:
+        """Wait until a send to chat_id (and route) is allowed. Returns the delay."""
+        if not self.enabled:
+            self._metrics["sends"] += 1
+            return 0.0
+        now = time.monotonic()
+        delay = max(b.reserve(now) for b in self._buckets(chat_id, route))
+        self._metrics["sends"] += 1
+        if delay > 0:
+            self._metrics["throttled"] += 1
+            self._metrics["delay_total_s"] += delay
+            self._metrics["delay_max_s"] = max(self._metrics["delay_max_s"], delay)
+            if delay > 1:
+                logger.debug(f"{self.platform}: throttling send to {chat_id} for {delay:.2f}s")
+            await asyncio.sleep(delay)
+        return delay
+
+    def on_rate_limited(
+        self,
+        error: RateLimitedError,
+        chat_id: str | None = None,
+        route: str | None = None,
+    ) -> None:
+        """Pause the bucket the server says we exceeded."""
+        self._metrics["rate_limited"] += 1
+        if error.bucket and route:
+            self._route_ids[route] = error.bucket
+        if error.scope == "global":
+            self.global_bucket.pause(error.retry_after)
+        elif error.scope == "platform" or chat_id is None:
+            self.platform_bucket.pause(error.retry_after)
+        elif error.scope == "route" and route:
+            self._route_bucket(route).pause(error.retry_after)
+        else:
+            self._chat_bucket(str(chat_id)).pause(error.retry_after)
+        logger.warning(f"{self.platform} rate limited ({error.scope}), retrying in {error.retry_after:.2f}s")
+
+    def update_from_headers(self, headers: Mapping[str, str], route: str | None = None) -> None:
+        """Sync a route bucket with Discord-style X-RateLimit-* response headers."""
+        lower = {k.lower(): v for k, v in headers.items()}
+        if route is None or "x-ratelimit-remaining" not in lower:
+            return
+        try:
+            remaining = float(lower["x-ratelimit-remaining"])
+            reset_after = float(lower.get("x-ratelimit-reset-after", 0))
+            limit = float(lower.get("x-ratelimit-limit", 0))
+        except ValueError:
+            return
+        if bucket_id := lower.get("x-ratelimit-bucket"):
+            old_key = self._route_ids.get(route, route)
+            self._route_ids[route] = bucket_id
+            if old_key != bucket_id and old_key in self._route_buckets:
+                self._route_buckets.setdefault(bucket_id, self._route_buckets.pop(old_key))
+        bucket = self._route_bucket(route)
+        if limit:
+            bucket.burst = limit
+        bucket.set_remaining(remaining, reset_after)
+
+    async def call(
+        self,
+        chat_id: str | None,
+        send: Callable[[], Awaitable[T]],
+        route: str | None = None,
+    ) -> T:
+        """
+        Run send() once capacity is available, retrying on RateLimitedError.
+
+        Other exceptions propagate to the caller unchanged.
+        """
+        attempt = 0
+        while True:
+            await self.acquire(chat_id, route)
+            try:
+                return await send()
+            except RateLimitedError as e:
+                if attempt >= self.max_retries:
+                    self._metrics["failed"] += 1
+                    raise
+                attempt += 1
+                self.on_rate_limited(e, chat_id, route)
+
+    def stats(self) -> dict[str, Any]:
+        """Throttling metrics for status reporting."""
+        m = dict(self._metrics)
+        m["delay_avg_s"] = m["delay_total_s"] / m["throttled"] if m["throttled"] else 0.0
+        m["chat_buckets"] = len(self._chat_buckets)
+        m["route_buckets"] = len(self._route_buckets)
+        return m
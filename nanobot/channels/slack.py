@@ -5,6 +5,7 @@ import re
 from typing import Any
 
 from loguru import logger
+from slack_sdk.errors import SlackApiError
 from slack_sdk.socket_mode.websockets import SocketModeClient
 from slack_sdk.socket_mode.request import SocketModeRequest
 from slack_sdk.socket_mode.response import SocketModeResponse
@@ -13,6 +14,8 @@ from slack_sdk.web.async_client import AsyncWebClient
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.markdown import SLACK, render_chunks
+from nanobot.channels.ratelimit import RateLimitedError, parse_retry_after
 from nanobot.config.schema import SlackConfig
 
 
@@ -82,11 +85,22 @@ class SlackChannel(BaseChannel):
             channel_type = slack_meta.get("channel_type")
             # Only reply in thread for channel/group messages; DMs don't use threads
             use_thread = thread_ts and channel_type != "im"
-            await self._web_client.chat_postMessage(
-                channel=msg.chat_id,
-                text=msg.content or "",
-                thread_ts=thread_ts if use_thread else None,
-            )
+
+            chunks = render_chunks(msg.content or "", SLACK) or [""]
+
+            async def post(index: int, chunk: str) -> None:
+                try:
+                    await self._web_client.chat_postMessage(
+                        channel=msg.chat_id,
+                        text=chunk,
+                        thread_ts=thread_ts if use_thread else None,
+                    )
+                except SlackApiError as e:
+                    if e.response is not None and e.response.status_code == 429:
+                        raise RateLimitedError(parse_retry_after(e.response.headers) or 1.0) from e
+                    raise
+
+            await self._send_chunks(msg.chat_id, chunks, post)
         except Exception as e:
             logger.error(f"Error sending Slack message: {e}")
 
@@ -3,79 +3,27 @@
 from __future__ import annotations
 
 import asyncio
+import html
 import re
 from loguru import logger
 from telegram import BotCommand, Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
+from telegram.error import BadRequest, NetworkError, RetryAfter
 from telegram.request import HTTPXRequest
 
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
+from nanobot.channels.markdown import TELEGRAM, render_chunks
+from nanobot.channels.ratelimit import RateLimitedError
 from nanobot.config.schema import TelegramConfig
+from nanobot.media import get_media_store
+from nanobot.providers.transcription import get_transcriber
 
 
-def _markdown_to_telegram_html(text: str) -> str:
-    """
-    Convert markdown to Telegram-safe HTML.
-    """
-    if not text:
-        return ""
-    
-    # 1. Extract and protect code blocks (preserve content from other processing)
-    code_blocks: list[str] = []
-    def save_code_block(m: re.Match) -> str:
-        code_blocks.append(m.group(1))
-        return f"\x00CB{len(code_blocks) - 1}\x00"
-    
-    text = re.sub(r'```[\w]*\n?([\s\S]*?)```', save_code_block, text)
-    
-    # 2. Extract and protect inline code
-    inline_codes: list[str] = []
-    def save_inline_code(m: re.Match) -> str:
-        inline_codes.append(m.group(1))
-        return f"\x00IC{len(inline_codes) - 1}\x00"
-    
-    text = re.sub(r'`([^`]+)`', save_inline_code, text)
-    
-    # 3. Headers # Title -> just the title text
-    text = re.sub(r'^#{1,6}\s+(.+)$', r'\1', text, flags=re.MULTILINE)
-    
-    # 4. Blockquotes > text -> just the text (before HTML escaping)
-    text = re.sub(r'^>\s*(.*)$', r'\1', text, flags=re.MULTILINE)
-    
-    # 5. Escape HTML special characters
-    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-    
-    # 6. Links [text](url) - must be before bold/italic to handle nested cases
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
-    
-    # 7. Bold **text** or __text__
-    text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', text)
-    text = re.sub(r'__(.+?)__', r'<b>\1</b>', text)
-    
-    # 8. Italic _text_ (avoid matching inside words like some_var_name)
-    text = re.sub(r'(?<![a-zA-Z0-9])_([^_]+)_(?![a-zA-Z0-9])', r'<i>\1</i>', text)
-    
-    # 9. Strikethrough ~~text~~
-    text = re.sub(r'~~(.+?)~~', r'<s>\1</s>', text)
-    
-    # 10. Bullet lists - item -> • item
-    text = re.sub(r'^[-*]\s+', '• ', text, flags=re.MULTILINE)
-    
-    # 11. Restore inline code with HTML tags
-    for i, code in enumerate(inline_codes):
-        # Escape HTML in code content
-        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        text = text.replace(f"\x00IC{i}\x00", f"<code>{escaped}</code>")
-    
-    # 12. Restore code blocks with HTML tags
-    for i, code in enumerate(code_blocks):
-        # Escape HTML in code content
-        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        text = text.replace(f"\x00CB{i}\x00", f"<pre><code>{escaped}</code></pre>")
-    
-    return text
+def _html_to_plain(text: str) -> str:
+    """Strip Telegram HTML tags for the plain-text fallback."""
+    return html.unescape(re.sub(r"</?[a-z]+[^>]*>", "", text))
 
 
 class TelegramChannel(BaseChannel):
@@ -94,15 +42,9 @@ class TelegramChannel(BaseChannel):
         BotCommand("help", "Show available commands"),
     ]
     
-    def __init__(
-        self,
-        config: TelegramConfig,
-        bus: MessageBus,
-        groq_api_key: str = "",
-    ):
+    def __init__(self, config: TelegramConfig, bus: MessageBus):
         super().__init__(config, bus)
         self.config: TelegramConfig = config
-        self.groq_api_key = groq_api_key
         self._app: Application | None = None
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
         self._typing_tasks: dict[str, asyncio.Task] = {}  # chat_id -> typing loop task
@@ -179,7 +121,7 @@ class TelegramChannel(BaseChannel):
             self._app = None
     
     async def send(self, msg: OutboundMessage) -> None:
-        """Send a message through Telegram."""
+        """Send a message through Telegram, split into chunks of at most 4096 characters."""
         if not self._app:
             logger.warning("Telegram bot not running")
             return
@@ -190,25 +132,40 @@ class TelegramChannel(BaseChannel):
         try:
             # chat_id should be the Telegram chat ID (integer)
             chat_id = int(msg.chat_id)
-            # Convert markdown to Telegram HTML
-            html_content = _markdown_to_telegram_html(msg.content)
-            await self._app.bot.send_message(
-                chat_id=chat_id,
-                text=html_content,
-                parse_mode="HTML"
-            )
         except ValueError:
             logger.error(f"Invalid chat_id: {msg.chat_id}")
-        except Exception as e:
-            # Fallback to plain text if HTML parsing fails
-            logger.warning(f"HTML parse failed, falling back to plain text: {e}")
+            return
+        
+        # Convert markdown to Telegram HTML, split at block boundaries
+        chunks = render_chunks(msg.content, TELEGRAM) or [msg.content]
+        
+        async def send_chunk(index: int, html_chunk: str) -> None:
             try:
-                await self._app.bot.send_message(
-                    chat_id=int(msg.chat_id),
-                    text=msg.content
-                )
-            except Exception as e2:
-                logger.error(f"Error sending Telegram message: {e2}")
+                await self._send_message(chat_id, text=html_chunk, parse_mode="HTML")
+            except BadRequest as e:
+                if "parse" not in str(e).lower():
+                    raise
+                # Fallback to plain text if HTML parsing fails
+                logger.warning(f"HTML parse failed, falling back to plain text: {e}")
+                await self._send_message(chat_id, text=_html_to_plain(html_chunk))
+        
+        await self._send_chunks(msg.chat_id, chunks, send_chunk)
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        # BadRequest (chat not found, bad markup) subclasses NetworkError but never succeeds on retry
+        if isinstance(error, BadRequest):
+            return False
+        return isinstance(error, NetworkError) or super()._is_retryable(error)
+    
+    async def _send_message(self, chat_id: int, **kwargs) -> None:
+        """Send one message, turning Telegram flood waits into RateLimitedError."""
+        try:
+            await self._app.bot.send_message(chat_id=chat_id, **kwargs)
+        except RetryAfter as e:
+            delay = e.retry_after
+            if hasattr(delay, "total_seconds"):
+                delay = delay.total_seconds()
+            raise RateLimitedError(float(delay)) from e
     
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
@@ -279,24 +236,27 @@ class TelegramChannel(BaseChannel):
         # Download media if present
         if media_file and self._app:
             try:
-                file = await self._app.bot.get_file(media_file.file_id)
                 ext = self._get_extension(media_type, getattr(media_file, 'mime_type', None))
+                store = get_media_store()
                 
-                # Save to workspace/media/
-                from pathlib import Path
-                media_dir = Path.home() / ".nanobot" / "media"
-                media_dir.mkdir(parents=True, exist_ok=True)
-                
-                file_path = media_dir / f"{media_file.file_id[:16]}{ext}"
-                await file.download_to_drive(str(file_path))
+                # file_unique_id is stable across chats, so a re-sent file skips the download
+                alias = f"telegram:{media_file.file_unique_id}"
+                file_path = store.lookup(alias)
+                if file_path is None:
+                    file = await self._app.bot.get_file(media_file.file_id)
+                    tmp_path = store.temp_path(ext)
+                    try:
+                        await file.download_to_drive(str(tmp_path))
+                        file_path = await asyncio.to_thread(store.ingest, tmp_path, ext)
+                    finally:
+                        tmp_path.unlink(missing_ok=True)
+                    store.remember(alias, file_path)
                 
                 media_paths.append(str(file_path))
                 
                 # Handle voice transcription
                 if media_type == "voice" or media_type == "audio":
-                    from nanobot.providers.transcription import GroqTranscriptionProvider
-                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key)
-                    transcription = await transcriber.transcribe(file_path)
+                    transcription = await get_transcriber().transcribe(file_path)
                     if transcription:
                         logger.info(f"Transcribed {media_type}: {transcription[:50]}...")
                         content_parts.append(f"[transcription: {transcription}]")
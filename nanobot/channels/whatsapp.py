@@ -1,8 +1,9 @@
 """WhatsApp channel implementation using Node.js bridge."""
 
 import asyncio
+import base64
 import json
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 from loguru import logger
 
@@ -10,6 +11,12 @@ from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import WhatsAppConfig
+from nanobot.media import get_media_store
+from nanobot.providers.transcription import get_transcriber
+
+# Voice notes arrive base64-encoded inside bridge messages
+BRIDGE_MAX_MESSAGE_BYTES = 32 * 1024 * 1024
+VOICE_EXTENSIONS = {"audio/ogg": ".ogg", "audio/mpeg": ".mp3", "audio/mp4": ".m4a", "audio/aac": ".aac"}
 
 
 class WhatsAppChannel(BaseChannel):
@@ -27,6 +34,8 @@ class WhatsAppChannel(BaseChannel):
         self.config: WhatsAppConfig = config
         self._ws = None
         self._connected = False
+        self._voice_tasks: set[asyncio.Task] = set()
+        self._chat_tails: dict[str, asyncio.Task] = {}  # Last queued task per chat, for ordering
     
     async def start(self) -> None:
         """Start the WhatsApp channel by connecting to the bridge."""
@@ -40,7 +49,7 @@ class WhatsAppChannel(BaseChannel):
         
         while self._running:
             try:
-                async with websockets.connect(bridge_url) as ws:
+                async with websockets.connect(bridge_url, max_size=BRIDGE_MAX_MESSAGE_BYTES) as ws:
                     self._ws = ws
                     # Send auth token if configured
                     if self.config.bridge_token:
@@ -71,6 +80,12 @@ class WhatsAppChannel(BaseChannel):
         self._running = False
         self._connected = False
         
+        for task in list(self._voice_tasks):
+            task.cancel()
+        if self._voice_tasks:
+            await asyncio.gather(*self._voice_tasks, return_exceptions=True)
+        self._chat_tails.clear()
+        
         if self._ws:
             await self._ws.close()
             self._ws = None
@@ -82,6 +97,7 @@ class WhatsAppChannel(BaseChannel):
             return
         
         try:
+            await self.rate_limiter.acquire(msg.chat_id)
             payload = {
                 "type": "send",
                 "to": msg.chat_id,
@@ -114,21 +130,16 @@ class WhatsAppChannel(BaseChannel):
             sender_id = user_id.split("@")[0] if "@" in user_id else user_id
             logger.info(f"Sender {sender}")
             
-            # Handle voice transcription if it's a voice message
+            # Voice notes are transcribed in the background so the bridge reader
+            # keeps going and notes arriving together share a transcription batch.
+            # Anything else from a chat with a voice note still pending queues
+            # behind it, so the chat's messages reach the agent in order.
             if content == "[Voice Message]":
-                logger.info(f"Voice message received from {sender_id}, but direct download from bridge is not yet supported.")
-                content = "[Voice Message: Transcription not available for WhatsApp yet]"
-            
-            await self._handle_message(
-                sender_id=sender_id,
-                chat_id=sender,  # Use full LID for replies
-                content=content,
-                metadata={
-                    "message_id": data.get("id"),
-                    "timestamp": data.get("timestamp"),
-                    "is_group": data.get("isGroup", False)
-                }
-            )
+                self._queue(sender, lambda: self._handle_voice_message(data, sender, sender_id))
+            elif sender in self._chat_tails:
+                self._queue(sender, lambda: self._forward(data, sender, sender_id, content))
+            else:
+                await self._forward(data, sender, sender_id, content)
         
         elif msg_type == "status":
             # Connection status update
@@ -146,3 +157,69 @@ class WhatsAppChannel(BaseChannel):
         
         elif msg_type == "error":
             logger.error(f"WhatsApp bridge error: {data.get('error')}")
+    
+    def _queue(self, chat_id: str, handler: Callable[[], Awaitable[None]]) -> None:
+        """Run handler() in the background after the chat's previously queued task."""
+        prev = self._chat_tails.get(chat_id)
+        
+        async def run() -> None:
+            try:
+                if prev is not None:
+                    await asyncio.wait({prev})
+                await handler()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error handling WhatsApp message: {e}")
+        
+        task = asyncio.create_task(run())
+        self._voice_tasks.add(task)
+        self._chat_tails[chat_id] = task
+        
+        def done(t: asyncio.Task) -> None:
+            self._voice_tasks.discard(t)
+            if self._chat_tails.get(chat_id) is t:
+                del self._chat_tails[chat_id]
+        
+        task.add_done_callback(done)
+    
+    async def _forward(
+        self, data: dict[str, Any], sender: str, sender_id: str, content: str, media: list[str] | None = None
+    ) -> None:
+        await self._handle_message(
+            sender_id=sender_id,
+            chat_id=sender,  # Use full LID for replies
+            content=content,
+            media=media,
+            metadata={
+                "message_id": data.get("id"),
+                "timestamp": data.get("timestamp"),
+                "is_group": data.get("isGroup", False)
+            }
+        )
+    
+    async def _handle_voice_message(self, data: dict[str, Any], sender: str, sender_id: str) -> None:
+        try:
+            content, media_paths = await self._transcribe_voice(data.get("media"), sender_id)
+            await self._forward(data, sender, sender_id, content, media_paths)
+        except Exception as e:
+            logger.error(f"Error handling WhatsApp voice message: {e}")
+    
+    async def _transcribe_voice(self, media: dict[str, Any] | None, sender_id: str) -> tuple[str, list[str]]:
+        """Store a voice note sent inline by the bridge and transcribe it."""
+        if not media or not media.get("data"):
+            logger.info(f"Voice message from {sender_id} arrived without audio (bridge too old or download failed)")
+            return "[Voice Message: audio not available]", []
+        mime = (media.get("mimetype") or "").split(";")[0].strip()
+        ext = VOICE_EXTENSIONS.get(mime, ".ogg")
+        try:
+            audio = base64.b64decode(media["data"])
+            file_path = await asyncio.to_thread(get_media_store().save_bytes, audio, ext)
+        except Exception as e:
+            logger.error(f"Failed to store WhatsApp voice message: {e}")
+            return "[Voice Message: download failed]", []
+        transcription = await get_transcriber().transcribe(file_path)
+        if transcription:
+            logger.info(f"Transcribed voice: {transcription[:50]}...")
+            return f"[transcription: {transcription}]", [str(file_path)]
+        return f"[voice: {file_path}]", [str(file_path)]
@@ -269,24 +269,85 @@ This file stores important information that should persist across sessions.
     skills_dir.mkdir(exist_ok=True)
 
 
-def _make_provider(config):
-    """Create LiteLLMProvider from config. Exits if no API key found."""
+def _make_provider(config, model: str | None = None):
+    """Create LiteLLMProvider from config for a model (default: the agent model). Exits if no API key found."""
     from nanobot.providers.litellm_provider import LiteLLMProvider
-    p = config.get_provider()
-    model = config.agents.defaults.model
+    model = model or config.agents.defaults.model
+    p = config.get_provider(model)
     if not (p and p.api_key) and not model.startswith("bedrock/"):
         console.print("[red]Error: No API key configured.[/red]")
         console.print("Set one in ~/.nanobot/config.json under providers section")
         raise typer.Exit(1)
     return LiteLLMProvider(
         api_key=p.api_key if p else None,
-        api_base=config.get_api_base(),
+        api_base=config.get_api_base(model),
         default_model=model,
         extra_headers=p.extra_headers if p else None,
-        provider_name=config.get_provider_name(),
+        provider_name=config.get_provider_name(model),
     )
 
 
+def _make_router(config, provider):
+    """Create the task-class model router. Classes whose model needs another provider get their own client."""
+    from nanobot.agent.router import ModelRouter, TaskRoute, TASK_CLASSES
+    default_name = config.get_provider_name()
+    clients = {}
+    routes = {}
+    for task in TASK_CLASSES:
+        model, max_tokens, temperature = config.agents.defaults.task_route(task)
+        task_provider = None
+        name = config.get_provider_name(model)
+        if name != default_name:
+            if name not in clients:
+                clients[name] = _make_provider(config, model)
+            task_provider = clients[name]
+        routes[task] = TaskRoute(model, max_tokens, temperature, provider=task_provider)
+    return ModelRouter(provider, routes)
+
+
+def _configure_media(config) -> None:
+    """Configure the shared media store and image preprocessing from config."""
+    from nanobot import media
+    mc = config.media
+    media.configure(
+        max_size_mb=mc.max_size_mb,
+        max_age_days=mc.max_age_days,
+        data_url_cache_mb=mc.data_url_cache_mb,
+    )
+    default = media.ImageSettings(
+        mc.image_max_dimension or media.ImageSettings.max_dimension, mc.image_quality, mc.image_format
+    )
+    media.configure_images(
+        max_dimension=mc.image_max_dimension,
+        quality=default.quality,
+        format=default.format,
+        models={
+            keyword: media.ImageSettings(
+                max_dimension=o.max_dimension or default.max_dimension,
+                quality=o.quality or default.quality,
+                format=o.format or default.format,
+            )
+            for keyword, o in mc.image_models.items()
+        },
+        enabled=mc.image_preprocess,
+    )
+
+
+def _configure_transcription(config):
+    """Configure the shared voice transcription service from config."""
+    from nanobot.providers.transcription import configure_transcription, make_transcription_provider
+    tc = config.transcription
+    provider = make_transcription_provider(
+        backend=tc.backend,
+        groq_api_key=config.providers.groq.api_key or None,
+        local_model=tc.local_model,
+        local_compute_type=tc.local_compute_type,
+        local_threads=tc.local_threads,
+        language=tc.language or None,
+    )
+    return configure_transcription(provider, max_batch=tc.max_batch, batch_window_ms=tc.batch_window_ms)
+
+
 # ============================================================================
 # Gateway / Server
 # ============================================================================
@@ -303,9 +364,11 @@ def gateway(
     from nanobot.agent.loop import AgentLoop
     from nanobot.channels.manager import ChannelManager
     from nanobot.session.manager import SessionManager
-    from nanobot.cron.service import CronService
+    from nanobot.agent import tracer
+    from nanobot.cron.service import CronService, current_run
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
+    from nanobot.media import get_media_store
     
     if verbose:
         import logging
@@ -314,13 +377,19 @@ def gateway(
     console.print(f"{__logo__} Starting nanobot gateway on port {port}...")
     
     config = load_config()
+    _configure_media(config)
+    transcriber = _configure_transcription(config)
     bus = MessageBus()
     provider = _make_provider(config)
     session_manager = SessionManager(config.workspace_path)
     
     # Create cron service first (callback set after agent creation)
     cron_store_path = get_data_dir() / "cron" / "jobs.json"
-    cron = CronService(cron_store_path)
+    cron = CronService(
+        cron_store_path,
+        max_concurrent=config.cron.max_concurrent,
+        default_timeout_s=config.cron.default_timeout,
+    )
     
     # Create agent with cron service
     agent = AgentLoop(
@@ -335,17 +404,26 @@ def gateway(
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         session_manager=session_manager,
+        subagent_config=config.agents.subagents,
+        router=_make_router(config, provider),
     )
     
     # Set cron callback (needs agent)
     async def on_cron_job(job: CronJob) -> str | None:
         """Execute a cron job through the agent."""
-        response = await agent.process_direct(
-            job.payload.message,
-            session_key=f"cron:{job.id}",
-            channel=job.payload.channel or "cli",
-            chat_id=job.payload.to or "direct",
-        )
+        stats = tracer.start_run()
+        try:
+            response = await agent.process_direct(
+                job.payload.message,
+                session_key=f"cron:{job.id}",
+                channel=job.payload.channel or "cli",
+                chat_id=job.payload.to or "direct",
+            )
+        finally:
+            # Attach token usage and trace case to the run history record
+            if run := current_run():
+                run.total_tokens = stats["total_tokens"]
+                run.case_id = stats["case_id"]
         if job.payload.deliver and job.payload.to:
             from nanobot.bus.events import OutboundMessage
             await bus.publish_outbound(OutboundMessage(
@@ -359,13 +437,16 @@ def gateway(
     # Create heartbeat service
     async def on_heartbeat(prompt: str) -> str:
         """Execute heartbeat through the agent."""
-        return await agent.process_direct(prompt, session_key="heartbeat")
+        return await agent.process_direct(prompt, session_key="heartbeat", task="heartbeat")
     
     heartbeat = HeartbeatService(
         workspace=config.workspace_path,
         on_heartbeat=on_heartbeat,
-        interval_s=30 * 60,  # 30 minutes
-        enabled=True
+        interval_s=config.heartbeat.interval_s,
+        enabled=config.heartbeat.enabled,
+        max_interval_s=config.heartbeat.max_interval_s,
+        backoff_factor=config.heartbeat.backoff_factor,
+        watch=config.heartbeat.watch,
     )
     
     # Create channel manager
@@ -380,7 +461,8 @@ def gateway(
     if cron_status["jobs"] > 0:
         console.print(f"[green]✓[/green] Cron: {cron_status['jobs']} scheduled jobs")
     
-    console.print(f"[green]✓[/green] Heartbeat: every 30m")
+    if config.heartbeat.enabled:
+        console.print(f"[green]✓[/green] Heartbeat: every {config.heartbeat.interval_s // 60}m")
     
     async def run():
         try:
@@ -396,6 +478,10 @@ def gateway(
             cron.stop()
             agent.stop()
             await channels.stop_all()
+            await transcriber.close()
+            await agent.close()
+            await get_media_store().close()
+            console.print(f"[dim]Model usage:\n{agent.router.format_report()}[/dim]")
     
     asyncio.run(run())
 
@@ -440,6 +526,8 @@ def agent(
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
         restrict_to_workspace=config.tools.restrict_to_workspace,
+        subagent_config=config.agents.subagents,
+        router=_make_router(config, provider),
     )
     
     # Show spinner when logs are off (no output to miss); skip when logs are on
@@ -456,6 +544,7 @@ def agent(
             with _thinking_ctx():
                 response = await agent_loop.process_direct(message, session_id)
             _print_agent_response(response, render_markdown=markdown)
+            await agent_loop.close()
         
         asyncio.run(run_once())
     else:
@@ -495,6 +584,7 @@ def agent(
                     _restore_terminal()
                     console.print("\nGoodbye!")
                     break
+            await agent_loop.close()
         
         asyncio.run(run_interactive())
 
@@ -667,6 +757,7 @@ app.add_typer(cron_app, name="cron")
 @cron_app.command("list")
 def cron_list(
     all: bool = typer.Option(False, "--all", "-a", help="Include disabled jobs"),
+    next_runs: int = typer.Option(1, "--next", "-n", help="Show the next N run times per job"),
 ):
     """List scheduled jobs."""
     from nanobot.config.loader import get_data_dir
@@ -686,7 +777,7 @@ def cron_list(
     table.add_column("Name")
     table.add_column("Schedule")
     table.add_column("Status")
-    table.add_column("Next Run")
+    table.add_column("Next Run" if next_runs <= 1 else "Next Runs")
     
     import time
     for job in jobs:
@@ -695,14 +786,16 @@ def cron_list(
             sched = f"every {(job.schedule.every_ms or 0) // 1000}s"
         elif job.schedule.kind == "cron":
             sched = job.schedule.expr or ""
+            if job.schedule.tz:
+                sched += f" ({job.schedule.tz})"
         else:
             sched = "one-time"
         
-        # Format next run
-        next_run = ""
-        if job.state.next_run_at_ms:
-            next_time = time.strftime("%Y-%m-%d %H:%M", time.localtime(job.state.next_run_at_ms / 1000))
-            next_run = next_time
+        # Format next runs
+        next_run = "\n".join(
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(ms / 1000))
+            for ms in service.next_runs(job, max(1, next_runs))
+        )
         
         status = "[green]enabled[/green]" if job.enabled else "[dim]disabled[/dim]"
         
@@ -717,10 +810,15 @@ def cron_add(
     message: str = typer.Option(..., "--message", "-m", help="Message for agent"),
     every: int = typer.Option(None, "--every", "-e", help="Run every N seconds"),
     cron_expr: str = typer.Option(None, "--cron", "-c", help="Cron expression (e.g. '0 9 * * *')"),
+    tz: str = typer.Option(None, "--tz", help="IANA timezone for --cron (e.g. 'Asia/Shanghai'; default: host zone)"),
     at: str = typer.Option(None, "--at", help="Run once at time (ISO format)"),
     deliver: bool = typer.Option(False, "--deliver", "-d", help="Deliver response to channel"),
     to: str = typer.Option(None, "--to", help="Recipient for delivery"),
     channel: str = typer.Option(None, "--channel", help="Channel for delivery (e.g. 'telegram', 'whatsapp')"),
+    overlap: str = typer.Option("skip", "--overlap", help="If still running when due again: skip, queue or cancel_previous"),
+    timeout: int = typer.Option(0, "--timeout", help="Cancel a run after N seconds (0 = service default)"),
+    misfire: str = typer.Option("run_once", "--misfire", help="Runs missed while down: run_once, run_all or skip"),
+    misfire_grace: int = typer.Option(3600, "--misfire-grace", help="Only make up runs missed within N seconds (0 = any)"),
 ):
     """Add a scheduled job."""
     from nanobot.config.loader import get_data_dir
@@ -731,7 +829,7 @@ def cron_add(
     if every:
         schedule = CronSchedule(kind="every", every_ms=every * 1000)
     elif cron_expr:
-        schedule = CronSchedule(kind="cron", expr=cron_expr)
+        schedule = CronSchedule(kind="cron", expr=cron_expr, tz=tz)
     elif at:
         import datetime
         dt = datetime.datetime.fromisoformat(at)
@@ -740,17 +838,32 @@ def cron_add(
         console.print("[red]Error: Must specify --every, --cron, or --at[/red]")
         raise typer.Exit(1)
     
+    if overlap not in ("skip", "queue", "cancel_previous"):
+        console.print("[red]Error: --overlap must be skip, queue or cancel_previous[/red]")
+        raise typer.Exit(1)
+    if misfire not in ("run_once", "run_all", "skip"):
+        console.print("[red]Error: --misfire must be run_once, run_all or skip[/red]")
+        raise typer.Exit(1)
+    
     store_path = get_data_dir() / "cron" / "jobs.json"
     service = CronService(store_path)
     
-    job = service.add_job(
-        name=name,
-        schedule=schedule,
-        message=message,
-        deliver=deliver,
-        to=to,
-        channel=channel,
-    )
+    try:
+        job = service.add_job(
+            name=name,
+            schedule=schedule,
+            message=message,
+            deliver=deliver,
+            to=to,
+            channel=channel,
+            overlap_policy=overlap,
+            timeout_ms=timeout * 1000,
+            misfire_policy=misfire,
+            misfire_grace_ms=misfire_grace * 1000,
+        )
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
     
     console.print(f"[green]✓[/green] Added job '{job.name}' ({job.id})")
 
@@ -813,6 +926,130 @@ def cron_run(
         console.print(f"[red]Failed to run job {job_id}[/red]")
 
 
+@cron_app.command("history")
+def cron_history(
+    job_id: str = typer.Argument(None, help="Job ID (default: all jobs)"),
+    limit: int = typer.Option(20, "--limit", "-l", help="Number of runs to show"),
+    status: str = typer.Option(None, "--status", "-s", help="Only runs with this status (ok, error, timeout, cancelled)"),
+    days: int = typer.Option(None, "--days", "-d", help="Only runs from the last N days"),
+):
+    """Show recent runs of scheduled jobs, newest first."""
+    import time
+    from nanobot.config.loader import get_data_dir
+    from nanobot.cron.history import CronHistory
+    
+    history = CronHistory(get_data_dir() / "cron" / "history")
+    since_ms = int((time.time() - days * 86400) * 1000) if days else None
+    runs = history.query(job_id, limit=limit, status=status, since_ms=since_ms)
+    
+    if not runs:
+        console.print("No runs recorded.")
+        return
+    
+    table = Table(title="Cron Run History")
+    table.add_column("Job", style="cyan")
+    table.add_column("Started")
+    table.add_column("Duration")
+    table.add_column("Lag")
+    table.add_column("Status")
+    table.add_column("Tokens")
+    table.add_column("Trace")
+    table.add_column("Response / Error")
+    
+    styles = {"ok": "green", "error": "red", "timeout": "yellow", "cancelled": "dim"}
+    for run in runs:
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run.started_at_ms / 1000))
+        if run.catch_up:
+            started += " (catch-up)"
+        duration = f"{(run.duration_ms or 0) / 1000:.1f}s"
+        lag = f"{(run.started_at_ms - run.scheduled_at_ms) / 1000:.1f}s" if run.scheduled_at_ms else ""
+        style = styles.get(run.status or "", "")
+        status_text = f"[{style}]{run.status}[/{style}]" if style else str(run.status)
+        detail = (run.error or run.response or "").replace("\n", " ")
+        table.add_row(
+            run.job_id, started, duration, lag, status_text,
+            str(run.total_tokens) if run.total_tokens is not None else "",
+            run.case_id or "", detail[:80],
+        )
+    
+    console.print(table)
+
+
+# ============================================================================
+# Subagent Commands
+# ============================================================================
+
+subagents_app = typer.Typer(help="Inspect and cancel background subagents")
+app.add_typer(subagents_app, name="subagents")
+
+
+def _load_subagent_status() -> list[dict]:
+    """Read the status snapshot written by the running agent."""
+    import json
+    from nanobot.config.loader import get_data_dir
+    
+    path = get_data_dir() / "subagents" / "status.json"
+    if not path.exists():
+        return []
+    try:
+        return json.loads(path.read_text()).get("subagents", [])
+    except (OSError, ValueError):
+        return []
+
+
+@subagents_app.command("list")
+def subagents_list(
+    all: bool = typer.Option(False, "--all", "-a", help="Include finished subagents"),
+):
+    """List queued and running subagents."""
+    import time
+    
+    subagents = [
+        s for s in _load_subagent_status()
+        if all or s["status"] in ("queued", "running")
+    ]
+    if not subagents:
+        console.print("No subagents.")
+        return
+    
+    table = Table(title="Subagents")
+    table.add_column("ID", style="cyan")
+    table.add_column("Label")
+    table.add_column("Origin")
+    table.add_column("Priority")
+    table.add_column("Status")
+    table.add_column("Elapsed")
+    table.add_column("Tokens")
+    
+    for s in subagents:
+        elapsed = ""
+        if s.get("started_at"):
+            elapsed = f"{int((s.get('finished_at') or time.time()) - s['started_at'])}s"
+        origin = f"{s['origin']['channel']}:{s['origin']['chat_id']}"
+        table.add_row(s["id"], s["label"], origin, str(s["priority"]), s["status"], elapsed, str(s["tokens_used"]))
+    
+    console.print(table)
+
+
+@subagents_app.command("cancel")
+def subagents_cancel(
+    task_id: str = typer.Argument(..., help="Subagent ID to cancel"),
+):
+    """Cancel a queued or running subagent."""
+    from nanobot.config.loader import get_data_dir
+    
+    match = next((s for s in _load_subagent_status() if s["id"] == task_id), None)
+    if not match or match["status"] not in ("queued", "running"):
+        console.print(f"[red]No queued or running subagent {task_id}[/red]")
+        raise typer.Exit(1)
+    
+    # The agent polls for this file and cancels the subagent within about a second
+    cancel_dir = get_data_dir() / "subagents" / "cancel"
+    cancel_dir.mkdir(parents=True, exist_ok=True)
+    (cancel_dir / task_id).touch()
+    console.print(f"[green]✓[/green] Cancel requested for subagent {task_id}")
+
+
 # ============================================================================
 # Status Commands
 # ============================================================================
@@ -836,6 +1073,10 @@ def status():
         from nanobot.providers.registry import PROVIDERS
 
         console.print(f"Model: {config.agents.defaults.model}")
+        for task in ("consolidation", "heartbeat", "announce", "subagent"):
+            model = getattr(config.agents.defaults, f"{task}_model")
+            if model:
+                console.print(f"  {task}: {model}")
         
         # Check API keys from registry
         for spec in PROVIDERS:
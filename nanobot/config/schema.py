@@ -59,6 +59,8 @@ class EmailConfig(BaseModel):
     imap_password: str = ""
     imap_mailbox: str = "INBOX"
     imap_use_ssl: bool = True
+    imap_idle: bool = True  # Push via IMAP IDLE when the server supports it (else poll)
+    imap_idle_timeout: int = 300  # Seconds before re-issuing IDLE (RFC 2177 caps it at 29 min)
 
     # SMTP (send)
     smtp_host: str = ""
@@ -67,11 +69,13 @@ class EmailConfig(BaseModel):
     smtp_password: str = ""
     smtp_use_tls: bool = True
     smtp_use_ssl: bool = False
+    smtp_pool_size: int = 2  # Reused SMTP connections (and sender threads)
+    smtp_idle_timeout: int = 60  # Seconds before an unused SMTP connection is closed
     from_address: str = ""
 
     # Behavior
     auto_reply_enabled: bool = True  # If false, inbound email is read but no automatic reply is sent
-    poll_interval_seconds: int = 30
+    poll_interval_seconds: int = 30  # Used when IDLE is off or unsupported
     mark_seen: bool = True
     max_body_chars: int = 12000
     subject_prefix: str = "Re: "
@@ -142,6 +146,38 @@ class QQConfig(BaseModel):
     allow_from: list[str] = Field(default_factory=list)  # Allowed user openids (empty = public access)
 
 
+class ChannelRateLimitConfig(BaseModel):
+    """Outbound rate limit overrides for one channel (None = built-in platform default)."""
+    rate: float | None = None  # Sends per second across the channel
+    burst: float | None = None
+    chat_rate: float | None = None  # Sends per second to a single chat
+    chat_burst: float | None = None
+
+
+class RateLimitConfig(BaseModel):
+    """Outbound rate limiting shared by all channels."""
+    enabled: bool = True  # When false, sends are only delayed after a server-side 429
+    global_rate: float = 50.0  # Sends per second across all channels
+    max_retries: int = 5  # Retries after a 429 before a send is dropped
+    channels: dict[str, ChannelRateLimitConfig] = Field(default_factory=dict)  # Keyed by channel name
+
+
+class ChannelCoalesceConfig(BaseModel):
+    """Inbound coalescing overrides for one channel (None = global setting)."""
+    enabled: bool | None = None
+    quiet_ms: int | None = None
+    max_wait_ms: int | None = None
+
+
+class CoalesceConfig(BaseModel):
+    """Merge rapid-fire inbound messages from one sender into a single agent turn."""
+    enabled: bool = False  # Opt-in: adds up to quiet_ms of latency to every turn, even single messages
+    quiet_ms: int = 1500  # Publish once the sender has been quiet this long
+    max_wait_ms: int = 5000  # ...but never hold the first message longer than this
+    max_messages: int = 10  # Publish immediately once a burst reaches this size
+    channels: dict[str, ChannelCoalesceConfig] = Field(default_factory=dict)  # Keyed by channel name (mochat/email off by default)
+
+
 class ChannelsConfig(BaseModel):
     """Configuration for chat channels."""
     whatsapp: WhatsAppConfig = Field(default_factory=WhatsAppConfig)
@@ -153,6 +189,21 @@ class ChannelsConfig(BaseModel):
     email: EmailConfig = Field(default_factory=EmailConfig)
     slack: SlackConfig = Field(default_factory=SlackConfig)
     qq: QQConfig = Field(default_factory=QQConfig)
+    rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
+    coalesce: CoalesceConfig = Field(default_factory=CoalesceConfig)
+
+
+class TaskModelConfig(BaseModel):
+    """Sampling overrides for one task class (None = use the agent default)."""
+    max_tokens: int | None = None
+    temperature: float | None = None
+
+
+# Built-in settings for task classes not listed in agents.defaults.tasks
+_TASK_DEFAULTS = {
+    "consolidation": TaskModelConfig(max_tokens=4096, temperature=0.2),
+    "announce": TaskModelConfig(max_tokens=2048),
+}
 
 
 class AgentDefaults(BaseModel):
@@ -163,11 +214,41 @@ class AgentDefaults(BaseModel):
     temperature: float = 0.7
     max_tool_iterations: int = 20
     memory_window: int = 50
+    # Per-task-class models for auxiliary LLM calls (None = model)
+    consolidation_model: str | None = None  # Memory consolidation into MEMORY.md / HISTORY.md
+    heartbeat_model: str | None = None  # HEARTBEAT.md checks
+    announce_model: str | None = None  # Relaying subagent results to the user
+    subagent_model: str | None = None  # Background subagents
+    # Sampling overrides keyed by task class: main, consolidation, heartbeat, announce, subagent
+    tasks: dict[str, TaskModelConfig] = Field(default_factory=dict)
+
+    def task_route(self, task: str) -> tuple[str, int, float]:
+        """Resolve a task class to (model, max_tokens, temperature)."""
+        model = getattr(self, f"{task}_model", None) or self.model
+        settings = self.tasks.get(task) or _TASK_DEFAULTS.get(task) or TaskModelConfig()
+        return (
+            model,
+            settings.max_tokens if settings.max_tokens is not None else self.max_tokens,
+            settings.temperature if settings.temperature is not None else self.temperature,
+        )
+
+
+class SubagentConfig(BaseModel):
+    """Background subagent pool configuration."""
+    max_concurrent: int = 3  # Subagents running at once; the rest wait in a priority queue
+    max_queued: int = 20  # Subagents waiting across all sessions (0 = unlimited)
+    max_per_session: int = 5  # Queued + running subagents per origin chat (0 = unlimited)
+    max_iterations: int = 15
+    timeout: int = 900  # Wall-clock seconds per subagent (0 = unlimited)
+    token_budget: int = 0  # Total LLM tokens per subagent (0 = unlimited)
+    announce_window: float = 30.0  # Seconds to wait for sibling results before announcing (0 = announce each)
+    announce_batch_size: int = 5  # Announce as soon as this many results are pending
 
 
 class AgentsConfig(BaseModel):
     """Agent configuration."""
     defaults: AgentDefaults = Field(default_factory=AgentDefaults)
+    subagents: SubagentConfig = Field(default_factory=SubagentConfig)
 
 
 class ProviderConfig(BaseModel):
@@ -199,6 +280,52 @@ class GatewayConfig(BaseModel):
     port: int = 18790
 
 
+class HeartbeatConfig(BaseModel):
+    """Heartbeat (periodic HEARTBEAT.md check) configuration."""
+    enabled: bool = True
+    interval_s: int = 1800  # Check interval while there is work
+    max_interval_s: int = 14400  # Cap when backing off after repeated HEARTBEAT_OK
+    backoff_factor: float = 2.0  # Interval multiplier per consecutive HEARTBEAT_OK
+    watch: bool = True  # Check within seconds when HEARTBEAT.md changes
+
+
+class CronConfig(BaseModel):
+    """Cron scheduler configuration."""
+    max_concurrent: int = 4  # Jobs allowed to run at the same time
+    default_timeout: int = 0  # Seconds before a run is cancelled, unless the job sets its own (0 = none)
+
+
+class ImageModelConfig(BaseModel):
+    """Image preprocessing overrides for models whose name contains a keyword."""
+    max_dimension: int | None = None
+    quality: int | None = None
+    format: str | None = None
+
+
+class MediaConfig(BaseModel):
+    """Downloaded media store (~/.nanobot/media) configuration."""
+    max_size_mb: int = 1024  # Oldest media is deleted past this total size
+    max_age_days: int = 30  # Media not seen for this long is deleted (0 = keep)
+    data_url_cache_mb: int = 64  # In-memory cache of base64-encoded images sent to the LLM
+    # Images are downscaled and re-encoded (EXIF stripped) before being sent to the LLM
+    image_preprocess: bool = True
+    image_max_dimension: int | None = None  # Longest edge in pixels for all models (None = per-family built-ins, else 1568)
+    image_quality: int = 85
+    image_format: str = "jpeg"  # "jpeg" or "webp"
+    image_models: dict[str, ImageModelConfig] = Field(default_factory=dict)  # e.g. {"gemini": {"maxDimension": 3072}}
+
+
+class TranscriptionConfig(BaseModel):
+    """Voice message transcription configuration."""
+    backend: str = "auto"  # "groq", "local" (offline faster-whisper) or "auto" (Groq if keyed, else local)
+    local_model: str = "base"  # faster-whisper model size or path
+    local_compute_type: str = "int8"
+    local_threads: int = 0  # CPU threads for the local model (0 = library default)
+    language: str = ""  # Language hint for the local model, e.g. "en" (empty = detect)
+    max_batch: int = 8  # Voice notes transcribed per batch
+    batch_window_ms: int = 200  # How long to wait for more voice notes before sending a batch
+
+
 class WebSearchConfig(BaseModel):
     """Web search tool configuration."""
     api_key: str = ""  # Brave Search API key
@@ -213,6 +340,15 @@ class WebToolsConfig(BaseModel):
 class ExecToolConfig(BaseModel):
     """Shell exec tool configuration."""
     timeout: int = 60
+    # Per-command resource limits (0 = unlimited)
+    cpu_time_limit: int = 0  # CPU seconds (RLIMIT_CPU)
+    memory_limit_mb: int = 0  # Address space per process (RLIMIT_AS)
+    max_open_files: int = 0  # RLIMIT_NOFILE
+    max_processes: int = 0  # RLIMIT_NPROC (counts all processes of the user)
+    cgroup_memory_mb: int = 0  # cgroup v2 memory.max for the whole command tree, where delegated
+    report_usage: bool = True  # Append CPU seconds and peak RSS to command output
+    persistent_session: bool = False  # Keep one long-lived bash per agent session (cwd/env persist)
+    session_idle_timeout: int = 600  # Seconds before an idle persistent shell is reaped
 
 
 class ToolsConfig(BaseModel):
@@ -228,6 +364,10 @@ class Config(BaseSettings):
     channels: ChannelsConfig = Field(default_factory=ChannelsConfig)
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
+    cron: CronConfig = Field(default_factory=CronConfig)
+    heartbeat: HeartbeatConfig = Field(default_factory=HeartbeatConfig)
+    media: MediaConfig = Field(default_factory=MediaConfig)
+    transcription: TranscriptionConfig = Field(default_factory=TranscriptionConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
     
     @property
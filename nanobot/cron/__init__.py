@@ -1,6 +1,6 @@
 """Cron service for scheduled agent tasks."""
 
-from nanobot.cron.service import CronService
-from nanobot.cron.types import CronJob, CronSchedule
+from nanobot.cron.service import CronService, current_run
+from nanobot.cron.types import CronJob, CronRunRecord, CronSchedule
 
-__all__ = ["CronService", "CronJob", "CronSchedule"]
+__all__ = ["CronService", "CronJob", "CronRunRecord", "CronSchedule", "current_run"]
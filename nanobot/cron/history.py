@@ -0,0 +1,163 @@
+"""Append-only run history for cron jobs."""
+
+import heapq
+import itertools
+import json
+import os
+import time
+from pathlib import Path
+from typing import Iterator
+
+from loguru import logger
+
+from nanobot.cron.types import CronRunRecord
+
+_FIELDS = {
+    "job_id": "jobId",
+    "started_at_ms": "startedAtMs",
+    "ended_at_ms": "endedAtMs",
+    "duration_ms": "durationMs",
+    "status": "status",
+    "error": "error",
+    "response": "response",
+    "scheduled_at_ms": "scheduledAtMs",
+    "catch_up": "catchUp",
+    "total_tokens": "totalTokens",
+    "case_id": "caseId",
+}
+
+
+def _record_to_dict(record: CronRunRecord) -> dict:
+    return {key: getattr(record, attr) for attr, key in _FIELDS.items()}
+
+
+def _record_from_dict(d: dict) -> CronRunRecord:
+    return CronRunRecord(**{attr: d.get(key) for attr, key in _FIELDS.items() if key in d})
+
+
+class CronHistory:
+    """
+    Run history stored as one JSONL file per job, newest records last.
+
+    Appends are a single write each. A job's file is trimmed to the newest
+    max_runs records once it holds twice that many, so retention is bounded
+    while trimming stays rare. Reads walk files backwards from the end, so
+    recent history never requires loading a whole file.
+    """
+
+    _READ_CHUNK = 64 * 1024
+
+    def __init__(self, directory: Path, max_runs: int = 500, max_response_chars: int = 1000):
+        self.directory = directory
+        self.max_runs = max_runs
+        self.max_response_chars = max_response_chars
+        self._line_counts: dict[str, int] = {}
+
+    def _path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.jsonl"
+
+    def append(self, record: CronRunRecord) -> None:
+        """Append a run record, trimming the job's history when it grows too long."""
+        if record.response and len(record.response) > self.max_response_chars:
+            record.response = record.response[:self.max_response_chars] + "..."
+        path = self._path(record.job_id)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if record.job_id not in self._line_counts:
+                self._line_counts[record.job_id] = self._count_lines(path)
+            with open(path, "a") as f:
+                f.write(json.dumps(_record_to_dict(record), ensure_ascii=False) + "\n")
+            self._line_counts[record.job_id] += 1
+            if self._line_counts[record.job_id] >= 2 * self.max_runs:
+                self._trim(record.job_id)
+        except OSError as e:
+            logger.warning(f"Cron: failed to write run history for {record.job_id}: {e}")
+
+    def _count_lines(self, path: Path) -> int:
+        if not path.exists():
+            return 0
+        with open(path, "rb") as f:
+            return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(self._READ_CHUNK), b""))
+
+    def _trim(self, job_id: str) -> None:
+        """Rewrite a job's history with only its newest max_runs records."""
+        path = self._path(job_id)
+        keep = list(itertools.islice(self._reverse_lines(path), self.max_runs))
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.writelines(line + b"\n" for line in reversed(keep))
+        os.replace(tmp, path)
+        self._line_counts[job_id] = len(keep)
+
+    def _reverse_lines(self, path: Path) -> Iterator[bytes]:
+        """Yield the lines of a file from last to first, reading it in chunks from the end."""
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return
+        with f:
+            pos = f.seek(0, os.SEEK_END)
+            tail = b""
+            while pos > 0:
+                step = min(self._READ_CHUNK, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + tail).split(b"\n")
+                tail = lines.pop(0)
+                for line in reversed(lines):
+                    if line.strip():
+                        yield line
+            if tail.strip():
+                yield tail
+
+    def _iter_job(self, job_id: str) -> Iterator[CronRunRecord]:
+        """A job's records, newest first."""
+        for line in self._reverse_lines(self._path(job_id)):
+            try:
+                yield _record_from_dict(json.loads(line))
+            except (ValueError, TypeError):
+                continue  # Torn line from a crash mid-append
+
+    def query(
+        self,
+        job_id: str | None = None,
+        limit: int = 20,
+        status: str | None = None,
+        since_ms: int | None = None,
+    ) -> list[CronRunRecord]:
+        """
+        Newest run records first, for one job or merged across all jobs.
+
+        Only as much of each file is read as needed to fill limit.
+        """
+        if job_id:
+            streams = [self._iter_job(job_id)]
+        elif self.directory.exists():
+            streams = [self._iter_job(p.stem) for p in self.directory.glob("*.jsonl")]
+        else:
+            return []
+
+        merged = heapq.merge(*streams, key=lambda r: r.started_at_ms, reverse=True)
+        results: list[CronRunRecord] = []
+        for record in merged:
+            if since_ms and record.started_at_ms < since_ms:
+                break
+            if status and record.status != status:
+                continue
+            results.append(record)
+            if len(results) >= limit:
+                break
+        return results
+
+    def prune(self, keep_job_ids: set[str], max_age_days: int = 30) -> None:
+        """Delete histories of removed jobs once they have been idle for max_age_days."""
+        if not self.directory.exists():
+            return
+        cutoff = time.time() - max_age_days * 86400
+        for path in self.directory.glob("*.jsonl"):
+            try:
+                if path.stem not in keep_job_ids and path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    self._line_counts.pop(path.stem, None)
+            except OSError:
+                continue
@@ -1,148 +1,381 @@
 """Cron service for scheduling agent tasks."""
 
 import asyncio
+import functools
+import heapq
 import json
+import os
 import time
 import uuid
+from contextvars import ContextVar
+from datetime import datetime, tzinfo
 from pathlib import Path
 from typing import Any, Callable, Coroutine
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from loguru import logger
 
-from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronSchedule, CronStore
+from nanobot.cron.history import CronHistory
+from nanobot.cron.types import (
+    MISFIRE_POLICIES, OVERLAP_POLICIES,
+    CronJob, CronJobState, CronPayload, CronRunRecord, CronSchedule, CronStore,
+)
+
+# Record of the run in progress, visible to on_job callbacks
+_CURRENT_RUN: ContextVar[CronRunRecord | None] = ContextVar("nanobot_cron_run", default=None)
+
+
+def current_run() -> CronRunRecord | None:
+    """
+    The history record of the cron run executing in this task, if any.
+    
+    on_job callbacks can fill in details only they know, such as
+    total_tokens and case_id.
+    """
+    return _CURRENT_RUN.get()
 
 
 def _now_ms() -> int:
     return int(time.time() * 1000)
 
 
+@functools.lru_cache(maxsize=None)
+def _zone(tz: str | None) -> tzinfo:
+    """Resolve a job timezone; None means the host's local zone."""
+    if tz:
+        return ZoneInfo(tz)
+    key = os.environ.get("TZ", "").lstrip(":")
+    if not key:
+        link = os.path.realpath("/etc/localtime")
+        key = link.split("zoneinfo/", 1)[1] if "zoneinfo/" in link else ""
+    try:
+        return ZoneInfo(key) if key else datetime.now().astimezone().tzinfo
+    except (ZoneInfoNotFoundError, ValueError):
+        # Fixed offset: right today, but blind to DST changes
+        return datetime.now().astimezone().tzinfo
+
+
+@functools.lru_cache(maxsize=1024)
+def _cron_iter(expr: str, tz: str | None) -> Any:
+    """Parse a cron expression once; the iterator is re-positioned for each use."""
+    from croniter import croniter
+    return croniter(expr, datetime.now(_zone(tz)))
+
+
+def _cron_next_runs(expr: str, tz: str | None, after_ms: int, count: int) -> list[int]:
+    """
+    Next count fire times (ms) of a cron expression after a time, in the job's zone.
+    
+    Wall-clock times skipped by a DST spring-forward fire right after the gap.
+    Fixed-hour expressions fire once, not twice, when clocks fall back.
+    """
+    zone = _zone(tz)
+    it = _cron_iter(expr, tz)
+    it.set_current(datetime.fromtimestamp(after_ms / 1000, zone), force=True)
+    fixed_hour = len(expr.split()) > 1 and not expr.split()[1].startswith("*")
+    runs: list[int] = []
+    while len(runs) < count:
+        fire = it.get_next(datetime)
+        if fixed_hour and fire.fold:
+            continue  # Second pass through a repeated hour
+        runs.append(int(fire.timestamp() * 1000))
+    return runs
+
+
 def _compute_next_run(schedule: CronSchedule, now_ms: int) -> int | None:
     """Compute next run time in ms."""
+    runs = _compute_next_runs(schedule, now_ms, 1)
+    return runs[0] if runs else None
+
+
+def _compute_next_runs(schedule: CronSchedule, now_ms: int, count: int) -> list[int]:
+    """Compute the next count run times in ms."""
     if schedule.kind == "at":
-        return schedule.at_ms if schedule.at_ms and schedule.at_ms > now_ms else None
+        return [schedule.at_ms] if schedule.at_ms and schedule.at_ms > now_ms else []
     
     if schedule.kind == "every":
         if not schedule.every_ms or schedule.every_ms <= 0:
-            return None
+            return []
         # Next interval from now
-        return now_ms + schedule.every_ms
+        return [now_ms + k * schedule.every_ms for k in range(1, count + 1)]
     
     if schedule.kind == "cron" and schedule.expr:
         try:
-            from croniter import croniter
-            cron = croniter(schedule.expr, time.time())
-            next_time = cron.get_next()
-            return int(next_time * 1000)
+            return _cron_next_runs(schedule.expr, schedule.tz, now_ms, count)
         except Exception:
-            return None
+            return []
     
-    return None
+    return []
+
+
+def _job_from_dict(j: dict[str, Any]) -> CronJob:
+    """Build a job from its stored (camelCase) form."""
+    return CronJob(
+        id=j["id"],
+        name=j["name"],
+        enabled=j.get("enabled", True),
+        schedule=CronSchedule(
+            kind=j["schedule"]["kind"],
+            at_ms=j["schedule"].get("atMs"),
+            every_ms=j["schedule"].get("everyMs"),
+            expr=j["schedule"].get("expr"),
+            tz=j["schedule"].get("tz"),
+        ),
+        payload=CronPayload(
+            kind=j["payload"].get("kind", "agent_turn"),
+            message=j["payload"].get("message", ""),
+            deliver=j["payload"].get("deliver", False),
+            channel=j["payload"].get("channel"),
+            to=j["payload"].get("to"),
+        ),
+        state=CronJobState(
+            next_run_at_ms=j.get("state", {}).get("nextRunAtMs"),
+            last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
+            last_status=j.get("state", {}).get("lastStatus"),
+            last_error=j.get("state", {}).get("lastError"),
+            last_duration_ms=j.get("state", {}).get("lastDurationMs"),
+            last_lag_ms=j.get("state", {}).get("lastLagMs"),
+            catch_up_runs=j.get("state", {}).get("catchUpRuns", 0),
+            missed_runs=j.get("state", {}).get("missedRuns", 0),
+            last_catch_up_at_ms=j.get("state", {}).get("lastCatchUpAtMs"),
+        ),
+        created_at_ms=j.get("createdAtMs", 0),
+        updated_at_ms=j.get("updatedAtMs", 0),
+        delete_after_run=j.get("deleteAfterRun", False),
+        overlap_policy=j.get("overlapPolicy", "skip"),
+        timeout_ms=j.get("timeoutMs", 0),
+        misfire_policy=j.get("misfirePolicy", "run_once"),
+        misfire_grace_ms=j.get("misfireGraceMs", 3_600_000),
+    )
+
+
+def _job_to_dict(j: CronJob) -> dict[str, Any]:
+    """Convert a job to its stored (camelCase) form."""
+    return {
+        "id": j.id,
+        "name": j.name,
+        "enabled": j.enabled,
+        "schedule": {
+            "kind": j.schedule.kind,
+            "atMs": j.schedule.at_ms,
+            "everyMs": j.schedule.every_ms,
+            "expr": j.schedule.expr,
+            "tz": j.schedule.tz,
+        },
+        "payload": {
+            "kind": j.payload.kind,
+            "message": j.payload.message,
+            "deliver": j.payload.deliver,
+            "channel": j.payload.channel,
+            "to": j.payload.to,
+        },
+        "state": {
+            "nextRunAtMs": j.state.next_run_at_ms,
+            "lastRunAtMs": j.state.last_run_at_ms,
+            "lastStatus": j.state.last_status,
+            "lastError": j.state.last_error,
+            "lastDurationMs": j.state.last_duration_ms,
+            "lastLagMs": j.state.last_lag_ms,
+            "catchUpRuns": j.state.catch_up_runs,
+            "missedRuns": j.state.missed_runs,
+            "lastCatchUpAtMs": j.state.last_catch_up_at_ms,
+        },
+        "createdAtMs": j.created_at_ms,
+        "updatedAtMs": j.updated_at_ms,
+        "deleteAfterRun": j.delete_after_run,
+        "overlapPolicy": j.overlap_policy,
+        "timeoutMs": j.timeout_ms,
+        "misfirePolicy": j.misfire_policy,
+        "misfireGraceMs": j.misfire_grace_ms,
+    }
 
 
 class CronService:
-    """Service for managing and executing scheduled jobs."""
+    """
+    Service for managing and executing scheduled jobs.
+    
+    Due jobs come off a min-heap keyed on next_run_at_ms. Jobs persist as a
+    jobs.json snapshot plus an append-only journal of per-job changes.
+    
+    Due jobs run concurrently, at most max_concurrent at a time. A job that
+    comes due while its previous run is still going follows its
+    overlap_policy: skip the new run, queue one run for afterwards, or
+    cancel the previous run.
+    """
+    
+    _JOURNAL_MIN_COMPACT = 1000  # Journal records tolerated before compacting
+    _MAX_CATCH_UP = 100  # Most missed runs replayed for misfire_policy "run_all"
+    _MAX_MISSED_SCAN = 10_000  # Cron occurrences examined when counting missed runs
     
     def __init__(
         self,
         store_path: Path,
-        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None
+        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None,
+        max_concurrent: int = 4,
+        default_timeout_s: int = 0,
+        history_max_runs: int = 500,
     ):
         self.store_path = store_path
         self.on_job = on_job  # Callback to execute job, returns response text
+        self.max_concurrent = max_concurrent
+        self.default_timeout_s = default_timeout_s  # 0 = no timeout
+        self.history = CronHistory(store_path.parent / "history", max_runs=history_max_runs)
         self._store: CronStore | None = None
+        self._jobs_by_id: dict[str, CronJob] = {}
+        self._heap: list[tuple[int, str]] = []
+        self._generation = ""
+        self._journal_records = 0
         self._timer_task: asyncio.Task | None = None
         self._running = False
+        self._slots: asyncio.Semaphore | None = None
+        self._job_tasks: dict[str, asyncio.Task] = {}  # job_id -> current run
+        self._queued_runs: dict[str, int] = {}  # job_id -> scheduled ms of one waiting run
+    
+    @property
+    def journal_path(self) -> Path:
+        return self.store_path.with_name(self.store_path.name + ".journal")
     
     def _load_store(self) -> CronStore:
-        """Load jobs from disk."""
+        """Load jobs from disk: the snapshot, then any journaled changes on top."""
         if self._store:
             return self._store
         
+        self._store = CronStore()
         if self.store_path.exists():
             try:
                 data = json.loads(self.store_path.read_text())
-                jobs = []
-                for j in data.get("jobs", []):
-                    jobs.append(CronJob(
-                        id=j["id"],
-                        name=j["name"],
-                        enabled=j.get("enabled", True),
-                        schedule=CronSchedule(
-                            kind=j["schedule"]["kind"],
-                            at_ms=j["schedule"].get("atMs"),
-                            every_ms=j["schedule"].get("everyMs"),
-                            expr=j["schedule"].get("expr"),
-                            tz=j["schedule"].get("tz"),
-                        ),
-                        payload=CronPayload(
-                            kind=j["payload"].get("kind", "agent_turn"),
-                            message=j["payload"].get("message", ""),
-                            deliver=j["payload"].get("deliver", False),
-                            channel=j["payload"].get("channel"),
-                            to=j["payload"].get("to"),
-                        ),
-                        state=CronJobState(
-                            next_run_at_ms=j.get("state", {}).get("nextRunAtMs"),
-                            last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
-                            last_status=j.get("state", {}).get("lastStatus"),
-                            last_error=j.get("state", {}).get("lastError"),
-                        ),
-                        created_at_ms=j.get("createdAtMs", 0),
-                        updated_at_ms=j.get("updatedAtMs", 0),
-                        delete_after_run=j.get("deleteAfterRun", False),
-                    ))
-                self._store = CronStore(jobs=jobs)
+                self._store.jobs = [_job_from_dict(j) for j in data.get("jobs", [])]
+                self._generation = data.get("generation", "")
             except Exception as e:
                 logger.warning(f"Failed to load cron store: {e}")
-                self._store = CronStore()
-        else:
-            self._store = CronStore()
         
+        self._jobs_by_id = {j.id: j for j in self._store.jobs}
+        self._replay_journal()
+        self._store.jobs = list(self._jobs_by_id.values())
+        self._rebuild_heap()
         return self._store
     
+    def _replay_journal(self) -> None:
+        """Apply journal records written since the last snapshot."""
+        if not self.journal_path.exists():
+            return
+        try:
+            data = self.journal_path.read_bytes()
+            if not data.endswith(b"\n"):
+                # Torn last line from a crash mid-append: cut it off so the next append starts clean
+                data = data[:data.rfind(b"\n") + 1]
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(len(data))
+            lines = data.decode("utf-8", errors="replace").splitlines()
+        except OSError as e:
+            logger.warning(f"Failed to read cron journal: {e}")
+            return
+        if not lines:
+            return
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            header = {}
+        if header.get("generation") != self._generation:
+            # Journal belongs to another snapshot (e.g. jobs.json was replaced by hand).
+            # Drop it, or new appends would land behind its stale header and be ignored too.
+            logger.warning("Cron journal does not match jobs.json, discarding it")
+            self.journal_path.unlink(missing_ok=True)
+            return
+        
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("op") == "put":
+                job = _job_from_dict(record["job"])
+                self._jobs_by_id[job.id] = job
+            elif record.get("op") == "del":
+                self._jobs_by_id.pop(record["id"], None)
+        self._journal_records = len(lines) - 1
+    
     def _save_store(self) -> None:
-        """Save jobs to disk."""
+        """Write a full snapshot atomically and start a fresh journal."""
         if not self._store:
             return
         
         self.store_path.parent.mkdir(parents=True, exist_ok=True)
-        
+        self._generation = uuid.uuid4().hex
         data = {
             "version": self._store.version,
-            "jobs": [
-                {
-                    "id": j.id,
-                    "name": j.name,
-                    "enabled": j.enabled,
-                    "schedule": {
-                        "kind": j.schedule.kind,
-                        "atMs": j.schedule.at_ms,
-                        "everyMs": j.schedule.every_ms,
-                        "expr": j.schedule.expr,
-                        "tz": j.schedule.tz,
-                    },
-                    "payload": {
-                        "kind": j.payload.kind,
-                        "message": j.payload.message,
-                        "deliver": j.payload.deliver,
-                        "channel": j.payload.channel,
-                        "to": j.payload.to,
-                    },
-                    "state": {
-                        "nextRunAtMs": j.state.next_run_at_ms,
-                        "lastRunAtMs": j.state.last_run_at_ms,
-                        "lastStatus": j.state.last_status,
-                        "lastError": j.state.last_error,
-                    },
-                    "createdAtMs": j.created_at_ms,
-                    "updatedAtMs": j.updated_at_ms,
-                    "deleteAfterRun": j.delete_after_run,
-                }
-                for j in self._store.jobs
-            ]
+            "generation": self._generation,
+            "jobs": [_job_to_dict(j) for j in self._store.jobs],
         }
         
-        self.store_path.write_text(json.dumps(data, indent=2))
+        tmp = self.store_path.with_name(self.store_path.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.store_path)
+        self.journal_path.unlink(missing_ok=True)
+        self._journal_records = 0
+    
+    def _save_jobs(self, jobs: list[CronJob], removed: list[str] | None = None) -> None:
+        """
+        Persist changes to some jobs by appending to the journal.
+        
+        Each record is written with a single append, so a crash can at most
+        leave a torn last line, which is truncated away on load. The journal is
+        folded into a new snapshot once it outgrows the job list.
+        """
+        if not self._store:
+            return
+        if not self.store_path.exists():
+            self._save_store()
+            return
+        
+        lines = [json.dumps({"op": "put", "job": _job_to_dict(j)}, separators=(",", ":")) for j in jobs]
+        lines += [json.dumps({"op": "del", "id": job_id}) for job_id in removed or []]
+        if not lines:
+            return
+        if self._journal_records + len(lines) > max(self._JOURNAL_MIN_COMPACT, len(self._store.jobs)):
+            self._save_store()
+            return
+        
+        if self._journal_records == 0:
+            lines.insert(0, json.dumps({"generation": self._generation}))
+        with open(self.journal_path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+        self._journal_records += len(lines)
+    
+    # ========== Scheduling heap ==========
+    
+    def _rebuild_heap(self) -> None:
+        """Rebuild the (next_run_at_ms, job_id) min-heap from all enabled jobs."""
+        self._heap = [
+            (j.state.next_run_at_ms, j.id) for j in self._jobs_by_id.values()
+            if j.enabled and j.state.next_run_at_ms
+        ]
+        heapq.heapify(self._heap)
+    
+    def _schedule(self, job: CronJob) -> None:
+        """
+        Push a job's current next run onto the heap.
+        
+        Superseded entries are not removed; they are discarded lazily when
+        they reach the top and no longer match the job's state.
+        """
+        if job.enabled and job.state.next_run_at_ms:
+            heapq.heappush(self._heap, (job.state.next_run_at_ms, job.id))
+            if len(self._heap) > 2 * len(self._jobs_by_id) + 64:
+                self._rebuild_heap()
+    
+    def _peek_next(self) -> tuple[int, CronJob] | None:
+        """Return the earliest valid heap entry, discarding stale ones."""
+        while self._heap:
+            run_at, job_id = self._heap[0]
+            job = self._jobs_by_id.get(job_id)
+            if job and job.enabled and job.state.next_run_at_ms == run_at:
+                return run_at, job
+            heapq.heappop(self._heap)
+        return None
     
     async def start(self) -> None:
         """Start the cron service."""
@@ -150,6 +383,7 @@ class CronService:
         self._load_store()
         self._recompute_next_runs()
         self._save_store()
+        self.history.prune(set(self._jobs_by_id))
         self._arm_timer()
         logger.info(f"Cron service started with {len(self._store.jobs if self._store else [])} jobs")
     
@@ -159,23 +393,85 @@ class CronService:
         if self._timer_task:
             self._timer_task.cancel()
             self._timer_task = None
+        self._queued_runs.clear()
+        for task in list(self._job_tasks.values()):
+            task.cancel()
     
     def _recompute_next_runs(self) -> None:
-        """Recompute next run times for all enabled jobs."""
+        """
+        Recompute next run times for all enabled jobs, catching up on misfires.
+        
+        Runs that came due while the service was down are found from the
+        persisted next_run_at_ms (or last_run_at_ms for older stores) and
+        handled per the job's misfire_policy; only those within the job's
+        grace window are made up.
+        """
         if not self._store:
             return
         now = _now_ms()
-        for job in self._store.jobs:
-            if job.enabled:
-                job.state.next_run_at_ms = _compute_next_run(job.schedule, now)
+        catch_ups: list[tuple[CronJob, list[int]]] = []
+        for job in list(self._store.jobs):
+            if not job.enabled:
+                continue
+            count, recent = self._missed_runs(job, now)
+            if count:
+                grace = job.misfire_grace_ms
+                runs = [t for t in recent if not grace or now - t <= grace]
+                if job.misfire_policy == "run_once":
+                    runs = runs[-1:]
+                elif job.misfire_policy == "skip":
+                    runs = []
+                job.state.missed_runs += count - len(runs)
+                logger.info(
+                    f"Cron: job '{job.name}' missed {count} run(s) while down, "
+                    f"catching up {len(runs)} ({job.misfire_policy})"
+                )
+                if runs:
+                    job.state.catch_up_runs += len(runs)
+                    job.state.last_catch_up_at_ms = now
+                    catch_ups.append((job, runs))
+                if job.schedule.kind == "at":
+                    self._advance(job)
+                    continue
+            job.state.next_run_at_ms = _compute_next_run(job.schedule, now)
+        self._rebuild_heap()
+        
+        for job, runs in catch_ups:
+            self._dispatch(job, runs, catch_up=True)
+    
+    def _missed_runs(self, job: CronJob, now_ms: int) -> tuple[int, list[int]]:
+        """Count the job's runs due before now; also return the latest of them."""
+        schedule = job.schedule
+        if schedule.kind == "at":
+            due = schedule.at_ms and schedule.at_ms <= now_ms and not job.state.last_run_at_ms
+            return (1, [schedule.at_ms]) if due else (0, [])
+        
+        first = job.state.next_run_at_ms
+        if not first and job.state.last_run_at_ms:
+            first = _compute_next_run(schedule, job.state.last_run_at_ms)
+        if not first or first > now_ms:
+            return 0, []
+        
+        if schedule.kind == "every" and schedule.every_ms:
+            count = (now_ms - first) // schedule.every_ms + 1
+            start = max(0, count - self._MAX_CATCH_UP)
+            return count, [first + k * schedule.every_ms for k in range(start, count)]
+        
+        recent: list[int] = []
+        count = 0
+        t: int | None = first
+        while t is not None and t <= now_ms and count < self._MAX_MISSED_SCAN:
+            count += 1
+            recent = (recent + [t])[-self._MAX_CATCH_UP:]
+            t = _compute_next_run(schedule, t)
+        return count, recent
     
     def _get_next_wake_ms(self) -> int | None:
         """Get the earliest next run time across all jobs."""
         if not self._store:
             return None
-        times = [j.state.next_run_at_ms for j in self._store.jobs 
-                 if j.enabled and j.state.next_run_at_ms]
-        return min(times) if times else None
+        top = self._peek_next()
+        return top[0] if top else None
     
     def _arm_timer(self) -> None:
         """Schedule the next timer tick."""
@@ -197,54 +493,157 @@ class CronService:
         self._timer_task = asyncio.create_task(tick())
     
     async def _on_timer(self) -> None:
-        """Handle timer tick - run due jobs."""
+        """Handle timer tick - start due jobs without waiting for them."""
         if not self._store:
             return
         
         now = _now_ms()
-        due_jobs = [
-            j for j in self._store.jobs
-            if j.enabled and j.state.next_run_at_ms and now >= j.state.next_run_at_ms
-        ]
+        due: dict[str, tuple[CronJob, int]] = {}
+        while (top := self._peek_next()) and top[0] <= now:
+            heapq.heappop(self._heap)
+            due[top[1].id] = (top[1], top[0])
         
-        for job in due_jobs:
-            await self._execute_job(job)
+        for job, scheduled_ms in due.values():
+            self._advance(job)
+            self._dispatch(job, [scheduled_ms])
         
-        self._save_store()
+        self._save_jobs(
+            [job for job, _ in due.values() if job.id in self._jobs_by_id],
+            removed=[job_id for job_id in due if job_id not in self._jobs_by_id],
+        )
         self._arm_timer()
     
-    async def _execute_job(self, job: CronJob) -> None:
-        """Execute a single job."""
+    def _advance(self, job: CronJob) -> None:
+        """Move a job past its current run: next occurrence, or retire a one-shot."""
+        if job.schedule.kind == "at":
+            if job.delete_after_run:
+                self._store.jobs = [j for j in self._store.jobs if j.id != job.id]
+                self._jobs_by_id.pop(job.id, None)
+            else:
+                job.enabled = False
+                job.state.next_run_at_ms = None
+        else:
+            job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+            self._schedule(job)
+    
+    def _dispatch(self, job: CronJob, runs: list[int], catch_up: bool = False) -> None:
+        """
+        Start runs of a job in the background, applying its overlap policy.
+        
+        runs holds the scheduled times to run for, one after another
+        (several only when catching up with misfire_policy "run_all").
+        """
+        previous = self._job_tasks.get(job.id)
+        if previous and not previous.done():
+            if job.overlap_policy == "queue":
+                # Coalesce: at most one run waits behind the current one
+                self._queued_runs.setdefault(job.id, runs[-1])
+                logger.info(f"Cron: job '{job.name}' still running, queued next run")
+                return
+            if job.overlap_policy == "cancel_previous":
+                logger.warning(f"Cron: job '{job.name}' still running, cancelling previous run")
+                previous.cancel()
+            else:
+                logger.warning(f"Cron: job '{job.name}' still running, skipped this run")
+                return
+        
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.max_concurrent))
+        task = asyncio.create_task(self._run_in_slot(job, runs, catch_up))
+        self._job_tasks[job.id] = task
+        task.add_done_callback(lambda t, job_id=job.id: self._on_run_done(job_id, t))
+    
+    async def _run_in_slot(self, job: CronJob, runs: list[int], catch_up: bool = False) -> None:
+        for i, scheduled_ms in enumerate(runs):
+            try:
+                await self._slots.acquire()
+            except asyncio.CancelledError:
+                # Cancelled (e.g. by cancel_previous) while waiting for a slot
+                self._record_unstarted(job, runs[i:], catch_up)
+                raise
+            try:
+                await self._execute_job(job, scheduled_ms, catch_up=catch_up)
+            except asyncio.CancelledError:
+                self._record_unstarted(job, runs[i + 1:], catch_up)
+                raise
+            finally:
+                self._slots.release()
+    
+    def _record_unstarted(self, job: CronJob, runs: list[int], catch_up: bool) -> None:
+        """Record runs that were cancelled before they started."""
+        for scheduled_ms in runs:
+            job.state.last_status = "cancelled"
+            job.state.last_error = "Cancelled before it started"
+            logger.warning(f"Cron: job '{job.name}' cancelled before it started")
+            record = CronRunRecord(job_id=job.id, started_at_ms=_now_ms(), scheduled_at_ms=scheduled_ms, catch_up=catch_up)
+            self._record_run(job, record)
+    
+    def _on_run_done(self, job_id: str, task: asyncio.Task) -> None:
+        if self._job_tasks.get(job_id) is task:
+            del self._job_tasks[job_id]
+        scheduled_ms = self._queued_runs.pop(job_id, None)
+        job = self._jobs_by_id.get(job_id)
+        if scheduled_ms is not None and job and self._running:
+            self._dispatch(job, [scheduled_ms])
+    
+    async def _execute_job(
+        self,
+        job: CronJob,
+        scheduled_ms: int | None = None,
+        catch_up: bool = False,
+    ) -> None:
+        """Execute a single job and record its outcome, duration and lag."""
         start_ms = _now_ms()
+        timeout_s = job.timeout_ms / 1000 if job.timeout_ms else self.default_timeout_s
+        record = CronRunRecord(job_id=job.id, started_at_ms=start_ms, scheduled_at_ms=scheduled_ms, catch_up=catch_up)
+        _CURRENT_RUN.set(record)
         logger.info(f"Cron: executing job '{job.name}' ({job.id})")
         
         try:
             response = None
             if self.on_job:
-                response = await self.on_job(job)
+                response = await asyncio.wait_for(self.on_job(job), timeout=timeout_s or None)
             
             job.state.last_status = "ok"
             job.state.last_error = None
+            record.response = response
             logger.info(f"Cron: job '{job.name}' completed")
             
+        except asyncio.TimeoutError:
+            job.state.last_status = "timeout"
+            job.state.last_error = f"Timed out after {timeout_s:g}s"
+            logger.error(f"Cron: job '{job.name}' timed out after {timeout_s:g}s")
+        
+        except asyncio.CancelledError:
+            job.state.last_status = "cancelled"
+            job.state.last_error = None
+            logger.warning(f"Cron: job '{job.name}' cancelled")
+            self._record_run(job, record)
+            raise
+            
         except Exception as e:
             job.state.last_status = "error"
             job.state.last_error = str(e)
             logger.error(f"Cron: job '{job.name}' failed: {e}")
         
-        job.state.last_run_at_ms = start_ms
-        job.updated_at_ms = _now_ms()
+        self._record_run(job, record)
+    
+    def _record_run(self, job: CronJob, record: CronRunRecord) -> None:
+        now = _now_ms()
+        record.ended_at_ms = now
+        record.duration_ms = now - record.started_at_ms
+        record.status = job.state.last_status
+        record.error = job.state.last_error
+        self.history.append(record)
         
-        # Handle one-shot jobs
-        if job.schedule.kind == "at":
-            if job.delete_after_run:
-                self._store.jobs = [j for j in self._store.jobs if j.id != job.id]
-            else:
-                job.enabled = False
-                job.state.next_run_at_ms = None
-        else:
-            # Compute next run
-            job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+        job.state.last_run_at_ms = record.started_at_ms
+        job.state.last_duration_ms = record.duration_ms
+        job.state.last_lag_ms = (
+            record.started_at_ms - record.scheduled_at_ms if record.scheduled_at_ms else None
+        )
+        job.updated_at_ms = now
+        if job.id in self._jobs_by_id:
+            self._save_jobs([job])
     
     # ========== Public API ==========
     
@@ -254,6 +653,13 @@ class CronService:
         jobs = store.jobs if include_disabled else [j for j in store.jobs if j.enabled]
         return sorted(jobs, key=lambda j: j.state.next_run_at_ms or float('inf'))
     
+    def next_runs(self, job: CronJob, count: int = 5) -> list[int]:
+        """Preview a job's next count run times in ms, starting from its scheduled next run."""
+        if not job.enabled or not job.state.next_run_at_ms:
+            return []
+        first = job.state.next_run_at_ms
+        return [first] + _compute_next_runs(job.schedule, first, count - 1) if count > 1 else [first]
+    
     def add_job(
         self,
         name: str,
@@ -263,10 +669,26 @@ class CronService:
         channel: str | None = None,
         to: str | None = None,
         delete_after_run: bool = False,
+        overlap_policy: str = "skip",
+        timeout_ms: int = 0,
+        misfire_policy: str = "run_once",
+        misfire_grace_ms: int = 3_600_000,
     ) -> CronJob:
-        """Add a new job."""
+        """Add a new job. Raises ValueError for an invalid cron expression, timezone or policy."""
         store = self._load_store()
         now = _now_ms()
+        if schedule.kind == "cron":
+            from croniter import croniter
+            if not schedule.expr or not croniter.is_valid(schedule.expr):
+                raise ValueError(f"Invalid cron expression: {schedule.expr!r}")
+            try:
+                _zone(schedule.tz)
+            except (ZoneInfoNotFoundError, ValueError):
+                raise ValueError(f"Unknown timezone: {schedule.tz!r}")
+        if overlap_policy not in OVERLAP_POLICIES:
+            raise ValueError(f"Invalid overlap policy: {overlap_policy!r}")
+        if misfire_policy not in MISFIRE_POLICIES:
+            raise ValueError(f"Invalid misfire policy: {misfire_policy!r}")
         
         job = CronJob(
             id=str(uuid.uuid4())[:8],
@@ -284,10 +706,16 @@ class CronService:
             created_at_ms=now,
             updated_at_ms=now,
             delete_after_run=delete_after_run,
+            overlap_policy=overlap_policy,
+            timeout_ms=timeout_ms,
+            misfire_policy=misfire_policy,
+            misfire_grace_ms=misfire_grace_ms,
         )
         
         store.jobs.append(job)
-        self._save_store()
+        self._jobs_by_id[job.id] = job
+        self._schedule(job)
+        self._save_jobs([job])
         self._arm_timer()
         
         logger.info(f"Cron: added job '{name}' ({job.id})")
@@ -296,12 +724,11 @@ class CronService:
     def remove_job(self, job_id: str) -> bool:
         """Remove a job by ID."""
         store = self._load_store()
-        before = len(store.jobs)
-        store.jobs = [j for j in store.jobs if j.id != job_id]
-        removed = len(store.jobs) < before
+        removed = self._jobs_by_id.pop(job_id, None) is not None
         
         if removed:
-            self._save_store()
+            store.jobs = [j for j in store.jobs if j.id != job_id]
+            self._save_jobs([], removed=[job_id])
             self._arm_timer()
             logger.info(f"Cron: removed job {job_id}")
         
@@ -309,32 +736,35 @@ class CronService:
     
     def enable_job(self, job_id: str, enabled: bool = True) -> CronJob | None:
         """Enable or disable a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                job.enabled = enabled
-                job.updated_at_ms = _now_ms()
-                if enabled:
-                    job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
-                else:
-                    job.state.next_run_at_ms = None
-                self._save_store()
-                self._arm_timer()
-                return job
-        return None
+        self._load_store()
+        job = self._jobs_by_id.get(job_id)
+        if not job:
+            return None
+        job.enabled = enabled
+        job.updated_at_ms = _now_ms()
+        if enabled:
+            job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+            self._schedule(job)
+        else:
+            job.state.next_run_at_ms = None
+        self._save_jobs([job])
+        self._arm_timer()
+        return job
     
     async def run_job(self, job_id: str, force: bool = False) -> bool:
         """Manually run a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                if not force and not job.enabled:
-                    return False
-                await self._execute_job(job)
-                self._save_store()
-                self._arm_timer()
-                return True
-        return False
+        self._load_store()
+        job = self._jobs_by_id.get(job_id)
+        if not job or (not force and not job.enabled):
+            return False
+        await self._execute_job(job)
+        self._advance(job)
+        if job.id in self._jobs_by_id:
+            self._save_jobs([job])
+        else:
+            self._save_jobs([], removed=[job.id])
+        self._arm_timer()
+        return True
     
     def status(self) -> dict:
         """Get service status."""
@@ -3,6 +3,9 @@
 from dataclasses import dataclass, field
 from typing import Literal
 
+OVERLAP_POLICIES = ("skip", "queue", "cancel_previous")
+MISFIRE_POLICIES = ("run_once", "run_all", "skip")
+
 
 @dataclass
 class CronSchedule:
@@ -34,8 +37,13 @@ class CronJobState:
     """Runtime state of a job."""
     next_run_at_ms: int | None = None
     last_run_at_ms: int | None = None
-    last_status: Literal["ok", "error", "skipped"] | None = None
+    last_status: Literal["ok", "error", "skipped", "timeout", "cancelled"] | None = None
     last_error: str | None = None
+    last_duration_ms: int | None = None  # How long the last run took
+    last_lag_ms: int | None = None  # Delay between scheduled and actual start of the last run
+    catch_up_runs: int = 0  # Runs made up for after downtime
+    missed_runs: int = 0  # Runs lost to downtime (outside the grace window or misfire_policy "skip")
+    last_catch_up_at_ms: int | None = None
 
 
 @dataclass
@@ -50,6 +58,12 @@ class CronJob:
     created_at_ms: int = 0
     updated_at_ms: int = 0
     delete_after_run: bool = False
+    # What to do when the job comes due while its previous run is still going
+    overlap_policy: Literal["skip", "queue", "cancel_previous"] = "skip"
+    timeout_ms: int = 0  # Per-run timeout (0 = service default)
+    # Runs missed while the service was down: run the latest once, run each, or skip them
+    misfire_policy: Literal["run_once", "run_all", "skip"] = "run_once"
+    misfire_grace_ms: int = 3_600_000  # Only make up runs missed this recently (0 = any age)
 
 
 @dataclass
@@ -57,3 +71,19 @@ class CronStore:
     """Persistent store for cron jobs."""
     version: int = 1
     jobs: list[CronJob] = field(default_factory=list)
+
+
+@dataclass
+class CronRunRecord:
+    """One execution of a job, as kept in the run history."""
+    job_id: str
+    started_at_ms: int
+    ended_at_ms: int | None = None
+    duration_ms: int | None = None
+    status: Literal["ok", "error", "timeout", "cancelled"] | None = None
+    error: str | None = None
+    response: str | None = None  # Truncated agent response
+    scheduled_at_ms: int | None = None
+    catch_up: bool = False  # Made up for a run missed while the service was down
+    total_tokens: int | None = None
+    case_id: str | None = None  # Trace case ID (see nanobot.agent.tracer)
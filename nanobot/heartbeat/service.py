@@ -1,6 +1,8 @@
 """Heartbeat service - periodic agent wake-up to check for tasks."""
 
 import asyncio
+import hashlib
+import os
 from pathlib import Path
 from typing import Any, Callable, Coroutine
 
@@ -8,6 +10,8 @@ from loguru import logger
 
 # Default interval: 30 minutes
 DEFAULT_HEARTBEAT_INTERVAL_S = 30 * 60
+# Longest interval reached by backing off while the agent keeps answering OK
+DEFAULT_MAX_INTERVAL_S = 4 * 60 * 60
 
 # The prompt sent to agent during heartbeat
 HEARTBEAT_PROMPT = """Read HEARTBEAT.md in your workspace (if it exists).
@@ -41,6 +45,12 @@ class HeartbeatService:
     
     The agent reads HEARTBEAT.md from the workspace and executes any
     tasks listed there. If nothing needs attention, it replies HEARTBEAT_OK.
+    
+    HEARTBEAT.md is watched (by polling its mtime and size), so edits are
+    picked up within seconds; an edit that leaves the content identical to
+    what the agent already answered OK to is ignored. Each consecutive OK
+    multiplies the interval by backoff_factor, up to max_interval_s; new
+    content or a completed task resets it.
     """
     
     def __init__(
@@ -49,13 +59,24 @@ class HeartbeatService:
         on_heartbeat: Callable[[str], Coroutine[Any, Any, str]] | None = None,
         interval_s: int = DEFAULT_HEARTBEAT_INTERVAL_S,
         enabled: bool = True,
+        max_interval_s: int = DEFAULT_MAX_INTERVAL_S,
+        backoff_factor: float = 2.0,
+        watch: bool = True,
+        watch_poll_s: float = 2.0,
     ):
         self.workspace = workspace
         self.on_heartbeat = on_heartbeat
         self.interval_s = interval_s
         self.enabled = enabled
+        self.max_interval_s = max(max_interval_s, interval_s)
+        self.backoff_factor = max(backoff_factor, 1.0)
+        self.watch = watch
+        self.watch_poll_s = watch_poll_s
         self._running = False
         self._task: asyncio.Task | None = None
+        self._current_interval_s = float(interval_s)
+        self._acked_hash: str | None = None  # Content last answered with HEARTBEAT_OK
+        self._file_sig: tuple[int, int] | None = None
     
     @property
     def heartbeat_file(self) -> Path:
@@ -70,6 +91,14 @@ class HeartbeatService:
                 return None
         return None
     
+    def _stat_signature(self) -> tuple[int, int] | None:
+        """(mtime_ns, size) of HEARTBEAT.md, or None if it doesn't exist."""
+        try:
+            st = os.stat(self.heartbeat_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
     async def start(self) -> None:
         """Start the heartbeat service."""
         if not self.enabled:
@@ -77,8 +106,9 @@ class HeartbeatService:
             return
         
         self._running = True
+        self._file_sig = self._stat_signature()
         self._task = asyncio.create_task(self._run_loop())
-        logger.info(f"Heartbeat started (every {self.interval_s}s)")
+        logger.info(f"Heartbeat started (every {self.interval_s}s, up to {self.max_interval_s}s when idle)")
     
     def stop(self) -> None:
         """Stop the heartbeat service."""
@@ -91,15 +121,33 @@ class HeartbeatService:
         """Main heartbeat loop."""
         while self._running:
             try:
-                await asyncio.sleep(self.interval_s)
+                changed = await self._wait(self._current_interval_s)
                 if self._running:
-                    await self._tick()
+                    await self._tick(file_changed=changed)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Heartbeat error: {e}")
     
-    async def _tick(self) -> None:
+    async def _wait(self, timeout_s: float) -> bool:
+        """Sleep until the interval elapses or HEARTBEAT.md changes. Returns True on a change."""
+        if not self.watch:
+            await asyncio.sleep(timeout_s)
+            return False
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_s
+        while (remaining := deadline - loop.time()) > 0:
+            await asyncio.sleep(min(self.watch_poll_s, remaining))
+            sig = self._stat_signature()
+            if sig != self._file_sig:
+                # Let an editor finish writing before reading
+                await asyncio.sleep(self.watch_poll_s)
+                self._file_sig = self._stat_signature()
+                return True
+        return False
+    
+    async def _tick(self, file_changed: bool = False) -> None:
         """Execute a single heartbeat tick."""
         content = self._read_heartbeat_file()
         
@@ -108,6 +156,13 @@ class HeartbeatService:
             logger.debug("Heartbeat: no tasks (HEARTBEAT.md empty)")
             return
         
+        content_hash = hashlib.sha256(content.encode()).hexdigest()
+        if content_hash != self._acked_hash:
+            self._current_interval_s = float(self.interval_s)
+        elif file_changed:
+            logger.debug("Heartbeat: HEARTBEAT.md touched but unchanged since last OK, skipping")
+            return
+        
         logger.info("Heartbeat: checking for tasks...")
         
         if self.on_heartbeat:
@@ -116,8 +171,15 @@ class HeartbeatService:
                 
                 # Check if agent said "nothing to do"
                 if HEARTBEAT_OK_TOKEN.replace("_", "") in response.upper().replace("_", ""):
-                    logger.info("Heartbeat: OK (no action needed)")
+                    if content_hash == self._acked_hash:
+                        self._current_interval_s = min(
+                            self._current_interval_s * self.backoff_factor, float(self.max_interval_s)
+                        )
+                    self._acked_hash = content_hash
+                    logger.info(f"Heartbeat: OK (no action needed), next check in {self._current_interval_s:.0f}s")
                 else:
+                    self._acked_hash = None
+                    self._current_interval_s = float(self.interval_s)
                     logger.info(f"Heartbeat: completed task")
                     
             except Exception as e:
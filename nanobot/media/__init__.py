@@ -0,0 +1,16 @@
+"""Shared media store for channel attachments."""
+
+from nanobot.media.images import ImagePreprocessor, ImageSettings, configure_images, get_image_preprocessor
+from nanobot.media.store import MediaStore, MediaTooLargeError, configure, data_url, get_media_store
+
+__all__ = [
+    "MediaStore",
+    "MediaTooLargeError",
+    "configure",
+    "data_url",
+    "get_media_store",
+    "ImagePreprocessor",
+    "ImageSettings",
+    "configure_images",
+    "get_image_preprocessor",
+]
@@ -0,0 +1,205 @@
+"""Image preprocessing before images are inlined into LLM requests.
+
+Phone photos arrive at 12+ MP, far beyond what vision models use: providers
+downscale them server-side after we have paid to upload the base64. Here each
+image is downscaled to the model's useful size, re-encoded as JPEG or WebP
+with EXIF metadata stripped (after applying its orientation), and the result
+is cached in the media store by source content hash.
+"""
+
+import asyncio
+import hashlib
+import io
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from loguru import logger
+from PIL import Image, ImageOps
+
+from nanobot.media.store import CHUNK_SIZE, get_media_store
+
+
+@dataclass(frozen=True)
+class ImageSettings:
+    """Target size and encoding for images sent to one model."""
+    max_dimension: int = 1568  # Longest edge in pixels
+    quality: int = 85
+    format: str = "jpeg"  # "jpeg" or "webp"
+
+
+# Useful input size per model family, matched by keyword in the model name; it
+# replaces the default max_dimension, which applies to other models, unless
+# max_dimension was configured explicitly.
+# Larger images are downscaled by the provider anyway.
+MODEL_IMAGE_LIMITS: dict[str, int] = {
+    "claude": 1568,
+    "gpt": 2048,
+    "gemini": 3072,
+}
+
+_FORMATS = {"jpeg": ("JPEG", ".jpg"), "webp": ("WEBP", ".webp")}
+
+
+class ImagePreprocessor:
+    """
+    Downscales and re-encodes images for a model, off the event loop.
+
+    Results are written to the media store as <source hash>-<settings><ext>,
+    so the same photo is processed once per settings and then reused for
+    every later turn (and garbage-collected with the rest of the store).
+    """
+
+    def __init__(
+        self,
+        default: ImageSettings | None = None,
+        models: dict[str, ImageSettings] | None = None,
+        enabled: bool = True,
+        workers: int = 2,
+        model_limits: bool = True,
+    ):
+        self.default = default or ImageSettings()
+        self.models = models or {}  # Model keyword -> settings, checked before MODEL_IMAGE_LIMITS
+        self.enabled = enabled
+        self.model_limits = model_limits  # False = default.max_dimension applies to every other model
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nanobot-image")
+        # (path, size, mtime_ns, settings) -> prepared path, to skip even the hash on repeat turns
+        self._memo: dict[tuple[str, int, int, ImageSettings], Path] = {}
+
+    def settings_for(self, model: str | None) -> ImageSettings:
+        """Get the image settings for a model name."""
+        name = (model or "").lower()
+        for keyword, settings in self.models.items():
+            if keyword.lower() in name:
+                return settings
+        for keyword, max_dimension in MODEL_IMAGE_LIMITS.items() if self.model_limits else ():
+            if keyword in name:
+                return replace(self.default, max_dimension=max_dimension)
+        return self.default
+
+    async def prepare(self, paths: list[str], model: str | None = None) -> list[str]:
+        """
+        Return paths to model-ready versions of the images among `paths`.
+
+        Non-image paths, and images that cannot be decoded, pass through
+        unchanged.
+        """
+        if not self.enabled or not paths:
+            return paths
+        settings = self.settings_for(model)
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self._prepare_one, Path(p), settings)
+            for p in paths
+        ))
+        return [str(r) for r in results]
+
+    def _prepare_one(self, path: Path, settings: ImageSettings) -> Path:
+        mime, _ = mimetypes.guess_type(str(path))
+        if not mime or not mime.startswith("image/") or not path.is_file():
+            return path
+        st = path.stat()
+        key = (str(path), st.st_size, st.st_mtime_ns, settings)
+        cached = self._memo.get(key)
+        if cached is not None and cached.exists():
+            return cached
+        if len(self._memo) > 10_000:
+            self._memo.clear()
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                digest.update(chunk)
+        pil_format, ext = _FORMATS.get(settings.format, _FORMATS["jpeg"])
+        store = get_media_store()
+        dest = store.root / f"{digest.hexdigest()[:32]}-{settings.max_dimension}q{settings.quality}{ext}"
+        if dest.exists():
+            self._memo[key] = dest
+            return dest
+
+        try:
+            data, use_original = self._encode(path, st.st_size, mime, settings, pil_format)
+        except Exception as e:
+            logger.warning(f"Image preprocessing failed for {path.name}: {e}")
+            return path
+        if use_original:
+            self._memo[key] = path
+            return path
+        result = store.save_as(dest.name, data)
+        self._memo[key] = result
+        logger.debug(
+            f"Prepared image {path.name}: {st.st_size / 1024:.0f} KB -> {len(data) / 1024:.0f} KB"
+        )
+        return result
+
+    @staticmethod
+    def _encode(
+        path: Path, size: int, mime: str, settings: ImageSettings, pil_format: str
+    ) -> tuple[bytes, bool]:
+        """Downscale and re-encode; returns (bytes, use_original)."""
+        limit = settings.max_dimension
+        with Image.open(path) as img:
+            # Let the JPEG decoder scale by 1/2..1/8 while decoding: much faster for big photos
+            img.draft("RGB", (limit, limit))
+            has_exif = bool(img.getexif())
+            img = ImageOps.exif_transpose(img)
+            resized = max(img.size) > limit
+            if resized:
+                img.thumbnail((limit, limit), Image.Resampling.LANCZOS)
+            has_alpha = img.mode in ("RGBA", "LA", "P")
+            if pil_format == "JPEG" and img.mode != "RGB":
+                if has_alpha:
+                    img = img.convert("RGBA")
+                    background = Image.new("RGB", img.size, (255, 255, 255))
+                    background.paste(img, mask=img.getchannel("A"))
+                    img = background
+                else:
+                    img = img.convert("RGB")
+            elif img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if has_alpha else "RGB")
+            buf = io.BytesIO()
+            img.save(buf, format=pil_format, quality=settings.quality, optimize=True)
+        data = buf.getvalue()
+        # Small, clean images can be cheaper as-is (e.g. a PNG screenshot that JPEG would bloat)
+        use_original = not resized and not has_exif and len(data) >= size and mime in (
+            "image/jpeg", "image/png", "image/webp", "image/gif"
+        )
+        return data, use_original
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_PREPROCESSOR = ImagePreprocessor()
+
+
+def configure_images(
+    max_dimension: int | None = None,
+    quality: int = 85,
+    format: str = "jpeg",
+    models: dict[str, ImageSettings] | None = None,
+    enabled: bool = True,
+) -> ImagePreprocessor:
+    """
+    Configure the shared image preprocessor. Call once at startup.
+
+    max_dimension=None keeps the per-family MODEL_IMAGE_LIMITS (1568 for other
+    models); an explicit value applies to every model not listed in `models`.
+    """
+    global _PREPROCESSOR
+    _PREPROCESSOR.close()
+    _PREPROCESSOR = ImagePreprocessor(
+        default=ImageSettings(
+            max_dimension=max_dimension or ImageSettings.max_dimension, quality=quality, format=format
+        ),
+        models=models,
+        enabled=enabled,
+        model_limits=max_dimension is None,
+    )
+    return _PREPROCESSOR
+
+
+def get_image_preprocessor() -> ImagePreprocessor:
+    """Get the shared image preprocessor."""
+    return _PREPROCESSOR
@@ -0,0 +1,273 @@
+"""Content-addressed store for downloaded media (attachments, photos, voice notes).
+
+Files are named by the SHA-256 of their content, so the same attachment sent
+twice is stored once. Downloads stream to disk in chunks instead of being
+buffered in memory, old files are garbage-collected by age and total size,
+and base64 data URLs for images are cached in memory for reuse across turns.
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+import httpx
+from loguru import logger
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MediaTooLargeError(Exception):
+    """Raised when a download exceeds the caller's size limit."""
+
+
+class MediaStore:
+    """
+    Deduplicating media store under ~/.nanobot/media.
+
+    Files live at <root>/<sha256 prefix><ext>. A file's mtime is refreshed
+    whenever it is stored again, so GC evicts the least recently seen
+    media first.
+    """
+
+    _HASH_CHARS = 32  # 128 bits of SHA-256 in file names
+    _GC_INTERVAL_S = 3600
+    _MAX_ALIASES = 10_000
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_age_days: float = 30,
+    ):
+        self.root = root or Path.home() / ".nanobot" / "media"
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._tmp_dir = self.root / ".tmp"
+        self._http: httpx.AsyncClient | None = None
+        self._last_gc = 0.0
+        # Platform file ids (e.g. Telegram file_unique_id) -> stored path, to skip re-downloads
+        self._aliases: OrderedDict[str, Path] = OrderedDict()
+
+    def _ensure_dirs(self) -> None:
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def _tmp_path(self) -> Path:
+        self._ensure_dirs()
+        return self._tmp_dir / uuid.uuid4().hex
+
+    def _commit(self, tmp: Path, digest: str, suffix: str) -> Path:
+        """Move a fully written temp file to its content address (or drop it as a duplicate)."""
+        dest = self.root / f"{digest[:self._HASH_CHARS]}{suffix}"
+        if dest.exists():
+            tmp.unlink(missing_ok=True)
+            os.utime(dest)
+            logger.debug(f"Media dedup hit: {dest.name}")
+        else:
+            os.replace(tmp, dest)
+        return dest
+
+    async def download(
+        self,
+        url: str,
+        suffix: str = "",
+        headers: dict[str, str] | None = None,
+        max_bytes: int | None = None,
+        client: httpx.AsyncClient | None = None,
+    ) -> Path:
+        """Stream a URL to the store in chunks and return the stored path."""
+        if client is None:
+            if self._http is None:
+                self._http = httpx.AsyncClient(timeout=60.0, follow_redirects=True)
+            client = self._http
+        tmp = self._tmp_path()
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with client.stream("GET", url, headers=headers) as resp:
+                resp.raise_for_status()
+                with open(tmp, "wb") as f:
+                    async for chunk in resp.aiter_bytes(CHUNK_SIZE):
+                        size += len(chunk)
+                        if max_bytes and size > max_bytes:
+                            raise MediaTooLargeError(f"download exceeds {max_bytes} bytes")
+                        digest.update(chunk)
+                        f.write(chunk)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        path = self._commit(tmp, digest.hexdigest(), suffix)
+        self._schedule_gc()
+        return path
+
+    def save_bytes(self, data: bytes, suffix: str = "") -> Path:
+        """Store in-memory content and return its path."""
+        tmp = self._tmp_path()
+        tmp.write_bytes(data)
+        path = self._commit(tmp, hashlib.sha256(data).hexdigest(), suffix)
+        self._schedule_gc()
+        return path
+
+    def save_as(self, name: str, data: bytes) -> Path:
+        """Store derived content under a caller-chosen name (e.g. keyed by its source hash)."""
+        tmp = self._tmp_path()
+        tmp.write_bytes(data)
+        dest = self.root / name
+        os.replace(tmp, dest)
+        return dest
+
+    def ingest(self, src: Path, suffix: str | None = None) -> Path:
+        """Move an already-downloaded file into the store (hashing it in chunks)."""
+        digest = hashlib.sha256()
+        with open(src, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                digest.update(chunk)
+        path = self._commit(Path(src), digest.hexdigest(), src.suffix if suffix is None else suffix)
+        self._schedule_gc()
+        return path
+
+    def lookup(self, key: str) -> Path | None:
+        """Get the stored path for a platform file id, if it is still on disk."""
+        path = self._aliases.get(key)
+        if path is None or not path.exists():
+            self._aliases.pop(key, None)
+            return None
+        self._aliases.move_to_end(key)
+        os.utime(path)
+        return path
+
+    def remember(self, key: str, path: Path) -> None:
+        """Record the stored path for a platform file id."""
+        self._aliases[key] = path
+        self._aliases.move_to_end(key)
+        while len(self._aliases) > self._MAX_ALIASES:
+            self._aliases.popitem(last=False)
+
+    def temp_path(self, suffix: str = "") -> Path:
+        """A fresh temp path inside the store, for SDKs that download to a file themselves."""
+        return self._tmp_path().with_suffix(suffix)
+
+    def _schedule_gc(self) -> None:
+        now = time.monotonic()
+        if now - self._last_gc < self._GC_INTERVAL_S:
+            return
+        self._last_gc = now
+        try:
+            future = asyncio.get_running_loop().run_in_executor(None, self.gc)
+        except RuntimeError:
+            self.gc()  # No event loop: run inline
+            return
+        future.add_done_callback(self._on_gc_done)
+
+    @staticmethod
+    def _on_gc_done(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception():
+            logger.error(f"Media GC failed: {future.exception()}")
+
+    def gc(self) -> int:
+        """Delete media past max_age_days, then the oldest until under max_bytes. Returns files removed."""
+        if not self.root.exists():
+            return 0
+        now = time.time()
+        entries = []
+        for p in self.root.iterdir():
+            try:
+                if p.is_file():
+                    st = p.stat()
+                    entries.append((st.st_mtime, st.st_size, p))
+            except OSError:
+                continue
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        cutoff = now - self.max_age_days * 86400 if self.max_age_days else 0
+        removed = 0
+        for mtime, size, p in entries:
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            try:
+                p.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Media GC could not remove {p.name}: {e}")
+                continue
+            total -= size
+            removed += 1
+        # Leftovers from interrupted downloads
+        if self._tmp_dir.exists():
+            for p in self._tmp_dir.iterdir():
+                try:
+                    if now - p.stat().st_mtime > 86400:
+                        p.unlink(missing_ok=True)
+                except OSError:
+                    continue
+        if removed:
+            logger.info(f"Media GC removed {removed} files, {total / 1e6:.1f} MB left")
+        return removed
+
+    async def close(self) -> None:
+        """Close the download client. Call on shutdown."""
+        if self._http:
+            await self._http.aclose()
+            self._http = None
+
+
+class DataURLCache:
+    """
+    LRU cache of base64 data URLs keyed by (path, size, mtime), bounded by total characters.
+
+    Files directly under store_root are named by content and never rewritten;
+    their mtime only tracks recency for GC, so they are keyed by (path, size).
+    """
+
+    def __init__(self, max_chars: int = 64 * 1024 * 1024, store_root: Path | None = None):
+        self.max_chars = max_chars
+        self.store_root = store_root
+        self._entries: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        self._chars = 0
+
+    def get(self, path: Path, mime: str) -> str:
+        """Return the data URL for a file, encoding it only on a cache miss."""
+        st = path.stat()
+        stored = self.store_root is not None and path.parent == self.store_root
+        key = (str(path), st.st_size, 0 if stored else st.st_mtime_ns)
+        url = self._entries.get(key)
+        if url is not None:
+            self._entries.move_to_end(key)
+            return url
+        url = f"data:{mime};base64,{base64.b64encode(path.read_bytes()).decode()}"
+        self._entries[key] = url
+        self._chars += len(url)
+        while self._chars > self.max_chars and len(self._entries) > 1:
+            _, old = self._entries.popitem(last=False)
+            self._chars -= len(old)
+        return url
+
+
+_STORE = MediaStore()
+_DATA_URLS = DataURLCache(store_root=_STORE.root)
+
+
+def configure(max_size_mb: int = 1024, max_age_days: float = 30, data_url_cache_mb: int = 64) -> MediaStore:
+    """Configure the shared media store and data URL cache. Call once at startup."""
+    global _STORE, _DATA_URLS
+    if _STORE._http:
+        try:
+            asyncio.get_running_loop().create_task(_STORE.close())
+        except RuntimeError:
+            pass  # No event loop, so no connections in use
+    _STORE = MediaStore(max_bytes=max_size_mb * 1024 * 1024, max_age_days=max_age_days)
+    _DATA_URLS = DataURLCache(max_chars=data_url_cache_mb * 1024 * 1024, store_root=_STORE.root)
+    return _STORE
+
+
+def get_media_store() -> MediaStore:
+    """Get the shared media store."""
+    return _STORE
+
+
+def data_url(path: Path, mime: str) -> str:
+    """Base64 data URL for a file, cached across calls."""
+    return _DATA_URLS.get(path, mime)
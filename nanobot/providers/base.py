@@ -68,3 +68,7 @@ class LLMProvider(ABC):
     def get_default_model(self) -> str:
         """Get the default model for this provider."""
         pass
+    
+    def estimate_cost(self, model: str, usage: dict[str, int]) -> float | None:
+        """Estimate the USD cost of a call from its token usage, or None if unknown."""
+        return None
@@ -198,6 +198,20 @@ class LiteLLMProvider(LLMProvider):
             reasoning_content=reasoning_content,
         )
     
+    def estimate_cost(self, model: str, usage: dict[str, int]) -> float | None:
+        """Estimate the USD cost of a call using LiteLLM's model price map."""
+        if not usage:
+            return None
+        try:
+            prompt_cost, completion_cost = litellm.cost_per_token(
+                model=self._resolve_model(model),
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+            )
+        except Exception:
+            return None  # Model not in the price map
+        return prompt_cost + completion_cost
+    
     def get_default_model(self) -> str:
         """Get the default model."""
         return self.default_model
@@ -1,65 +1,322 @@
-"""Voice transcription provider using Groq."""
+"""Voice transcription providers and the shared batching transcription service."""
 
+import asyncio
+import hashlib
 import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
 
 import httpx
 from loguru import logger
 
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+    WhisperModel = None
 
-class GroqTranscriptionProvider:
+
+class TranscriptionProvider(ABC):
+    """
+    Abstract base class for speech-to-text backends.
+
+    Backends transcribe a batch of audio files at once, so they can share a
+    loaded model or a connection pool across voice notes that arrive together.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def transcribe_batch(self, paths: list[Path]) -> list[str]:
+        """
+        Transcribe audio files.
+
+        Returns one transcript per path, in order; "" for files that failed.
+        """
+        pass
+
+    async def transcribe(self, file_path: str | Path) -> str:
+        """Transcribe a single audio file."""
+        return (await self.transcribe_batch([Path(file_path)]))[0]
+
+    async def close(self) -> None:
+        """Release connections or models."""
+        pass
+
+
+class GroqTranscriptionProvider(TranscriptionProvider):
     """
     Voice transcription provider using Groq's Whisper API.
-    
+
     Groq offers extremely fast transcription with a generous free tier.
+    The API takes one file per request, so a batch is sent as concurrent
+    requests over one pooled client.
     """
-    
-    def __init__(self, api_key: str | None = None):
+
+    name = "groq"
+
+    def __init__(self, api_key: str | None = None, model: str = "whisper-large-v3", max_concurrency: int = 4):
         self.api_key = api_key or os.environ.get("GROQ_API_KEY")
         self.api_url = "https://api.groq.com/openai/v1/audio/transcriptions"
-    
-    async def transcribe(self, file_path: str | Path) -> str:
-        """
-        Transcribe an audio file using Groq.
-        
-        Args:
-            file_path: Path to the audio file.
-            
-        Returns:
-            Transcribed text.
-        """
+        self.model = model
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: httpx.AsyncClient | None = None
+
+    async def transcribe_batch(self, paths: list[Path]) -> list[str]:
         if not self.api_key:
             logger.warning("Groq API key not configured for transcription")
-            return ""
-        
+            return [""] * len(paths)
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=60.0, headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+        return list(await asyncio.gather(*(self._transcribe_one(p) for p in paths)))
+
+    async def _transcribe_one(self, path: Path) -> str:
+        async with self._semaphore:
+            for attempt in range(3):
+                try:
+                    with open(path, "rb") as f:
+                        response = await self._client.post(
+                            self.api_url,
+                            files={"file": (path.name, f), "model": (None, self.model)},
+                        )
+                    if response.status_code == 429 or response.status_code >= 500:
+                        if attempt < 2:
+                            try:
+                                delay = float(response.headers.get("retry-after", 2 ** attempt))
+                            except ValueError:
+                                delay = 2 ** attempt
+                            await asyncio.sleep(min(delay, 30))
+                            continue
+                    response.raise_for_status()
+                    return response.json().get("text", "")
+                except Exception as e:
+                    logger.error(f"Groq transcription error: {e}")
+                    return ""
+        return ""
+
+    async def close(self) -> None:
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+
+class LocalWhisperProvider(TranscriptionProvider):
+    """
+    Offline CPU transcription with faster-whisper (CTranslate2 Whisper).
+
+    The model is loaded once, on first use, in a dedicated worker thread, and
+    a batch is transcribed back to back on that thread so concurrent voice
+    notes never oversubscribe the CPU.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model: str = "base",
+        compute_type: str = "int8",
+        threads: int = 0,
+        language: str | None = None,
+    ):
+        self.model_name = model
+        self.compute_type = compute_type
+        self.threads = threads
+        self.language = language or None
+        self._model = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nanobot-whisper")
+
+    def _load(self):
+        if self._model is None:
+            logger.info(f"Loading local Whisper model '{self.model_name}' ({self.compute_type})")
+            self._model = WhisperModel(
+                self.model_name, device="cpu", compute_type=self.compute_type, cpu_threads=self.threads
+            )
+        return self._model
+
+    def _run_batch(self, paths: list[Path]) -> list[str]:
+        model = self._load()
+        texts = []
+        for path in paths:
+            try:
+                segments, _ = model.transcribe(
+                    str(path), language=self.language, beam_size=1, vad_filter=True
+                )
+                texts.append("".join(s.text for s in segments).strip())
+            except Exception as e:
+                logger.error(f"Local transcription error for {path.name}: {e}")
+                texts.append("")
+        return texts
+
+    async def transcribe_batch(self, paths: list[Path]) -> list[str]:
+        if not FASTER_WHISPER_AVAILABLE:
+            logger.warning("faster-whisper not installed; local transcription unavailable")
+            return [""] * len(paths)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run_batch, paths)
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TranscriptionService:
+    """
+    Queues voice notes, transcribes them in batches and caches transcripts.
+
+    Requests arriving within batch_window_ms of each other are sent to the
+    provider together (up to max_batch). Transcripts are cached on disk by
+    the SHA-256 of the audio, and concurrent requests for the same audio
+    share one transcription.
+    """
+
+    def __init__(
+        self,
+        provider: TranscriptionProvider,
+        cache_dir: Path | None = None,
+        max_batch: int = 8,
+        batch_window_ms: int = 200,
+    ):
+        self.provider = provider
+        self.cache_dir = cache_dir or Path.home() / ".nanobot" / "transcripts"
+        self.max_batch = max(1, max_batch)
+        self.batch_window_s = batch_window_ms / 1000
+        self._queue: asyncio.Queue[tuple[str, Path]] | None = None
+        self._pending: dict[str, asyncio.Future[str]] = {}
+        self._worker: asyncio.Task | None = None
+        self.stats = {"requests": 0, "cache_hits": 0, "batches": 0, "transcribed": 0, "failed": 0}
+
+    @staticmethod
+    def _hash(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(64 * 1024):
+                digest.update(chunk)
+        return digest.hexdigest()[:32]
+
+    def _cache_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.txt"
+
+    async def transcribe(self, file_path: str | Path) -> str:
+        """Transcribe an audio file. Returns "" if transcription failed."""
         path = Path(file_path)
         if not path.exists():
             logger.error(f"Audio file not found: {file_path}")
             return ""
-        
+        self.stats["requests"] += 1
+        key = await asyncio.to_thread(self._hash, path)
+        cached = self._cache_path(key)
+        if cached.exists():
+            self.stats["cache_hits"] += 1
+            return cached.read_text(encoding="utf-8")
+        if key in self._pending:
+            return await asyncio.shield(self._pending[key])
+
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        await self._queue.put((key, path))
+        return await asyncio.shield(future)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window_s
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.stats["batches"] += 1
+            texts: list[str] = []
+            try:
+                texts = await self.provider.transcribe_batch([path for _, path in batch])
+                logger.debug(f"Transcribed batch of {len(batch)} with {self.provider.name}")
+                for (key, _), text in zip(batch, texts):
+                    if text:
+                        self.stats["transcribed"] += 1
+                        await asyncio.to_thread(self._write_cache, key, text)
+                    else:
+                        self.stats["failed"] += 1  # Not cached, so a resend retries
+            except Exception as e:
+                logger.error(f"{self.provider.name} transcription batch failed: {e}")
+            finally:
+                # Always settle the batch, or its callers (and later requests for the same audio) hang
+                for i, (key, _) in enumerate(batch):
+                    future = self._pending.pop(key, None)
+                    if future and not future.done():
+                        future.set_result(texts[i] if i < len(texts) else "")
+
+    def _write_cache(self, key: str, text: str) -> None:
         try:
-            async with httpx.AsyncClient() as client:
-                with open(path, "rb") as f:
-                    files = {
-                        "file": (path.name, f),
-                        "model": (None, "whisper-large-v3"),
-                    }
-                    headers = {
-                        "Authorization": f"Bearer {self.api_key}",
-                    }
-                    
-                    response = await client.post(
-                        self.api_url,
-                        headers=headers,
-                        files=files,
-                        timeout=60.0
-                    )
-                    
-                    response.raise_for_status()
-                    data = response.json()
-                    return data.get("text", "")
-                    
-        except Exception as e:
-            logger.error(f"Groq transcription error: {e}")
-            return ""
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._cache_path(key).write_text(text, encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"Could not cache transcript: {e}")
+
+    async def close(self) -> None:
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result("")
+        self._pending.clear()
+        await self.provider.close()
+
+
+def make_transcription_provider(
+    backend: str = "auto",
+    groq_api_key: str | None = None,
+    local_model: str = "base",
+    local_compute_type: str = "int8",
+    local_threads: int = 0,
+    language: str | None = None,
+) -> TranscriptionProvider:
+    """
+    Create a transcription backend.
+
+    backend "auto" uses Groq when an API key is available, otherwise the
+    local model if faster-whisper is installed.
+    """
+    if backend == "auto":
+        if groq_api_key or os.environ.get("GROQ_API_KEY") or not FASTER_WHISPER_AVAILABLE:
+            backend = "groq"
+        else:
+            backend = "local"
+    if backend == "local":
+        return LocalWhisperProvider(local_model, local_compute_type, local_threads, language)
+    return GroqTranscriptionProvider(api_key=groq_api_key)
+
+
+_SERVICE: TranscriptionService | None = None
+
+
+def configure_transcription(
+    provider: TranscriptionProvider,
+    max_batch: int = 8,
+    batch_window_ms: int = 200,
+    cache_dir: Path | None = None,
+) -> TranscriptionService:
+    """Configure the shared transcription service. Call once at startup."""
+    global _SERVICE
+    _SERVICE = TranscriptionService(provider, cache_dir, max_batch, batch_window_ms)
+    return _SERVICE
+
+
+def get_transcriber() -> TranscriptionService:
+    """Get the shared transcription service (Groq via GROQ_API_KEY if never configured)."""
+    global _SERVICE
+    if _SERVICE is None:
+        _SERVICE = TranscriptionService(make_transcription_provider())
+    return _SERVICE
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Benchmark cron scheduling and persistence cost with many jobs.
+
+Compares the heap/journal CronService against the previous approach
+(linear scan of all jobs per tick, full indent=2 rewrite per save).
+
+Usage: python scripts/bench_cron.py [--jobs 10000] [--rounds 200]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from nanobot.cron.service import CronService, _job_to_dict, _now_ms
+from nanobot.cron.types import CronSchedule
+
+
+def _timeit(fn, rounds: int) -> float:
+    """Mean wall time of fn in microseconds."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    service = CronService(tmp / "jobs.json")
+    service._load_store()
+    rng = random.Random(0)
+
+    t0 = time.perf_counter()
+    for i in range(args.jobs):
+        service.add_job(
+            name=f"job-{i}",
+            schedule=CronSchedule(kind="every", every_ms=rng.randint(60, 86_400) * 1000),
+            message=f"Run task {i}",
+        )
+    add_s = time.perf_counter() - t0
+    jobs = service._store.jobs
+
+    # Next wake: linear scan vs heap peek
+    def linear_wake():
+        times = [j.state.next_run_at_ms for j in jobs if j.enabled and j.state.next_run_at_ms]
+        return min(times) if times else None
+
+    assert linear_wake() == service._get_next_wake_ms()
+    wake_linear = _timeit(linear_wake, args.rounds)
+    wake_heap = _timeit(service._get_next_wake_ms, args.rounds)
+
+    # One tick with a single due job: linear due-scan + full save vs heap pop + journal append
+    def legacy_tick():
+        now = _now_ms()
+        due = [j for j in jobs if j.enabled and j.state.next_run_at_ms and now >= j.state.next_run_at_ms]
+        data = {"version": 1, "jobs": [_job_to_dict(j) for j in jobs]}
+        (tmp / "legacy.json").write_text(json.dumps(data, indent=2))
+        return due
+
+    async def heap_ticks(rounds: int) -> float:
+        total = 0.0
+        for _ in range(rounds):
+            job = rng.choice(jobs)
+            job.state.next_run_at_ms = _now_ms() - 1
+            service._schedule(job)
+            start = time.perf_counter()
+            await service._on_timer()
+            total += time.perf_counter() - start
+        return total / rounds * 1e6
+
+    rounds = max(1, args.rounds // 10)
+    tick_legacy = _timeit(legacy_tick, rounds)
+    tick_heap = asyncio.run(heap_ticks(args.rounds))
+
+    # Save cost: full snapshot vs journal record for one changed job
+    save_legacy = _timeit(lambda: (tmp / "legacy.json").write_text(
+        json.dumps({"version": 1, "jobs": [_job_to_dict(j) for j in jobs]}, indent=2)), rounds)
+    save_snapshot = _timeit(service._save_store, rounds)
+    save_journal = _timeit(lambda: service._save_jobs([rng.choice(jobs)]), args.rounds)
+
+    print(f"jobs: {args.jobs}  (added in {add_s:.2f}s)")
+    print(f"{'operation':<34}{'legacy':>12}{'current':>12}")
+    print(f"{'next wake (us)':<34}{wake_linear:>12.1f}{wake_heap:>12.1f}")
+    print(f"{'tick with one due job (us)':<34}{tick_legacy:>12.1f}{tick_heap:>12.1f}")
+    print(f"{'save after one change (us)':<34}{save_legacy:>12.1f}{save_journal:>12.1f}")
+    print(f"{'full snapshot (us)':<34}{save_legacy:>12.1f}{save_snapshot:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Benchmark EmailChannel SMTP throughput: pooled connections vs one per reply.
+
+Runs a minimal local SMTP server (EHLO, AUTH PLAIN, MAIL/RCPT/DATA, NOOP,
+QUIT). It delays the greeting and AUTH to stand in for the TLS and login
+round-trips of a real server.
+
+Usage: python scripts/bench_email_smtp.py [--messages 200] [--handshake-ms 40]
+"""
+
+import argparse
+import asyncio
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.email import EmailChannel
+from nanobot.config.schema import EmailConfig
+
+
+class StubSMTPServer:
+    """Tiny SMTP server running on its own event loop thread."""
+
+    def __init__(self, handshake_s: float):
+        self.handshake_s = handshake_s
+        self.connections = 0
+        self.delivered = 0
+        self.port = 0
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        await asyncio.sleep(self.handshake_s / 2)
+        writer.write(b"220 stub ESMTP\r\n")
+        while line := await reader.readline():
+            cmd = line.decode(errors="replace").strip().upper()
+            if cmd.startswith(("EHLO", "HELO")):
+                writer.write(b"250-stub\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+            elif cmd.startswith("AUTH"):
+                await asyncio.sleep(self.handshake_s / 2)
+                writer.write(b"235 ok\r\n")
+            elif cmd == "DATA":
+                writer.write(b"354 go\r\n")
+                await writer.drain()
+                while (await reader.readline()) not in (b".\r\n", b""):
+                    pass
+                self.delivered += 1
+                writer.write(b"250 queued\r\n")
+            elif cmd == "QUIT":
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:  # MAIL, RCPT, NOOP, RSET
+                writer.write(b"250 ok\r\n")
+            await writer.drain()
+        writer.close()
+
+
+def _message(i: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "bot@example.com"
+    msg["To"] = f"user{i % 10}@example.com"
+    msg["Subject"] = f"Re: digest {i}"
+    msg.set_content(f"Reply body {i}\n" * 20)
+    return msg
+
+
+def _run(send, messages: int, workers: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(send, (_message(i) for i in range(messages))))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=40.0)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    server = StubSMTPServer(args.handshake_ms / 1000)
+    config = EmailConfig(
+        smtp_host="127.0.0.1", smtp_port=server.port, smtp_use_tls=False,
+        smtp_username="bot", smtp_password="secret", smtp_pool_size=args.pool_size,
+    )
+    channel = EmailChannel(config, MessageBus())
+
+    def legacy_send(msg: EmailMessage) -> None:
+        smtp = channel._smtp_connect()
+        try:
+            smtp.send_message(msg)
+        finally:
+            smtp.quit()
+
+    conns = server.connections
+    legacy_s = _run(legacy_send, args.messages, args.pool_size)
+    legacy_conns = server.connections - conns
+
+    conns = server.connections
+    pooled_s = _run(channel._smtp_send, args.messages, args.pool_size)
+    pooled_conns = server.connections - conns
+    channel._smtp_pool.close()
+
+    print(f"messages: {args.messages}  handshake: {args.handshake_ms:.0f}ms  senders: {args.pool_size}")
+    print(f"{'mode':<22}{'seconds':>10}{'msg/s':>10}{'connections':>13}")
+    print(f"{'connect per reply':<22}{legacy_s:>10.2f}{args.messages / legacy_s:>10.1f}{legacy_conns:>13}")
+    print(f"{'pooled':<22}{pooled_s:>10.2f}{args.messages / pooled_s:>10.1f}{pooled_conns:>13}")
+    print(f"delivered: {server.delivered}  pool stats: {channel._smtp_pool.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Benchmark channel Markdown rendering on long agent replies.
+
+Compares the shared tokenize-once renderer (nanobot.channels.markdown)
+against the previous per-channel regex pipelines: Telegram's 12-pass
+converter with its placeholder-restore loop, and Feishu's table/heading
+splitting.
+
+Usage: python scripts/bench_markdown.py [--size-kb 50] [--rounds 20]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from nanobot.channels import markdown as md
+
+
+# ---- previous implementations (for comparison) -------------------------------
+
+def legacy_telegram_html(text: str) -> str:
+    code_blocks: list[str] = []
+
+    def save_code_block(m: re.Match) -> str:
+        code_blocks.append(m.group(1))
+        return f"\x00CB{len(code_blocks) - 1}\x00"
+
+    text = re.sub(r'```[\w]*\n?([\s\S]*?)```', save_code_block, text)
+    inline_codes: list[str] = []
+
+    def save_inline_code(m: re.Match) -> str:
+        inline_codes.append(m.group(1))
+        return f"\x00IC{len(inline_codes) - 1}\x00"
+
+    text = re.sub(r'`([^`]+)`', save_inline_code, text)
+    text = re.sub(r'^#{1,6}\s+(.+)$', r'\1', text, flags=re.MULTILINE)
+    text = re.sub(r'^>\s*(.*)$', r'\1', text, flags=re.MULTILINE)
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
+    text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', text)
+    text = re.sub(r'__(.+?)__', r'<b>\1</b>', text)
+    text = re.sub(r'(?<![a-zA-Z0-9])_([^_]+)_(?![a-zA-Z0-9])', r'<i>\1</i>', text)
+    text = re.sub(r'~~(.+?)~~', r'<s>\1</s>', text)
+    text = re.sub(r'^[-*]\s+', '• ', text, flags=re.MULTILINE)
+    for i, code in enumerate(inline_codes):
+        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        text = text.replace(f"\x00IC{i}\x00", f"<code>{escaped}</code>")
+    for i, code in enumerate(code_blocks):
+        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        text = text.replace(f"\x00CB{i}\x00", f"<pre><code>{escaped}</code></pre>")
+    return text
+
+
+_TABLE_RE = re.compile(
+    r"((?:^[ \t]*\|.+\|[ \t]*\n)(?:^[ \t]*\|[-:\s|]+\|[ \t]*\n)(?:^[ \t]*\|.+\|[ \t]*\n?)+)",
+    re.MULTILINE,
+)
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$", re.MULTILINE)
+_CODE_BLOCK_RE = re.compile(r"(```[\s\S]*?```)", re.MULTILINE)
+
+
+def _legacy_split_headings(content: str) -> list[dict]:
+    protected = content
+    code_blocks = []
+    for m in _CODE_BLOCK_RE.finditer(content):
+        code_blocks.append(m.group(1))
+        protected = protected.replace(m.group(1), f"\x00CODE{len(code_blocks)-1}\x00", 1)
+    elements, last_end = [], 0
+    for m in _HEADING_RE.finditer(protected):
+        before = protected[last_end:m.start()].strip()
+        if before:
+            elements.append({"tag": "markdown", "content": before})
+        elements.append({"tag": "div", "text": {"tag": "lark_md", "content": f"**{m.group(2).strip()}**"}})
+        last_end = m.end()
+    remaining = protected[last_end:].strip()
+    if remaining:
+        elements.append({"tag": "markdown", "content": remaining})
+    for i, cb in enumerate(code_blocks):
+        for el in elements:
+            if el.get("tag") == "markdown":
+                el["content"] = el["content"].replace(f"\x00CODE{i}\x00", cb)
+    return elements
+
+
+def legacy_feishu_elements(content: str) -> list[dict]:
+    elements, last_end = [], 0
+    for m in _TABLE_RE.finditer(content):
+        before = content[last_end:m.start()]
+        if before.strip():
+            elements.extend(_legacy_split_headings(before))
+        lines = [l.strip() for l in m.group(1).strip().split("\n") if l.strip()]
+        split = lambda l: [c.strip() for c in l.strip("|").split("|")]
+        elements.append({"tag": "table", "columns": split(lines[0]), "rows": [split(l) for l in lines[2:]]})
+        last_end = m.end()
+    remaining = content[last_end:]
+    if remaining.strip():
+        elements.extend(_legacy_split_headings(remaining))
+    return elements
+
+
+# ---- workload ------------------------------------------------------------------
+
+def make_reply(size: int, code_every: int, rng: random.Random) -> str:
+    """A Markdown reply of about `size` chars: headings, prose, lists, code, tables."""
+    parts, total, i = [], 0, 0
+    while total < size:
+        i += 1
+        block = [f"## Step {i}: configure `service-{i}`"]
+        block.append(" ".join(
+            rng.choice(["The", "**config**", "file", "_must_", "include", "[docs](https://example.com/a?b=1&c=2)",
+                        "`--flag`", "a < b", "~~old~~", "value", "and", "x_y_z"])
+            for _ in range(rng.randint(20, 60))
+        ))
+        block.append("\n".join(f"- item {k} with **bold** and `code`" for k in range(rng.randint(2, 6))))
+        if i % code_every == 0:
+            block.append("```python\n" + "\n".join(
+                f"result_{k} = compute({k}) if a < b else None  # & more" for k in range(rng.randint(5, 25))
+            ) + "\n```")
+        if i % 7 == 0:
+            block.append("| key | value |\n|---|---|\n" + "\n".join(f"| k{k} | {k * 3} |" for k in range(8)))
+        text = "\n\n".join(block)
+        parts.append(text)
+        total += len(text) + 2
+    return "\n\n".join(parts)
+
+
+def _timeit(fn, text: str, rounds: int) -> float:
+    """Mean wall time in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(text)
+    return (time.perf_counter() - start) / rounds * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-kb", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    print(f"{'reply':<30}{'path':<26}{'legacy ms':>11}{'shared ms':>11}")
+    for code_every in (4, 1):
+        text = make_reply(args.size_kb * 1024, code_every, rng)
+        label = f"{len(text) / 1024:.0f} KB, {text.count('```') // 2} code blocks"
+        rows = [
+            ("telegram html", legacy_telegram_html, md.to_telegram_html),
+            ("feishu card elements", legacy_feishu_elements, md.to_feishu_elements),
+        ]
+        for name, legacy, shared in rows:
+            legacy_ms = _timeit(legacy, text, args.rounds)
+            shared_ms = _timeit(shared, text, args.rounds)
+            print(f"{label:<30}{name:<26}{legacy_ms:>11.2f}{shared_ms:>11.2f}")
+        for name, renderer in (("telegram", md.TELEGRAM), ("slack", md.SLACK), ("discord", md.DISCORD)):
+            ms = _timeit(lambda t: md.render_chunks(t, renderer), text, args.rounds)
+            chunks = len(md.render_chunks(text, renderer))
+            print(f"{label:<30}{name + ' chunks (' + str(chunks) + ')':<26}{'-':>11}{ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Exercise EmailChannel's IMAP side against a local stub server.
+
+The stub speaks just enough IMAP4rev1 for the channel (CAPABILITY, LOGIN,
+SELECT, UID SEARCH/FETCH/STORE, IDLE, LOGOUT) and can be told to fail a
+FETCH, drop connections or change UIDVALIDITY. Each scenario prints
+PASS/FAIL; the exit status is non-zero if any failed.
+
+Scenarios: batching, failed FETCH, reconnect, UIDVALIDITY reset, IDLE
+wake-up (mail arriving during IDLE, with the IDLE continuation, and
+during SEARCH before IDLE).
+
+Usage: python scripts/check_email_imap.py
+"""
+
+import asyncio
+import re
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.email import EmailChannel
+from nanobot.config.schema import EmailConfig
+
+
+class StubIMAPServer:
+    """Tiny IMAP server running on its own event loop thread."""
+
+    def __init__(self):
+        self.messages: dict[int, bytes] = {}
+        self.seen: set[int] = set()
+        self.uidvalidity = 1
+        self.next_uid = 1
+        self.connections = 0
+        self.fetch_commands = 0
+        self.fail_fetches = 0  # Answer this many FETCHes with NO
+        self.exists_with_idle = False  # Send EXISTS in the same packet as "+ idling"
+        self.exists_with_search = False  # Send EXISTS along with the next SEARCH result
+        self.port = 0
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._idlers: set[asyncio.StreamWriter] = set()
+        self._ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    # ---- control (called from the test thread) --------------------------------
+
+    def deliver(self, count: int = 1) -> None:
+        def add() -> None:
+            for _ in range(count):
+                uid = self.next_uid
+                self.next_uid += 1
+                self.messages[uid] = (
+                    f"From: user{uid}@example.com\r\nSubject: msg {uid}\r\n"
+                    f"Message-ID: <{uid}@example.com>\r\n\r\nbody {uid}\r\n"
+                ).encode()
+            for w in list(self._idlers):
+                w.write(f"* {len(self.messages)} EXISTS\r\n".encode())
+        self._loop.call_soon_threadsafe(add)
+
+    def drop_connections(self) -> None:
+        def drop() -> None:
+            for w in list(self._writers):
+                w.close()
+        self._loop.call_soon_threadsafe(drop)
+
+    def reset_mailbox(self, uidvalidity: int) -> None:
+        """Renumber the mailbox (e.g. it was recreated): new UIDVALIDITY, UIDs from 1."""
+        def reset() -> None:
+            self.uidvalidity = uidvalidity
+            bodies = [self.messages[u] for u in sorted(self.messages)]
+            self.messages = {i + 1: b for i, b in enumerate(bodies)}
+            self.seen = set()
+            self.next_uid = len(bodies) + 1
+        self._loop.call_soon_threadsafe(reset)
+
+    # ---- protocol ------------------------------------------------------------
+
+    def _uids(self, uid_set: str) -> list[int]:
+        top = max(self.messages, default=0)
+        uids: set[int] = set()
+        for part in uid_set.split(","):
+            lo, _, hi = part.partition(":")
+            lo_n = top if lo == "*" else int(lo)
+            hi_n = lo_n if not hi else (top if hi == "*" else int(hi))
+            lo_n, hi_n = min(lo_n, hi_n), max(lo_n, hi_n)
+            uids.update(u for u in self.messages if lo_n <= u <= hi_n)
+        return sorted(uids)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        writer.write(b"* OK stub IMAP ready\r\n")
+        try:
+            while line := await reader.readline():
+                tag, _, rest = line.decode().strip().partition(" ")
+                cmd, _, args = rest.partition(" ")
+                cmd = cmd.upper()
+                if cmd == "UID":
+                    cmd, _, args = args.partition(" ")
+                    cmd = "UID " + cmd.upper()
+                out = self._respond(tag, cmd, args, writer)
+                if out is None:  # IDLE
+                    await reader.readline()  # DONE
+                    self._idlers.discard(writer)
+                    out = f"{tag} OK IDLE terminated\r\n".encode()
+                writer.write(out)
+                await writer.drain()
+                if cmd == "LOGOUT":
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._idlers.discard(writer)
+            writer.close()
+
+    def _respond(self, tag: str, cmd: str, args: str, writer: asyncio.StreamWriter) -> bytes | None:
+        ok = f"{tag} OK done\r\n".encode()
+        if cmd == "CAPABILITY":
+            return b"* CAPABILITY IMAP4rev1 IDLE\r\n" + ok
+        if cmd in ("LOGIN", "NOOP", "UID STORE"):
+            if cmd == "UID STORE":
+                self.seen.update(self._uids(args.split()[0]))
+            return ok
+        if cmd == "SELECT":
+            return (
+                f"* {len(self.messages)} EXISTS\r\n"
+                f"* OK [UIDVALIDITY {self.uidvalidity}] ok\r\n"
+                f"{tag} OK [READ-WRITE] done\r\n"
+            ).encode()
+        if cmd == "UID SEARCH":
+            m = re.search(r"UID (\S+)", args)
+            uids = self._uids(m.group(1)) if m else sorted(self.messages)
+            uids = [u for u in uids if u not in self.seen]
+            extra = b""
+            if self.exists_with_search:
+                self.exists_with_search = False
+                extra = f"* {len(self.messages)} EXISTS\r\n".encode()
+            return f"* SEARCH {' '.join(map(str, uids))}\r\n".encode() + extra + ok
+        if cmd == "UID FETCH":
+            self.fetch_commands += 1
+            if self.fail_fetches:
+                self.fail_fetches -= 1
+                return f"{tag} NO temporary failure\r\n".encode()
+            out = b""
+            for seq, uid in enumerate(self._uids(args.split()[0]), 1):
+                body = self.messages[uid]
+                out += f"* {seq} FETCH (UID {uid} BODY[] {{{len(body)}}}\r\n".encode() + body + b")\r\n"
+            return out + ok
+        if cmd == "IDLE":
+            self._idlers.add(writer)
+            extra = f"* {len(self.messages)} EXISTS\r\n" if self.exists_with_idle else ""
+            self.exists_with_idle = False
+            writer.write(f"+ idling\r\n{extra}".encode())
+            return None
+        if cmd == "LOGOUT":
+            return b"* BYE\r\n" + ok
+        return f"{tag} BAD unknown command\r\n".encode()
+
+
+def _channel(server: StubIMAPServer, state_dir: Path) -> EmailChannel:
+    config = EmailConfig(
+        enabled=True,
+        consent_granted=True,
+        imap_host="127.0.0.1",
+        imap_port=server.port,
+        imap_username="bot",
+        imap_password="secret",
+        imap_use_ssl=False,
+        smtp_host="127.0.0.1",
+        smtp_username="bot",
+        smtp_password="secret",
+    )
+    channel = EmailChannel(config, MessageBus(), state_path=state_dir / "state.json")
+    channel._running = True
+    return channel
+
+
+def main() -> int:
+    results: list[tuple[str, bool, str]] = []
+
+    def check(name: str, ok: bool, detail: str = "") -> None:
+        results.append((name, ok, detail))
+        print(f"{'PASS' if ok else 'FAIL'}  {name}{f'  ({detail})' if detail else ''}")
+
+    server = StubIMAPServer()
+    state_dir = Path(tempfile.mkdtemp())
+    channel = _channel(server, state_dir)
+
+    # Batching: 120 new messages are fetched in 3 FETCH commands of at most 50
+    server.deliver(120)
+    time.sleep(0.05)
+    got = channel._fetch_new_messages()
+    check("batching", len(got) == 120 and server.fetch_commands == 3 and channel._last_uid == 120,
+          f"{len(got)} messages, {server.fetch_commands} FETCHes, watermark {channel._last_uid}")
+
+    # A failed FETCH raises and leaves the watermark (and \\Seen flags) alone
+    server.deliver(3)
+    server.fail_fetches = 1
+    time.sleep(0.05)
+    try:
+        channel._fetch_new_messages()
+        raised = False
+    except Exception:
+        raised = True
+    watermark = channel._last_uid
+    retried = channel._fetch_new_messages()
+    check("failed FETCH is retried", raised and watermark == 120 and len(retried) == 3,
+          f"raised={raised}, watermark after failure {watermark}, {len(retried)} on retry")
+
+    # Reconnect: the server drops the connection; the next fetch fails, then reconnects
+    server.drop_connections()
+    server.deliver(2)
+    time.sleep(0.05)
+    try:
+        channel._fetch_new_messages()
+    except Exception:
+        channel._disconnect()
+    got = channel._fetch_new_messages()
+    check("reconnect", len(got) == 2 and server.connections == 2,
+          f"{len(got)} messages, {server.connections} connections")
+
+    # UIDVALIDITY reset: the mailbox is renumbered; the watermark restarts at 0
+    server.reset_mailbox(uidvalidity=2)
+    server.drop_connections()
+    time.sleep(0.05)
+    channel._disconnect()
+    got = channel._fetch_new_messages()
+    check("UIDVALIDITY reset", channel._uidvalidity == 2 and len(got) == 125 and channel._last_uid == 125,
+          f"uidvalidity {channel._uidvalidity}, {len(got)} messages, watermark {channel._last_uid}")
+
+    def timed_idle(timeout: float) -> tuple[bool, float]:
+        start = time.monotonic()
+        changed = channel._idle(timeout)
+        return changed, time.monotonic() - start
+
+    # IDLE wake-up: mail delivered while idling
+    channel._fetch_new_messages()
+    threading.Timer(0.3, server.deliver).start()
+    changed, took = timed_idle(8)
+    check("IDLE wakes on new mail", changed and took < 2, f"{took:.2f}s")
+
+    # EXISTS in the same packet as the IDLE continuation (sits in imaplib's buffer)
+    channel._fetch_new_messages()
+    server.exists_with_idle = True
+    changed, took = timed_idle(8)
+    check("IDLE sees EXISTS sent with '+ idling'", changed and took < 2, f"{took:.2f}s")
+
+    # EXISTS reported during SEARCH, before IDLE starts
+    server.deliver()
+    server.exists_with_search = True
+    time.sleep(0.05)
+    channel._fetch_new_messages()
+    changed, took = timed_idle(8)
+    check("IDLE returns for EXISTS seen before it", changed and took < 1, f"{took:.2f}s")
+
+    channel._running = False
+    channel._disconnect()
+    return 0 if all(ok for _, ok, _ in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())